@@ -5,20 +5,33 @@
 """
 
 import sys
+import os
+from functools import partial
 import pandas as pd
 import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QFileDialog, QLabel,
-                             QTableWidget, QTableWidgetItem, QSplitter, QDialog,
+                             QTableView, QSplitter, QDialog,
                              QTextEdit, QTabWidget, QScrollArea, QFrame, QComboBox,
                              QGroupBox, QLineEdit, QMessageBox, QDateTimeEdit, QCheckBox)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont
 import pyqtgraph as pg
 from pyqtgraph import DateAxisItem
 from datetime import datetime
 import logging
 from analyzer_logic import AnalyzerLogic
+from plot_pipeline import PlotPipeline, numeric_column
+from lod import MinMaxPyramid
+from data_cache import DataCache
+from data_loader import load_data_file, LoadCancelled
+from campaign_loader import load_campaign
+from series_store import compact_file_data, row_count
+from time_alignment import align_pair
+from lag_estimation import reference_lags
+from rolling_stats import ROLLING_WINDOWS, DEFAULT_WINDOW, rolling_tracks
+from sliding_stats import SlidingWindowStats, SlidingPairStats
+from selection_cache import SelectionCache, scales_key
 
 # Настройка логирования
 logging.basicConfig(
@@ -31,6 +44,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Фильтр файлов для диалогов открытия
+DATA_FILE_FILTER = 'Файлы данных (*.xlsx *.xls *.csv *.tsv *.txt);;Excel Files (*.xlsx *.xls);;CSV/TSV (*.csv *.tsv *.txt)'
+
+# Названия этапов загрузки для строки статуса
+LOAD_STAGE_NAMES = {
+    'read': 'Чтение файла',
+    'columns': 'Определение колонок',
+    'dates': 'Разбор дат',
+    'numeric': 'Преобразование чисел'
+}
+
+# Максимальная частота обновления перекрестия (событий мыши в секунду)
+CROSSHAIR_RATE_LIMIT = 60
+
+# Пересчет выделения при перетаскивании: не чаще одного раза за столько миллисекунд
+SELECTION_UPDATE_MS = 100
+
+# Строк, по которым подбирается ширина колонок таблицы данных
+TABLE_RESIZE_ROWS = 200
+
+# Прореживание линий: точек на пиксель ширины и минимальная ширина графика в пикселях
+LOD_POINTS_PER_PIXEL = 2
+LOD_MIN_WIDTH = 400
+
+# Дорожки скользящих метрик: высота в пикселях и подписи метрик
+TRACK_HEIGHT = 160
+ROLLING_METRIC_LABELS = {
+    'correlation': 'Корреляция r',
+    'mean_diff': 'Разность, мг/м³',
+    'reduced_error': 'Привед. погрешность γ, %'
+}
+
 class DataDebuggerDialog(QDialog):
     """Визуальный отладчик данных"""
 
@@ -118,9 +163,11 @@ class DataDebuggerDialog(QDialog):
         self.problems_text.setReadOnly(True)
         layout.addWidget(self.problems_text)
 
-    def analyze_data(self, data_files):
-        """Анализ загруженных данных"""
+    def analyze_data(self, data_files, plot_pipeline=None, selection_cache=None):
+        """Анализ загруженных данных (и счетчиков кэшей, если переданы)"""
         self.data_files = data_files
+        self.plot_pipeline = plot_pipeline
+        self.selection_cache = selection_cache
         self.refresh_analysis()
 
     def refresh_analysis(self):
@@ -143,6 +190,12 @@ class DataDebuggerDialog(QDialog):
         problems_info = self.analyze_problems()
         self.problems_text.setText(problems_info)
 
+    def raw_data(self, file_data):
+        """Исходная таблица файла или ее начало, сохраненное после сжатия"""
+        if 'data' in file_data:
+            return file_data['data']
+        return file_data['raw_preview']
+
     def analyze_structure(self):
         """Анализ структуры файлов"""
         result = []
@@ -150,11 +203,15 @@ class DataDebuggerDialog(QDialog):
         result.append("=" * 50)
 
         for file_type, file_data in self.data_files.items():
-            df = file_data['data']
+            df = self.raw_data(file_data)
             result.append(f"\n📁 Файл: {file_type}")
             result.append(f"   Путь: {file_data['path']}")
-            result.append(f"   Строк: {len(df)}")
+            result.append(f"   Строк: {row_count(file_data)}")
             result.append(f"   Колонок: {len(df.columns)}")
+            memory = file_data.get('memory')
+            if memory is not None:
+                result.append(f"   Память: {memory['raw'] / 1024 ** 2:.1f} МБ -> {memory['compact'] / 1024 ** 2:.1f} МБ "
+                              f"(анализ по первым {len(df)} строкам)")
 
             result.append(f"\n   Колонки:")
             for i, col in enumerate(df.columns):
@@ -162,8 +219,31 @@ class DataDebuggerDialog(QDialog):
                 non_null = df[col].notna().sum()
                 result.append(f"     {i:2d}. '{col}' | Тип: {dtype} | Не-null: {non_null}")
 
+        result.extend(self.cache_lines())
         return "\n".join(result)
 
+    def cache_lines(self):
+        """Счетчики кэша этапов подготовки графиков и кэша результатов выделения"""
+        result = []
+        pipeline = getattr(self, 'plot_pipeline', None)
+        selection_cache = getattr(self, 'selection_cache', None)
+        if pipeline is None and selection_cache is None:
+            return result
+
+        result.append("\n🗄 КЭШИ")
+        result.append("=" * 50)
+        if pipeline is not None:
+            result.append("   Этапы подготовки графиков (выполнено / из кэша):")
+            for stage, runs in pipeline.runs.items():
+                result.append(f"     {stage:8s} {runs} / {pipeline.hits[stage]}")
+        if selection_cache is not None:
+            stats = selection_cache.stats()
+            hit_rate = f"{stats['hit_rate'] * 100:.0f}%" if stats['hit_rate'] is not None else "-"
+            result.append(f"   Результаты выделений: записей {stats['entries']} из {stats['max_entries']}, "
+                          f"попаданий {stats['hits']}, промахов {stats['misses']} ({hit_rate}), "
+                          f"вытеснено {stats['evictions']}")
+        return result
+
     def analyze_data_conversion(self):
         """Анализ преобразования данных"""
         result = []
@@ -171,7 +251,7 @@ class DataDebuggerDialog(QDialog):
         result.append("=" * 50)
 
         for file_type, file_data in self.data_files.items():
-            df = file_data['data']
+            df = self.raw_data(file_data)
             result.append(f"\n📊 Файл: {file_type}")
 
             # Определяем колонки данных
@@ -215,7 +295,7 @@ class DataDebuggerDialog(QDialog):
         total_problems = 0
 
         for file_type, file_data in self.data_files.items():
-            df = file_data['data']
+            df = self.raw_data(file_data)
             result.append(f"\n🔍 Файл: {file_type}")
 
             time_col, data_cols = self.identify_columns(df)
@@ -511,6 +591,161 @@ class ScaleSettingsDialog(QDialog):
         return getattr(self, 'result_scales', {})
 
 
+class FileLoadWorker(QThread):
+    """Фоновая загрузка файла с отчетом о прогрессе по этапам"""
+
+    progress = pyqtSignal(str, str, int)  # file_type, этап, процент
+    loaded = pyqtSignal(str, object)  # file_type, данные файла
+    failed = pyqtSignal(str, str)  # file_type, сообщение об ошибке
+    cancelled = pyqtSignal(str)  # file_type
+
+    def __init__(self, file_type, file_path, logic, cache, debug_hook=None, parent=None):
+        super().__init__(parent)
+        self.file_type = file_type
+        self.file_path = file_path
+        self.logic = logic
+        self.cache = cache
+        self.debug_hook = debug_hook
+        self._cancel_requested = False
+
+    def cancel(self):
+        """Запросить отмену (срабатывает на границе этапов)"""
+        self._cancel_requested = True
+
+    def is_cancelled(self):
+        return self._cancel_requested
+
+    def run(self):
+        progress = lambda stage, percent: self.progress.emit(self.file_type, stage, percent)
+        try:
+            if isinstance(self.file_path, list):
+                # Несколько файлов одного газа - загрузка кампании
+                file_data = load_campaign(self.file_path, self.cache,
+                                          progress=progress, is_cancelled=self.is_cancelled)
+            else:
+                file_data = load_data_file(
+                    self.file_path, self.logic, self.cache,
+                    progress=progress,
+                    is_cancelled=self.is_cancelled,
+                    debug_hook=self.debug_hook
+                )
+        except LoadCancelled:
+            self.cancelled.emit(self.file_type)
+            return
+        except Exception as e:
+            logger.error(f"Ошибка загрузки {self.file_path}: {e}")
+            self.failed.emit(self.file_type, str(e))
+            return
+
+        # Исходная таблица заменяется компактными массивами (тоже вне GUI-потока)
+        compact_file_data(file_data)
+
+        if self._cancel_requested:
+            self.cancelled.emit(self.file_type)
+        else:
+            self.loaded.emit(self.file_type, file_data)
+
+
+class SelectionWorker(QThread):
+    """Фоновый пересчет результатов выделения при перетаскивании"""
+
+    computed = pyqtSignal(int, float, float, object)  # номер запроса, начало, конец, результаты по графикам
+
+    def __init__(self, generation, x_start, x_end, compute, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+        self.x_start = x_start
+        self.x_end = x_end
+        self.compute = compute
+
+    def run(self):
+        try:
+            results_by_plot = self.compute(self.x_start, self.x_end)
+        except Exception as e:
+            logger.error(f"Ошибка пересчета выделения: {e}")
+            results_by_plot = None
+        self.computed.emit(self.generation, self.x_start, self.x_end, results_by_plot)
+
+
+class DataTableModel(QAbstractTableModel):
+    """Виртуальная модель таблицы данных: ячейки форматируются только при отрисовке"""
+
+    def __init__(self, file_data=None, parent=None):
+        super().__init__(parent)
+        self.time_col = None
+        self.data_cols = []
+        self.times = None
+        self.columns = []
+        self.store = None
+        self.raw = None
+        self.row_count = 0
+        if file_data is None:
+            return
+
+        self.time_col = file_data.get('time_col')
+        self.data_cols = list(file_data.get('data_cols') or [])
+        self.store = file_data.get('store')
+        self.raw = file_data.get('data')
+
+        # Время - int64 нс, значения - уже преобразованные float-массивы файла
+        parsed_dates = file_data.get('parsed_dates')
+        if self.time_col and parsed_dates is not None:
+            self.times = np.asarray(parsed_dates, dtype='datetime64[ns]').view('int64')
+        self.columns = [numeric_column(file_data, col) for col in self.data_cols]
+
+        if self.times is not None:
+            self.row_count = len(self.times)
+        elif self.columns:
+            self.row_count = len(self.columns[0])
+        self.headers = ([self.time_col] if self.time_col else []) + self.data_cols
+
+    def rowCount(self, parent=QModelIndex()):  # noqa: N802
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):  # noqa: N802
+        if parent.isValid() or self.row_count == 0:
+            return 0
+        return len(self.headers)
+
+    def raw_value(self, row, col_name):
+        """Исходное значение ячейки (из компактного хранилища или исходной таблицы)"""
+        if self.store is not None:
+            return self.store.raw_text(col_name, row)
+        if self.raw is not None and col_name in self.raw.columns:
+            return str(self.raw[col_name].iat[row])
+        return ''
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.UserRole:
+            return row
+        if role != Qt.DisplayRole:
+            return None
+
+        col = index.column()
+        if self.time_col:
+            if col == 0:
+                if self.times is None or self.times[row] == np.iinfo(np.int64).min:
+                    return self.raw_value(row, self.time_col)
+                return pd.Timestamp(self.times[row]).strftime('%d.%m.%Y %H:%M:%S')
+            col -= 1
+
+        value = self.columns[col][row]
+        if np.isnan(value):
+            # Нечисловые данные - показываем как есть
+            return self.raw_value(row, self.data_cols[col])
+        return f"{value:.4f}"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):  # noqa: N802
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self.headers[section])
+        return str(section + 1)
+
+
 class AnalyzerComparisonApp(QMainWindow):
     """Главное окно приложения для сравнения анализаторов"""
 
@@ -534,9 +769,30 @@ class AnalyzerComparisonApp(QMainWindow):
         # Режим фильтрации выбросов (замена 0 и 1 на предыдущие значения)
         self.filter_outliers_mode = False  # Флаг режима фильтрации
 
+        # Учет транспортной задержки анализаторов относительно эталона
+        self.lag_mode = False
+
+        # Дорожки скользящих метрик (анализатор относительно эталона) под графиками газов
+        self.rolling_tracks_enabled = False
+        self.rolling_window = DEFAULT_WINDOW  # Окно, секунды
+        self.rolling_metric = 'correlation'
+
         # Временное хранилище регионов при создании выделения
         self.temp_selection_regions = []
 
+        # Пересчет выделения при перетаскивании: ограничение частоты, фоновый поток,
+        # запрос, ожидающий окончания текущего расчета, и номер последнего запроса
+        self.selection_timer = QTimer(self)
+        self.selection_timer.setSingleShot(True)
+        self.selection_timer.setInterval(SELECTION_UPDATE_MS)
+        self.selection_timer.timeout.connect(self.schedule_selection_update)
+        self.selection_worker = None
+        self.pending_selection = None
+        self.selection_generation = 0
+
+        # Результаты уже посчитанных выделений (повторный выбор того же окна - из кэша)
+        self.selection_cache = SelectionCache()
+
         # Настройки шкал приборов и погрешностей
         # Формат: {gas_type: {analyzer_name: {'scale': float, 'accuracy_class': float}}}
         self.analyzer_scales = {}
@@ -549,6 +805,19 @@ class AnalyzerComparisonApp(QMainWindow):
         # Инициализация логики
         self.logic = AnalyzerLogic()
 
+        # Кэшируемые этапы подготовки данных графиков
+        self.plot_pipeline = PlotPipeline(self.logic)
+
+        # Кэш разобранных файлов на диске
+        self.data_cache = DataCache()
+
+        # Активные фоновые загрузки {file_type: FileLoadWorker}
+        self.load_workers = {}
+
+        # Перекрестие: ограничитель частоты событий мыши и индексы последней отрисовки панели
+        self.mouse_proxy = None
+        self.crosshair_key = None
+
         self.init_ui()
 
     def init_ui(self):
@@ -625,20 +894,23 @@ class AnalyzerComparisonApp(QMainWindow):
 
         table_layout.addLayout(file_selector_layout)
 
-        # Таблица данных
-        self.data_table = QTableWidget()
+        # Таблица данных (виртуальная модель - строки форматируются по мере прокрутки)
+        self.data_table = QTableView()
         self.data_table.setAlternatingRowColors(True)
-        self.data_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.data_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.data_table.itemSelectionChanged.connect(self.on_table_selection_changed)
+        self.data_table.setSelectionBehavior(QTableView.SelectRows)
+        self.data_table.setSelectionMode(QTableView.SingleSelection)
+        self.data_table.verticalHeader().setDefaultSectionSize(20)
+        # Ширина колонок подбирается по первым строкам, а не по всему файлу
+        self.data_table.horizontalHeader().setResizeContentsPrecision(TABLE_RESIZE_ROWS)
+        self.set_table_model(DataTableModel())
 
         # Стиль таблицы
         self.data_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #d0d0d0;
                 font-size: 10px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
@@ -670,6 +942,13 @@ class AnalyzerComparisonApp(QMainWindow):
         self.btn_load_h2s.setStyleSheet('QPushButton { font-size: 11px; padding: 8px; }')
         layout.addWidget(self.btn_load_h2s)
 
+        # Кнопка загрузки нескольких файлов H2S
+        self.btn_load_h2s_many = QPushButton('📂')
+        self.btn_load_h2s_many.clicked.connect(lambda: self.load_campaign_files('H2S'))
+        self.btn_load_h2s_many.setStyleSheet('QPushButton { font-size: 11px; padding: 8px; }')
+        self.btn_load_h2s_many.setToolTip('Загрузить несколько файлов H2S и объединить их в один ряд')
+        layout.addWidget(self.btn_load_h2s_many)
+
         # Метка статуса H2S
         self.label_h2s = QLabel('Файл не загружен')
         self.label_h2s.setStyleSheet('QLabel { color: gray; font-size: 10px; }')
@@ -683,11 +962,25 @@ class AnalyzerComparisonApp(QMainWindow):
         self.btn_load_so2.setStyleSheet('QPushButton { font-size: 11px; padding: 8px; }')
         layout.addWidget(self.btn_load_so2)
 
+        # Кнопка загрузки нескольких файлов SO2
+        self.btn_load_so2_many = QPushButton('📂')
+        self.btn_load_so2_many.clicked.connect(lambda: self.load_campaign_files('SO2'))
+        self.btn_load_so2_many.setStyleSheet('QPushButton { font-size: 11px; padding: 8px; }')
+        self.btn_load_so2_many.setToolTip('Загрузить несколько файлов SO2 и объединить их в один ряд')
+        layout.addWidget(self.btn_load_so2_many)
+
         # Метка статуса SO2
         self.label_so2 = QLabel('Файл не загружен')
         self.label_so2.setStyleSheet('QLabel { color: gray; font-size: 10px; }')
         layout.addWidget(self.label_so2)
 
+        # Кнопка отмены фоновой загрузки
+        self.btn_cancel_load = QPushButton('⛔ Отменить загрузку')
+        self.btn_cancel_load.clicked.connect(self.cancel_loading)
+        self.btn_cancel_load.setEnabled(False)
+        self.btn_cancel_load.setStyleSheet('QPushButton { font-size: 11px; padding: 8px; }')
+        layout.addWidget(self.btn_cancel_load)
+
         layout.addStretch()
 
         # Кнопка отладчика данных
@@ -697,6 +990,13 @@ class AnalyzerComparisonApp(QMainWindow):
         self.btn_debug.setStyleSheet('QPushButton { font-size: 11px; padding: 8px; background-color: #FF9800; color: white; } QPushButton:disabled { background-color: #cccccc; }')
         layout.addWidget(self.btn_debug)
 
+        # Кнопка очистки кэша разобранных файлов
+        self.btn_clear_cache = QPushButton('🧹 Очистить кэш')
+        self.btn_clear_cache.clicked.connect(self.clear_data_cache)
+        self.btn_clear_cache.setStyleSheet('QPushButton { font-size: 11px; padding: 8px; }')
+        self.btn_clear_cache.setToolTip('Удалить сохраненные на диске результаты разбора файлов (при следующей загрузке файлы будут прочитаны заново)')
+        layout.addWidget(self.btn_clear_cache)
+
         # Кнопка фильтрации выбросов
         self.btn_filter_outliers = QPushButton('🔧 Фильтр выбросов (0/1)')
         self.btn_filter_outliers.setCheckable(True)
@@ -707,6 +1007,17 @@ class AnalyzerComparisonApp(QMainWindow):
         self.btn_filter_outliers.setToolTip('Заменять нули и единицы на предыдущие значения (для устранения выбросов при обрыве связи)')
         layout.addWidget(self.btn_filter_outliers)
 
+        # Кнопка учета задержки между анализаторами
+        self.btn_lag_mode = QPushButton('⏱ Учет задержки')
+        self.btn_lag_mode.setCheckable(True)
+        self.btn_lag_mode.setChecked(False)
+        self.btn_lag_mode.toggled.connect(self.toggle_lag_mode)
+        self.btn_lag_mode.setEnabled(False)
+        self.btn_lag_mode.setStyleSheet(self.get_filter_button_style(False))
+        self.btn_lag_mode.setToolTip('Оценивать задержку анализаторов относительно эталона по взаимной корреляции '
+                                     'и сдвигать их ряды перед расчетом сравнений')
+        layout.addWidget(self.btn_lag_mode)
+
         # Кнопка настройки шкал приборов
         self.btn_scale_settings = QPushButton('⚙️ Шкалы приборов')
         self.btn_scale_settings.clicked.connect(self.open_scale_settings)
@@ -812,6 +1123,34 @@ class AnalyzerComparisonApp(QMainWindow):
 
         layout.addStretch()
 
+        # Дорожки скользящих метрик под графиками
+        self.rolling_checkbox = QCheckBox('📉 Скользящие метрики:')
+        self.rolling_checkbox.setStyleSheet('QCheckBox { font-size: 11px; font-weight: bold; }')
+        self.rolling_checkbox.setToolTip('Показать под каждым графиком дорожку со скользящей метрикой '
+                                         'каждого анализатора относительно эталона')
+        self.rolling_checkbox.toggled.connect(self.toggle_rolling_tracks)
+        layout.addWidget(self.rolling_checkbox)
+
+        # Длина окна
+        self.rolling_window_combo = QComboBox()
+        for label, seconds in ROLLING_WINDOWS.items():
+            self.rolling_window_combo.addItem(label, seconds)
+        self.rolling_window_combo.setCurrentIndex(list(ROLLING_WINDOWS.values()).index(DEFAULT_WINDOW))
+        self.rolling_window_combo.setEnabled(False)
+        self.rolling_window_combo.setStyleSheet('QComboBox { font-size: 10px; padding: 3px; }')
+        self.rolling_window_combo.setToolTip('Окно скользящего расчета')
+        self.rolling_window_combo.currentIndexChanged.connect(self.on_rolling_window_changed)
+        layout.addWidget(self.rolling_window_combo)
+
+        # Метрика
+        self.rolling_metric_combo = QComboBox()
+        for metric, label in ROLLING_METRIC_LABELS.items():
+            self.rolling_metric_combo.addItem(label, metric)
+        self.rolling_metric_combo.setEnabled(False)
+        self.rolling_metric_combo.setStyleSheet('QComboBox { font-size: 10px; padding: 3px; }')
+        self.rolling_metric_combo.currentIndexChanged.connect(self.on_rolling_metric_changed)
+        layout.addWidget(self.rolling_metric_combo)
+
         return panel
 
     def toggle_date_range(self, checked):
@@ -854,7 +1193,7 @@ class AnalyzerComparisonApp(QMainWindow):
 
         # Автоматически перестроить графики если они уже были построены
         if len(self.plots) > 0:
-            self.plot_data()
+            self.refresh_plots(auto_range=True)
 
     def apply_date_range(self):
         """Применение выбранного диапазона дат"""
@@ -875,8 +1214,11 @@ class AnalyzerComparisonApp(QMainWindow):
         self.date_range_info.setText(f'✓ Применен диапазон: {start.strftime("%d.%m.%Y %H:%M")} - {end.strftime("%d.%m.%Y %H:%M")}')
         self.date_range_info.setStyleSheet('QLabel { color: #28a745; font-size: 10px; margin-left: 10px; font-weight: bold; }')
 
-        # Перестроить графики с новым диапазоном
-        self.plot_data()
+        # Перестроить графики с новым диапазоном (пересчитывается только срез)
+        if len(self.plots) > 0:
+            self.refresh_plots(auto_range=True)
+        else:
+            self.plot_data()
 
     def update_date_range_limits(self):
         """Обновление пределов выбора дат на основе загруженных данных"""
@@ -998,203 +1340,243 @@ class AnalyzerComparisonApp(QMainWindow):
         print("=" * 60)
 
     def load_file(self, file_type):
-        """Загрузка Excel файла с данными"""
+        """Загрузка файла с данными Excel/CSV (в фоновом потоке)"""
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             f'Выберите файл {file_type}',
             '',
-            'Excel Files (*.xlsx *.xls)'
+            DATA_FILE_FILTER
         )
 
         if file_path:
-            try:
-                # Чтение Excel файла
-                df = pd.read_excel(file_path)
-
-                # Проверка наличия данных
-                if df.empty:
-                    self.show_error(f'Файл {file_type} пуст')
-                    return
-
-                # ЗАПУСК ОТЛАДЧИКА
-                self.debug_data_conversion(df, file_type)
-
-                # Определяем колонки
-                time_col, data_cols = self.logic.identify_columns(df)
-                
-                # Парсим даты сразу при загрузке
-                parsed_dates = None
-                if time_col:
-                    logger.info(f"Парсинг дат для {file_type} (колонка {time_col})...")
-                    parsed_dates = self.logic.parse_dates(df[time_col])
-                    valid_dates = parsed_dates.notna().sum()
-                    logger.info(f"Успешно распарсено дат: {valid_dates}/{len(df)}")
-
-                # Сохранение данных
-                self.data_files[file_type] = {
-                    'path': file_path,
-                    'data': df,
-                    'time_col': time_col,
-                    'data_cols': data_cols,
-                    'parsed_dates': parsed_dates
-                }
+            self.start_file_load(file_type, file_path)
 
-                # Обновление метки статуса
-                if file_type == 'H2S':
-                    self.label_h2s.setText(f'✅ Загружено: {len(df)} записей')
-                    self.label_h2s.setStyleSheet('color: green;')
-                else:
-                    self.label_so2.setText(f'✅ Загружено: {len(df)} записей')
-                    self.label_so2.setStyleSheet('color: green;')
+    def load_campaign_files(self, file_type):
+        """Загрузка нескольких файлов одного газа (например, еженедельных выгрузок)"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            f'Выберите файлы {file_type} (несколько)',
+            '',
+            DATA_FILE_FILTER
+        )
 
-                # Активация кнопок
-                if len(self.data_files) > 0:
-                    self.btn_plot.setEnabled(True)
-                    self.btn_debug.setEnabled(True)
-                    self.btn_filter_outliers.setEnabled(True)
+        if file_paths:
+            self.start_file_load(file_type, list(file_paths))
+
+    def start_file_load(self, file_type, file_path):
+        """Запуск фоновой загрузки одного файла или списка файлов"""
+        # Если этот файл уже загружается - отменяем предыдущую загрузку
+        previous = self.load_workers.get(file_type)
+        if previous is not None:
+            previous.cancel()
+
+        # Родитель - окно: при закрытии находятся и замененные загрузки, которые еще не завершились
+        worker = FileLoadWorker(file_type, file_path, self.logic, self.data_cache,
+                                lambda df, ft=file_type: self.debug_data_conversion(df, ft), self)
+        worker.progress.connect(self.on_load_progress)
+        worker.loaded.connect(self.on_file_loaded)
+        worker.failed.connect(self.on_load_failed)
+        worker.cancelled.connect(self.on_load_cancelled)
+        worker.finished.connect(self.on_load_worker_finished)
+
+        self.load_workers[file_type] = worker
+        self.set_file_status(file_type, '⏳ Загрузка...', 'color: #007bff;')
+        self.btn_cancel_load.setEnabled(True)
+        worker.start()
+
+    def format_campaign_report(self, report):
+        """Текстовый отчет о покрытии, перекрытиях и пропусках между файлами"""
+        fmt = '%d.%m.%Y %H:%M'
+        lines = ['Файлы:']
+        for info in report['files']:
+            name = os.path.basename(info['path'])
+            if info['start'] is None:
+                lines.append(f"  {name}: нет валидных дат ({info['rows']} строк)")
+            else:
+                lines.append(f"  {name}: {info['start'].strftime(fmt)} - {info['end'].strftime(fmt)} ({info['rows']} строк)")
+        for overlap in report['overlaps']:
+            lines.append(f"Перекрытие: {overlap['start'].strftime(fmt)} - {overlap['end'].strftime(fmt)} "
+                         f"({os.path.basename(overlap['files'][0])} / {os.path.basename(overlap['files'][1])})")
+        for gap in report['gaps']:
+            lines.append(f"Пропуск: {gap['start'].strftime(fmt)} - {gap['end'].strftime(fmt)}")
+        lines.append(f"Удалено дубликатов: {report['duplicates_removed']}")
+        return '\n'.join(lines)
+
+    def set_file_status(self, file_type, text, style):
+        """Обновление метки статуса файла"""
+        label = self.label_h2s if file_type == 'H2S' else self.label_so2
+        label.setText(text)
+        label.setStyleSheet(style)
+
+    def cancel_loading(self):
+        """Отмена всех выполняющихся загрузок"""
+        for worker in self.load_workers.values():
+            worker.cancel()
+
+    def closeEvent(self, event):  # noqa: N802
+        """Закрытие окна: загрузки отменяются, потоки дожидаются (иначе Qt аварийно завершает процесс)"""
+        self.cancel_loading()
+        for worker in self.findChildren(FileLoadWorker):
+            worker.wait()
+        self.finish_selection_worker()
+        super().closeEvent(event)
+
+    def on_load_progress(self, file_type, stage, percent):
+        """Отображение прогресса загрузки по этапам"""
+        if self.load_workers.get(file_type) is not self.sender():
+            return
+        stage_name = LOAD_STAGE_NAMES.get(stage, stage)
+        self.set_file_status(file_type, f'⏳ {stage_name}: {percent}%', 'color: #007bff;')
 
-                # Обновляем селектор файлов в таблице
-                self.update_file_selector()
+    def on_load_cancelled(self, file_type):
+        """Загрузка отменена пользователем"""
+        if self.load_workers.get(file_type) is not self.sender():
+            return
+        logger.info(f"Загрузка файла {file_type} отменена")
+        if file_type in self.data_files:
+            self.set_file_status(file_type, f'✅ Загружено: {row_count(self.data_files[file_type])} записей', 'color: green;')
+        else:
+            self.set_file_status(file_type, 'Загрузка отменена', 'color: gray;')
 
-                # Обновляем доступные диапазоны дат
-                self.update_date_range_limits()
+    def on_load_failed(self, file_type, message):
+        """Ошибка при загрузке файла"""
+        if self.load_workers.get(file_type) is not self.sender():
+            return
+        self.set_file_status(file_type, 'Ошибка загрузки', 'color: #dc3545;')
+        self.show_error(f'Ошибка при загрузке файла {file_type}: {message}')
+
+    def on_load_worker_finished(self):
+        """Поток загрузки завершился"""
+        worker = self.sender()
+        for file_type, active in list(self.load_workers.items()):
+            if active is worker:
+                del self.load_workers[file_type]
+        worker.deleteLater()
+        self.btn_cancel_load.setEnabled(len(self.load_workers) > 0)
+
+    def on_file_loaded(self, file_type, file_data):
+        """Файл загружен в фоновом потоке - сохраняем данные и обновляем интерфейс"""
+        worker = self.sender()
+        if self.load_workers.get(file_type) is not worker or worker.is_cancelled():
+            return
 
-            except Exception as e:
-                self.show_error(f'Ошибка при загрузке файла {file_type}: {str(e)}')
+        # Сохранение данных
+        self.data_files[file_type] = file_data
+        rows = row_count(file_data)
+
+        # Обновление метки статуса
+        source = ' (кэш)' if file_data.get('from_cache') else ''
+        memory = file_data.get('memory')
+        if memory is not None:
+            source += f", {memory['compact'] / 1024 ** 2:.1f} МБ"
+            logger.info(f"{file_type}: память {memory['raw'] / 1024 ** 2:.1f} МБ -> "
+                        f"{memory['compact'] / 1024 ** 2:.1f} МБ")
+        report = file_data.get('campaign_report')
+        if report is not None:
+            source = (f" из {len(report['files'])} файлов, перекрытий: {len(report['overlaps'])}, "
+                      f"пропусков: {len(report['gaps'])}")
+        self.set_file_status(file_type, f'✅ Загружено: {rows} записей{source}', 'color: green;')
+        label = self.label_h2s if file_type == 'H2S' else self.label_so2
+        label.setToolTip(self.format_campaign_report(report) if report is not None else '')
+
+        # Активация кнопок
+        if len(self.data_files) > 0:
+            self.btn_plot.setEnabled(True)
+            self.btn_debug.setEnabled(True)
+            self.btn_filter_outliers.setEnabled(True)
+            self.btn_lag_mode.setEnabled(True)
+
+        # Обновляем селектор файлов в таблице
+        self.update_file_selector()
+
+        # Обновляем доступные диапазоны дат
+        self.update_date_range_limits()
+
+    def get_active_date_range(self):
+        """Активный диапазон дат (start, end) или None"""
+        if self.date_range_enabled and self.date_range_start and self.date_range_end:
+            return (self.date_range_start, self.date_range_end)
+        return None
+
+    def prepare_plot_series(self):
+        """Подготовка данных графиков через конвейер этапов (сортировка -> числа -> фильтр -> диапазон)"""
+        date_range = self.get_active_date_range()
+        if date_range is not None:
+            logger.info(f"Применяем фильтр дат: {date_range[0]} - {date_range[1]}")
+
+        series_list = []
+        for gas_type in ['H2S', 'SO2']:
+            if gas_type not in self.data_files:
+                continue
+            file_data = self.data_files[gas_type]
+            if not (file_data.get('time_col') and file_data.get('data_cols')):
+                continue
+
+            # Пересчитываются только этапы, входные данные которых изменились
+            series = self.plot_pipeline.prepare(gas_type, file_data, self.filter_outliers_mode, date_range)
+
+            if series['time_data'] is not None and series['valid_rows'] == 0:
+                logger.error(f"Все записи для {gas_type} имеют невалидное время!")
+                continue
+            if len(series['timestamps']) == 0:
+                logger.warning(f"После фильтрации нет данных для {gas_type}")
+                continue
+            series_list.append(series)
+
+        logger.debug(f"Конвейер: выполнено {self.plot_pipeline.runs}, из кэша {self.plot_pipeline.hits}")
+        return series_list
 
     def plot_data(self):
         """Построение графиков с данными из загруженных файлов"""
+        # Фоновый пересчет выделения относится к старым графикам
+        self.finish_selection_worker()
+
         # Очистка предыдущих графиков
         self.plot_widget.clear()
         self.plots = []
         self.crosshair_lines = []
 
-        # Определение количества графиков
-        plot_configs = []
-
-        for gas_type in ['H2S', 'SO2']:
-            if gas_type in self.data_files:
-                file_data = self.data_files[gas_type]
-                df = file_data['data']
-                time_col = file_data.get('time_col')
-                data_cols = file_data.get('data_cols')
-                parsed_dates = file_data.get('parsed_dates')
-                
-                if time_col and data_cols:
-                    plot_configs.append((gas_type, df, time_col, data_cols, parsed_dates))
-
-        if not plot_configs:
+        has_configs = any(file_data.get('time_col') and file_data.get('data_cols')
+                          for gas_type, file_data in self.data_files.items() if gas_type in ('H2S', 'SO2'))
+        if not has_configs:
             self.show_error('Не удалось определить структуру данных')
             return
 
-        # Создание графиков
-        for i, (gas_type, df, time_col, data_cols, parsed_dates) in enumerate(plot_configs):
-            # Используем распарсенные даты
-            time_data = parsed_dates
-            
-            # СОРТИРОВКА ДАННЫХ ПО ВРЕМЕНИ
-            if time_data is not None:
-                # Создаем временную колонку для сортировки
-                df_sorted = df.copy()
-                df_sorted['_temp_time'] = time_data
-
-                # Удаляем строки с невалидным временем
-                df_sorted = df_sorted[df_sorted['_temp_time'].notna()].copy()
-
-                if len(df_sorted) == 0:
-                    logger.error(f"Все записи для {gas_type} имеют невалидное время!")
-                    continue
-
-                # Сортируем
-                df_sorted = df_sorted.sort_values('_temp_time').reset_index(drop=True)
-                time_data = df_sorted['_temp_time']
-
-                # Фильтрация по диапазону
-                if self.date_range_enabled and self.date_range_start and self.date_range_end:
-                    logger.info(f"Применяем фильтр дат: {self.date_range_start} - {self.date_range_end}")
-                    date_mask = (time_data >= self.date_range_start) & (time_data <= self.date_range_end)
-                    df_sorted = df_sorted[date_mask].reset_index(drop=True)
-                    time_data = df_sorted['_temp_time']
-
-                    if len(df_sorted) == 0:
-                        logger.warning(f"После фильтрации нет данных для {gas_type}")
-                        continue
-
-                try:
-                    timestamps = time_data.astype('int64') / 1e9
-                except:
-                    timestamps = time_data.view('int64') / 1e9
+        class FixedDateAxis(DateAxisItem):
+            def tickStrings(self, values, scale, spacing):  # noqa: N802
+                from datetime import datetime as _dt
+                return [_dt.utcfromtimestamp(v).strftime('%d.%m.%Y %H:%M:%S') for v in values]
 
-                class FixedDateAxis(DateAxisItem):
-                    def tickStrings(self, values, scale, spacing):  # noqa: N802
-                        from datetime import datetime as _dt
-                        return [_dt.utcfromtimestamp(v).strftime('%d.%m.%Y %H:%M:%S') for v in values]
+        # Под каждым графиком газа - строка дорожки скользящих метрик (если включены)
+        rows_per_plot = 2 if self.rolling_tracks_enabled else 1
 
+        # Создание графиков
+        for i, series in enumerate(self.prepare_plot_series()):
+            gas_type = series['gas_type']
+            row = i * rows_per_plot
+            if series['time_data'] is not None:
                 axis = FixedDateAxis(orientation='bottom')
-                plot = self.plot_widget.addPlot(row=i, col=0, axisItems={'bottom': axis})
+                plot = self.plot_widget.addPlot(row=row, col=0, axisItems={'bottom': axis})
             else:
-                # Если дат нет, используем индексы
-                time_data = None
-                timestamps = np.arange(len(df))
-                plot = self.plot_widget.addPlot(row=i, col=0)
-                df_sorted = df.copy()
+                # Если дат нет, используются индексы
+                plot = self.plot_widget.addPlot(row=row, col=0)
 
             plot.setLabel('left', f'{gas_type} концентрация', units='мг/м³')
             plot.setLabel('bottom', 'Дата и время')
             plot.showGrid(x=True, y=True, alpha=0.3)
             plot.addLegend()
 
-            # Словарь для хранения отфильтрованных данных
-            current_filtered_data = {}
-
-            # Построение линий
-            colors = ['b', 'r', 'g', 'm', 'c', 'y']
-            for j, col in enumerate(data_cols):
-                try:
-                    original_values = df_sorted[col]
-                    
-                    # Используем логику для преобразования (векторизованно)
-                    numeric_values = self.logic.manual_numeric_conversion(original_values)
-
-                    # Фильтр выбросов
-                    if self.filter_outliers_mode:
-                        numeric_values = self.logic.apply_outlier_filter(numeric_values)
-
-                    current_filtered_data[col] = numeric_values
-
-                    # Маска валидных данных
-                    can_plot_mask = pd.notna(numeric_values) & np.isfinite(numeric_values)
-                    
-                    # Выравнивание длин
-                    if len(timestamps) != len(numeric_values):
-                        min_len = min(len(timestamps), len(numeric_values))
-                        timestamps_aligned = timestamps[:min_len]
-                        numeric_aligned = numeric_values[:min_len]
-                        can_plot_aligned = can_plot_mask[:min_len]
-                    else:
-                        timestamps_aligned = timestamps
-                        numeric_aligned = numeric_values
-                        can_plot_aligned = can_plot_mask
-
-                    if isinstance(timestamps_aligned, pd.Series):
-                        valid_timestamps = timestamps_aligned[can_plot_aligned].values
-                    else:
-                        valid_timestamps = timestamps_aligned[can_plot_aligned]
-                        
-                    valid_values = numeric_aligned[can_plot_aligned]
-
-                    if len(valid_values) > 0:
-                        color = colors[j % len(colors)]
-                        plot.plot(np.array(valid_timestamps), np.array(valid_values),
-                                pen=pg.mkPen(color, width=2), name=col)
-                    else:
-                        logger.warning(f"Нет валидных данных для {col}")
-
-                except Exception as e:
-                    logger.error(f"Ошибка построения {col}: {e}")
-
-            if '_temp_time' in df_sorted.columns:
-                df_sorted = df_sorted.drop(columns=['_temp_time'])
+            plot_info = {
+                'plot': plot,
+                'gas_type': gas_type,
+                'time_col': series['time_col'],
+                'data_cols': series['data_cols'],
+                'curves': {}
+            }
+            if self.rolling_tracks_enabled:
+                track_axis = FixedDateAxis(orientation='bottom') if series['time_data'] is not None else None
+                self.create_track_plot(plot_info, row + 1, track_axis)
+            self.render_series(plot_info, series)
 
             # Линии перекрестия
             vLine = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen('k', width=1, style=Qt.DashLine))
@@ -1203,18 +1585,16 @@ class AnalyzerComparisonApp(QMainWindow):
             plot.addItem(hLine, ignoreBounds=True)
 
             self.crosshair_lines.append((vLine, hLine))
-            self.plots.append({
-                'plot': plot,
-                'gas_type': gas_type,
-                'timestamps': timestamps,
-                'time_data': time_data,
-                'time_col': time_col,
-                'data_cols': data_cols,
-                'df': df_sorted,
-                'filtered_data': current_filtered_data
-            })
+            self.plots.append(plot_info)
+
+            # Масштабирование/панорамирование - перезапрос уровня детализации
+            plot.sigXRangeChanged.connect(lambda *args, info=plot_info: self.update_plot_lod(info))
 
-            plot.scene().sigMouseMoved.connect(self.on_mouse_moved)
+
+        # Перекрестие: одна подписка на сцену, не чаще частоты обновления экрана
+        if self.mouse_proxy is None and self.plots:
+            self.mouse_proxy = pg.SignalProxy(self.plot_widget.scene().sigMouseMoved,
+                                              rateLimit=CROSSHAIR_RATE_LIMIT, slot=self.on_mouse_moved_throttled)
 
         # Синхронизация осей
         if len(self.plots) > 1:
@@ -1237,6 +1617,231 @@ class AnalyzerComparisonApp(QMainWindow):
         if current_file != 'Выберите файл...' and current_file in self.data_files:
             self.populate_data_table(current_file)
 
+    def render_series(self, plot_info, series, full_range=True):
+        """Этап отрисовки: линии графика обновляются данными подготовленной серии"""
+        plot = plot_info['plot']
+        curves = plot_info['curves']
+        timestamps = series['timestamps']
+
+        # Пирамиды min/max для прореживания длинных рядов
+        lod = {}
+        colors = ['b', 'r', 'g', 'm', 'c', 'y']
+        for j, col in enumerate(series['data_cols']):
+            try:
+                values = series['values'][col]
+
+                # Маска валидных данных
+                can_plot_mask = np.isfinite(values)
+                valid_timestamps = timestamps[can_plot_mask]
+                valid_values = values[can_plot_mask]
+                lod[col] = MinMaxPyramid(valid_timestamps, valid_values)
+
+                # Данные в линию загружает update_plot_lod
+                if col not in curves and len(valid_values) > 0:
+                    color = colors[j % len(colors)]
+                    curves[col] = plot.plot(pen=pg.mkPen(color, width=2), name=col)
+
+                if len(valid_values) == 0:
+                    logger.warning(f"Нет валидных данных для {col}")
+
+            except Exception as e:
+                logger.error(f"Ошибка построения {col}: {e}")
+
+        plot_info['timestamps'] = timestamps
+        plot_info['time_index'] = series['time_index']
+        plot_info['last_index'] = None
+        plot_info['range_stats'] = series['range_stats']
+        plot_info['range_offset'] = series['range_offset']
+        plot_info['aligned'] = series['aligned']
+        plot_info['series_lags'] = None
+        # Скользящие статистики выделения строятся заново для новых данных
+        plot_info['sliding'] = {}
+        plot_info['sliding_pairs'] = {}
+        plot_info['time_data'] = series['time_data']
+        plot_info['source_rows'] = series['source_rows']
+        plot_info['filtered_data'] = series['values']
+        plot_info['version'] = series['version']
+        plot_info['filter_outliers'] = series['filter_outliers']
+        self.build_crosshair_info(plot_info)
+        self.crosshair_key = None
+
+        plot_info['lod'] = lod
+        plot_info['lod_plans'] = {}
+        if 'track' in plot_info:
+            self.compute_rolling_tracks(plot_info)
+        self.update_plot_lod(plot_info, full_range)
+
+    def create_track_plot(self, plot_info, row, axis=None):
+        """Дорожка скользящих метрик под графиком газа (общая с ним ось времени)"""
+        track = self.plot_widget.addPlot(row=row, col=0, axisItems={'bottom': axis} if axis is not None else None)
+        track.setMaximumHeight(TRACK_HEIGHT)
+        track.showGrid(x=True, y=True, alpha=0.3)
+        track.addLegend()
+        track.setXLink(plot_info['plot'])
+
+        # Нулевой уровень и вертикальная линия перекрестия
+        track.addItem(pg.InfiniteLine(angle=0, pos=0, movable=False, pen=pg.mkPen('#95a5a6', width=1)),
+                      ignoreBounds=True)
+        vLine = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen('k', width=1, style=Qt.DashLine))
+        track.addItem(vLine, ignoreBounds=True)
+
+        plot_info['track'] = track
+        plot_info['track_vline'] = vLine
+        plot_info['track_curves'] = {}
+
+    def compute_rolling_tracks(self, plot_info):
+        """Скользящие метрики пар эталон - анализатор по сопоставленным по времени отсчетам"""
+        plot_info['tracks'] = rolling_tracks(
+            plot_info['timestamps'], plot_info['aligned'], plot_info['data_cols'], self.rolling_window,
+            plot_info['gas_type'], self.analyzer_scales, plot_info['range_offset']
+        )
+        self.build_track_lod(plot_info)
+
+    def build_track_lod(self, plot_info):
+        """Пирамиды прореживания выбранной метрики для линий дорожки"""
+        track = plot_info['track']
+        curves = plot_info['track_curves']
+        colors = ['b', 'r', 'g', 'm', 'c', 'y']
+        label = ROLLING_METRIC_LABELS[self.rolling_metric]
+
+        track_lod = {}
+        unscaled = False
+        for col, stats in plot_info['tracks'].items():
+            values = stats[self.rolling_metric]
+            if values is None:
+                # Приведенная погрешность без заданных шкал не рассчитывается
+                unscaled = True
+                values = np.full(len(stats['times']), np.nan)
+            finite = np.isfinite(values)
+            track_lod[col] = MinMaxPyramid(stats['times'][finite], values[finite])
+
+            # Цвет линии - как у анализатора на графике газа
+            if col not in curves:
+                color = colors[plot_info['data_cols'].index(col) % len(colors)]
+                curves[col] = track.plot(pen=pg.mkPen(color, width=1), name=col)
+
+        if unscaled:
+            label += ' (шкалы не заданы)'
+        track.setLabel('left', label)
+        plot_info['track_lod'] = track_lod
+        plot_info['track_plans'] = {}
+
+    def update_plot_lod(self, plot_info, full_range=False):
+        """Прореженные данные линий под видимый диапазон и ширину графика"""
+        plot = plot_info['plot']
+        timestamps = plot_info['timestamps']
+        if 'lod' not in plot_info or len(timestamps) == 0:
+            return
+
+        if full_range:
+            x_start, x_end = timestamps[0], timestamps[-1]
+        else:
+            x_start, x_end = plot.vb.viewRange()[0]
+
+        # Запас в ширину экрана с каждой стороны - при панорамировании линия не обрывается
+        span = x_end - x_start
+        width = max(int(plot.vb.width()), LOD_MIN_WIDTH)
+        max_points = 3 * LOD_POINTS_PER_PIXEL * width
+
+        # Линии графика газа и дорожки скользящих метрик
+        layers = [(plot_info['lod'], plot_info['curves'], plot_info['lod_plans'])]
+        if 'track_lod' in plot_info:
+            layers.append((plot_info['track_lod'], plot_info['track_curves'], plot_info['track_plans']))
+
+        for pyramids, curves, plans in layers:
+            for col, pyramid in pyramids.items():
+                curve = curves.get(col)
+                if curve is None:
+                    continue
+                plan = pyramid.plan(x_start - span, x_end + span, max_points)
+                # Тот же уровень и те же группы - перерисовка не нужна
+                if plans.get(col) == plan:
+                    continue
+                plans[col] = plan
+                curve.setData(*pyramid.points(plan))
+
+    def refresh_plots(self, auto_range=False):
+        """Перерисовка после смены фильтра или диапазона без пересоздания графиков"""
+        series_list = self.prepare_plot_series()
+
+        # Если набор графиков изменился (например, газ выпал из диапазона) - полное построение
+        layout = [(series['gas_type'], series['data_cols']) for series in series_list]
+        if not self.plots or layout != [(p['gas_type'], p['data_cols']) for p in self.plots]:
+            self.plot_data()
+            return
+
+        self.clear_highlights()
+        self.clear_all_selections()
+        for plot_info, series in zip(self.plots, series_list):
+            # Без автомасштаба сохраняется текущий видимый диапазон
+            self.render_series(plot_info, series, full_range=auto_range)
+            if auto_range:
+                plot_info['plot'].enableAutoRange()
+
+    def on_mouse_moved_throttled(self, event):
+        """Слот SignalProxy: движение мыши с ограничением частоты"""
+        self.on_mouse_moved(event[0])
+
+    def build_crosshair_info(self, plot_info):
+        """Предрасчет для панели значений: эталонные колонки и HTML-подписи колонок"""
+        filtered_data = plot_info['filtered_data']
+        data_cols = [col for col in plot_info['data_cols'] if col in filtered_data]
+        plot_info['crosshair_info'] = {
+            'title': f"<b style='color: #2c3e50; font-size: 13px;'>{plot_info['gas_type']}</b>",
+            # Эталон (Ametek) - первая из этих колонок с валидным значением
+            'reference_cols': [col for col in data_cols if self.logic.is_reference_column(col)],
+            'columns': [(col, f"  <span style='color: #34495e;'>{col}:</span> ", filtered_data[col])
+                        for col in data_cols]
+        }
+
+    def format_crosshair_time(self, plot_data, idx):
+        """Строка времени точки под курсором"""
+        if plot_data['time_data'] is not None:
+            try:
+                return plot_data['time_data'].iloc[idx].strftime('%d.%m.%Y %H:%M:%S')
+            except:
+                return str(plot_data['time_data'].iloc[idx])
+        # Без колонки времени ось X - номера записей
+        return f"Запись {idx}"
+
+    def format_crosshair_values(self, plot_data, idx):
+        """Строки панели значений для одного графика"""
+        info = plot_data['crosshair_info']
+        lines = [info['title']]
+
+        # Поиск эталонного значения (Ametek)
+        reference_value = None
+        reference_col = None
+        for col in info['reference_cols']:
+            value = plot_data['filtered_data'][col][idx]
+            if not np.isnan(value):
+                reference_value = value
+                reference_col = col
+                break
+
+        # Значения параметров с процентной разницей
+        for col, label, values in info['columns']:
+            value = values[idx]
+            if np.isnan(value):
+                # Показываем как N/A, если это не число
+                lines.append(f"{label}<span style='color: #95a5a6;'>N/A</span>")
+                continue
+
+            if np.isfinite(value) and value == int(value):
+                display_str = f"{int(value)}"
+            else:
+                display_str = f"{value:.4f}"
+            lines.append(f"{label}<b style='color: #27ae60;'>{display_str}</b>")
+
+            # Расчет процентной разницы относительно Ametek
+            if reference_value is not None and reference_col != col and reference_value != 0:
+                diff_percent = ((value - reference_value) / reference_value) * 100
+                # Цвет в зависимости от знака разницы
+                color = '#e74c3c' if abs(diff_percent) > 5 else '#95a5a6'
+                sign = '+' if diff_percent > 0 else ''
+                lines.append(f"    <span style='color: {color}; font-size: 11px;'>Δ от эталона: {sign}{diff_percent:.2f}%</span>")
+
+        return lines
 
     def on_mouse_moved(self, pos):
         """Обработчик движения мыши для отображения перекрестия и значений"""
@@ -1244,144 +1849,79 @@ class AnalyzerComparisonApp(QMainWindow):
         if self.selection_mode and len(self.selection_results) > 0:
             return
 
-        info_text = []
-
         # Находим график, над которым находится курсор
         active_plot_idx = None
         active_x = None
+        over_track = False
 
         for i, plot_data in enumerate(self.plots):
             plot = plot_data['plot']
+            track = plot_data.get('track')
 
-            # Проверяем, находится ли курсор в области графика
+            # Проверяем, находится ли курсор в области графика или его дорожки
             if plot.sceneBoundingRect().contains(pos):
                 mouse_point = plot.vb.mapSceneToView(pos)
                 active_x = mouse_point.x()
                 active_plot_idx = i
                 break
+            if track is not None and track.sceneBoundingRect().contains(pos):
+                active_x = track.vb.mapSceneToView(pos).x()
+                active_plot_idx = i
+                over_track = True
+                break
+
+        if active_plot_idx is None:
+            return
+
+        # Линии перекрестия обновляются на каждое событие, ближайшие точки ищутся бинарным поиском
+        indices = []
+        for i, plot_data in enumerate(self.plots):
+            vLine, hLine = self.crosshair_lines[i]
+            vLine.setPos(active_x)
+            if 'track_vline' in plot_data:
+                plot_data['track_vline'].setPos(active_x)
+
+            # Y линию обновляем только для активного графика
+            if i == active_plot_idx and not over_track:
+                hLine.setPos(plot_data['plot'].vb.mapSceneToView(pos).y())
 
-        # Если курсор над каким-то графиком, обновляем все графики
-        if active_plot_idx is not None:
-            for i, plot_data in enumerate(self.plots):
-                plot = plot_data['plot']
-
-                # Обновление линий перекрестия для всех графиков с одинаковым X
-                vLine, hLine = self.crosshair_lines[i]
-                vLine.setPos(active_x)
-
-                # Y линию обновляем только для активного графика
-                if i == active_plot_idx:
-                    mouse_point = plot.vb.mapSceneToView(pos)
-                    y = mouse_point.y()
-                    hLine.setPos(y)
-
-                # Поиск ближайшей точки данных
-                timestamps = plot_data['timestamps']
-                idx = np.argmin(np.abs(timestamps - active_x))
-
-                if idx < len(plot_data['df']):
-                    # Получение данных для отображения
-                    gas_type = plot_data['gas_type']
-
-                    # Время (показываем только один раз)
-                    if i == 0 or len(info_text) == 0:
-                        if plot_data['time_data'] is not None:
-                            try:
-                                time_str = plot_data['time_data'].iloc[idx].strftime('%d.%m.%Y %H:%M:%S')
-                            except:
-                                time_str = str(plot_data['time_data'].iloc[idx])
-                        else:
-                            # Пытаемся получить время из исходной колонки
-                            time_col = plot_data.get('time_col')
-                            if time_col and time_col in plot_data['df'].columns:
-                                try:
-                                    raw_time = plot_data['df'][time_col].iloc[idx]
-                                    # Пытаемся преобразовать в дату
-                                    time_val = pd.to_datetime(raw_time)
-                                    time_str = time_val.strftime('%d.%m.%Y %H:%M:%S')
-                                except:
-                                    # Если не удалось преобразовать, показываем как есть
-                                    time_str = str(raw_time)
-                            else:
-                                time_str = f"Запись {idx}"
-
-                        info_text.append(f"<b>📅 Дата:</b> {time_str}")
-                        info_text.append("")  # Пустая строка для разделения
-
-                    info_text.append(f"<b style='color: #2c3e50; font-size: 13px;'>{gas_type}</b>")
-
-                    # Получаем отфильтрованные данные, если они есть
-                    filtered_data = plot_data.get('filtered_data', {})
-
-                    # Поиск эталонного значения (Ametek) из отфильтрованных данных
-                    reference_value = None
-                    reference_col = None
-                    for col in plot_data['data_cols']:
-                        col_lower = str(col).lower()
-                        if 'ametek' in col_lower or 'амetek' in col_lower:
-                            try:
-                                # Используем отфильтрованные данные, если они есть
-                                if col in filtered_data and len(filtered_data[col]) > idx:
-                                    reference_value = filtered_data[col][idx]
-                                else:
-                                    raw_ref_value = plot_data['df'][col].iloc[idx]
-                                    reference_value = pd.to_numeric(raw_ref_value, errors='coerce')
-
-                                if pd.notna(reference_value):
-                                    reference_col = col
-                                    break
-                            except:
-                                pass
-
-                    # Значения параметров с процентной разницей
-                    for col in plot_data['data_cols']:
-                        try:
-                            # Используем отфильтрованные данные, если они есть
-                            if col in filtered_data and len(filtered_data[col]) > idx:
-                                numeric_value = filtered_data[col][idx]
-                                # Показываем отфильтрованное значение
-                                display_value = numeric_value
-                            else:
-                                # Иначе берем из исходного DataFrame
-                                raw_value = plot_data['df'][col].iloc[idx]
-                                numeric_value = pd.to_numeric(raw_value, errors='coerce')
-                                display_value = raw_value if not pd.isna(raw_value) else numeric_value
-
-                            if pd.notna(numeric_value):
-                                # Форматируем значение для отображения
-                                if isinstance(display_value, (int, float, np.number)):
-                                    display_str = f"{display_value:.4f}" if display_value != int(display_value) else f"{int(display_value)}"
-                                else:
-                                    display_str = str(display_value)
-
-                                info_text.append(f"  <span style='color: #34495e;'>{col}:</span> <b style='color: #27ae60;'>{display_str}</b>")
-
-                                # Расчет процентной разницы относительно Ametek
-                                if reference_value is not None and pd.notna(reference_value) and reference_col != col and reference_value != 0:
-                                    try:
-                                        diff_percent = ((numeric_value - reference_value) / reference_value) * 100
-                                        # Цвет в зависимости от знака разницы
-                                        color = '#e74c3c' if abs(diff_percent) > 5 else '#95a5a6'
-                                        sign = '+' if diff_percent > 0 else ''
-                                        info_text.append(f"    <span style='color: {color}; font-size: 11px;'>Δ от эталона: {sign}{diff_percent:.2f}%</span>")
-                                    except Exception as e:
-                                        print(f"Ошибка расчета разности для {col}: {e}")
-                            else:
-                                # Показываем как N/A, если это не число
-                                info_text.append(f"  <span style='color: #34495e;'>{col}:</span> <span style='color: #95a5a6;'>N/A</span>")
-                        except Exception as e:
-                            print(f"Ошибка обработки колонки {col} в перекрестии: {e}")
-
-                    # Добавляем пустую строку между графиками
-                    if i < len(self.plots) - 1:
-                        info_text.append("")
+            idx = plot_data['time_index'].nearest(active_x, plot_data.get('last_index'))
+            plot_data['last_index'] = idx
+            indices.append(idx)
+
+        # Панель значений перестраивается только при смене ближайших точек
+        if tuple(indices) == self.crosshair_key:
+            return
+        self.crosshair_key = tuple(indices)
+
+        info_text = []
+        for i, (plot_data, idx) in enumerate(zip(self.plots, indices)):
+            if not 0 <= idx < len(plot_data['timestamps']):
+                continue
+
+            # Время (показываем только один раз)
+            if len(info_text) == 0:
+                info_text.append(f"<b>📅 Дата:</b> {self.format_crosshair_time(plot_data, idx)}")
+                info_text.append("")  # Пустая строка для разделения
+
+            try:
+                info_text.extend(self.format_crosshair_values(plot_data, idx))
+            except Exception as e:
+                print(f"Ошибка обработки перекрестия для {plot_data['gas_type']}: {e}")
+
+            # Добавляем пустую строку между графиками
+            if i < len(self.plots) - 1:
+                info_text.append("")
 
         if info_text:
             self.info_label.setText('<br>'.join(info_text))
 
     def clear_all(self):
         """Очистка всех данных и графиков"""
+        self.cancel_loading()
+        self.finish_selection_worker()
         self.data_files = {}
+        self.plot_pipeline.clear()
         self.plot_widget.clear()
         self.plots = []
         self.crosshair_lines = []
@@ -1394,12 +1934,11 @@ class AnalyzerComparisonApp(QMainWindow):
         self.btn_plot.setEnabled(False)
         self.btn_debug.setEnabled(False)
         self.btn_filter_outliers.setEnabled(False)
+        self.btn_lag_mode.setEnabled(False)
         self.info_label.setText('Наведите курсор на график для отображения значений')
 
         # Очищаем таблицу и селектор
-        self.data_table.clear()
-        self.data_table.setRowCount(0)
-        self.data_table.setColumnCount(0)
+        self.set_table_model(DataTableModel())
         self.file_selector.clear()
         self.file_selector.addItem('Выберите файл...')
         self.selection_info.setText('Выберите строку в таблице для выделения на графике')
@@ -1419,6 +1958,12 @@ class AnalyzerComparisonApp(QMainWindow):
         self.btn_selection_mode.setEnabled(False)
         self.btn_clear_selection.setEnabled(False)
 
+    def clear_data_cache(self):
+        """Очистка дискового кэша разобранных файлов"""
+        removed = self.data_cache.clear()
+        logger.info(f"Кэш очищен, удалено записей: {removed}")
+        QMessageBox.information(self, 'Кэш', f'Кэш очищен. Удалено записей: {removed}')
+
     def show_data_debugger(self):
         """Показ визуального отладчика данных"""
         if not self.data_files:
@@ -1427,7 +1972,7 @@ class AnalyzerComparisonApp(QMainWindow):
 
         # Создаем и показываем окно отладчика
         debugger = DataDebuggerDialog(self)
-        debugger.analyze_data(self.data_files)
+        debugger.analyze_data(self.data_files, self.plot_pipeline, self.selection_cache)
         debugger.exec_()
 
     def update_file_selector(self):
@@ -1441,56 +1986,28 @@ class AnalyzerComparisonApp(QMainWindow):
     def on_file_selector_changed(self, file_type):
         """Обработка изменения выбранного файла"""
         if file_type == 'Выберите файл...' or file_type not in self.data_files:
-            self.data_table.clear()
-            self.data_table.setRowCount(0)
-            self.data_table.setColumnCount(0)
+            self.set_table_model(DataTableModel())
             self.selection_info.setText('Выберите файл для отображения данных')
             return
 
         self.populate_data_table(file_type)
 
+    def set_table_model(self, model):
+        """Установка модели таблицы и подключение сигнала выбора строки"""
+        self.data_table.setModel(model)
+        self.data_table.selectionModel().selectionChanged.connect(self.on_table_selection_changed)
+
     def populate_data_table(self, file_type):
         """Заполнение таблицы данными из выбранного файла"""
         try:
-            df = self.data_files[file_type]['data']
-
-            # Определяем колонки для отображения
-            time_col, data_cols = self.identify_columns(df)
-            display_cols = [time_col] + data_cols
-
-            # Настраиваем таблицу
-            self.data_table.setRowCount(len(df))
-            self.data_table.setColumnCount(len(display_cols))
-            self.data_table.setHorizontalHeaderLabels(display_cols)
-
-            # Заполняем данными
-            for row in range(len(df)):
-                for col_idx, col_name in enumerate(display_cols):
-                    value = df[col_name].iloc[row]
-
-                    # Форматируем значение для отображения
-                    if col_name == time_col:
-                        # Время - показываем как есть
-                        display_value = str(value)
-                    else:
-                        # Числовые данные - форматируем
-                        try:
-                            numeric_val = pd.to_numeric(value, errors='coerce')
-                            if pd.notna(numeric_val):
-                                display_value = f"{numeric_val:.4f}"
-                            else:
-                                display_value = str(value)
-                        except:
-                            display_value = str(value)
-
-                    item = QTableWidgetItem(display_value)
-                    item.setData(Qt.UserRole, row)  # Сохраняем индекс строки
-                    self.data_table.setItem(row, col_idx, item)
+            file_data = self.data_files[file_type]
+            model = DataTableModel(file_data)
+            self.set_table_model(model)
 
             # Автоматически подгоняем ширину колонок
             self.data_table.resizeColumnsToContents()
 
-            self.selection_info.setText(f'Отображается {len(df)} записей из файла {file_type}')
+            self.selection_info.setText(f'Отображается {model.rowCount()} записей из файла {file_type}')
 
         except Exception as e:
             self.show_error(f'Ошибка при заполнении таблицы: {str(e)}')
@@ -1503,14 +2020,14 @@ class AnalyzerComparisonApp(QMainWindow):
 
     def on_table_selection_changed(self):
         """Обработка изменения выбора в таблице"""
-        selected_items = self.data_table.selectedItems()
-        if not selected_items:
+        selected_rows = self.data_table.selectionModel().selectedRows()
+        if not selected_rows:
             self.clear_highlights()
             self.selection_info.setText('Выберите строку в таблице для выделения на графике')
             return
 
         # Получаем индекс выбранной строки
-        row_index = selected_items[0].data(Qt.UserRole)
+        row_index = selected_rows[0].data(Qt.UserRole)
         if row_index is None:
             return
 
@@ -1541,37 +2058,30 @@ class AnalyzerComparisonApp(QMainWindow):
             if not plot_data:
                 return
 
-            # Получаем данные для выделения
-            timestamps = plot_data['timestamps']
-            df = plot_data['df']
-
-            if row_index >= len(timestamps) or row_index >= len(df):
+            # Строка файла -> позиция на графике (после сортировки и среза по диапазону)
+            positions = np.flatnonzero(plot_data['source_rows'] == row_index)
+            if len(positions) == 0:
                 return
+            position = positions[0]
 
             # Координаты точки для выделения
-            x_coord = timestamps[row_index]
+            x_coord = plot_data['timestamps'][position]
 
             # Выделяем точку на каждой линии графика
             plot = plot_data['plot']
-            data_cols = plot_data['data_cols']
-
-            for col in data_cols:
-                try:
-                    # Получаем значение для этой колонки
-                    value = pd.to_numeric(df[col].iloc[row_index], errors='coerce')
-                    if pd.notna(value):
-                        # Создаем маркер выделения
-                        highlight_item = pg.ScatterPlotItem(
-                            [x_coord], [value],
-                            pen=pg.mkPen('red', width=3),
-                            brush=pg.mkBrush('red'),
-                            size=10,
-                            symbol='o'
-                        )
-                        plot.addItem(highlight_item)
-                        self.highlight_items.append(highlight_item)
-                except:
-                    continue
+            for col, values in plot_data['filtered_data'].items():
+                value = values[position]
+                if np.isfinite(value):
+                    # Создаем маркер выделения
+                    highlight_item = pg.ScatterPlotItem(
+                        [x_coord], [value],
+                        pen=pg.mkPen('red', width=3),
+                        brush=pg.mkBrush('red'),
+                        size=10,
+                        symbol='o'
+                    )
+                    plot.addItem(highlight_item)
+                    self.highlight_items.append(highlight_item)
 
         except Exception as e:
             print(f"Ошибка при выделении точки: {e}")
@@ -1637,8 +2147,86 @@ class AnalyzerComparisonApp(QMainWindow):
         # Автоматически перестроить графики, если данные загружены
         if len(self.plots) > 0:
             print("[FILTER] Перестроение графиков с новыми настройками...")
+            self.refresh_plots()
+
+    def toggle_lag_mode(self, checked):
+        """Переключение учета задержки между анализаторами"""
+        self.lag_mode = checked
+        self.btn_lag_mode.setStyleSheet(self.get_filter_button_style(checked))
+        self.btn_lag_mode.setText('⏱ Учет задержки (ВКЛ)' if checked else '⏱ Учет задержки')
+
+        if self.selection_results:
+            # Пересчитать текущие выделения со сдвигом (или без него)
+            results = list(self.selection_results.items())
+            if all('formatted_text' in result for _, result in results):
+                for plot_index, result in results:
+                    self.process_selection(plot_index, *result['range'])
+            else:
+                self.process_all_selections(*results[0][1]['range'])
+        elif checked and self.plots:
+            self.show_series_lags()
+
+    def estimate_plot_lags(self, plot_data, x_start, x_end):
+        """Задержки анализаторов графика относительно эталона в диапазоне (взаимная корреляция через FFT)"""
+        lo, hi = plot_data['time_index'].bounds(x_start, x_end)
+        filtered_data = plot_data['filtered_data']
+        values = {col: filtered_data[col][lo:hi] for col in plot_data['data_cols'] if col in filtered_data}
+        return reference_lags(plot_data['timestamps'][lo:hi], values)
+
+    def show_series_lags(self):
+        """Задержки по всему построенному ряду каждого графика"""
+        lines = ["<b style='font-size: 14px; color: #2980b9;'>⏱ ЗАДЕРЖКА ОТНОСИТЕЛЬНО ЭТАЛОНА (весь ряд)</b>"]
+        for plot_data in self.plots:
+            timestamps = plot_data['timestamps']
+            if len(timestamps) == 0:
+                continue
+            if plot_data.get('series_lags') is None:
+                plot_data['series_lags'] = self.estimate_plot_lags(plot_data, timestamps[0], timestamps[-1])
+            lines.append(f"<b>{plot_data['gas_type']}:</b>")
+            lines.extend(self.format_lag_lines(plot_data['series_lags']))
+        self.info_label.setText('<br>'.join(lines))
+
+    def format_lag_lines(self, lags):
+        """Строки с задержками анализаторов (положительная - анализатор отстает от эталона)"""
+        lines = []
+        for col, lag in lags.items():
+            if lag is None:
+                lines.append(f"  • <b>{col}:</b> <span style='color: #95a5a6;'>недостаточно данных</span>")
+                continue
+            limit_str = " <span style='color: #f39c12;'>граница поиска</span>" if lag['at_limit'] else ""
+            lines.append(
+                f"  • <b>{col}:</b> {lag['lag']:+.0f} с "
+                f"<span style='color: #3498db;'>(r={lag['correlation']:.4f}, "
+                f"без сдвига r={lag['zero_lag_correlation']:.4f})</span>{limit_str}"
+            )
+        return lines
+
+    def toggle_rolling_tracks(self, checked):
+        """Показать/скрыть дорожки скользящих метрик под графиками"""
+        self.rolling_tracks_enabled = checked
+        self.rolling_window_combo.setEnabled(checked)
+        self.rolling_metric_combo.setEnabled(checked)
+
+        # Меняется раскладка графиков - полное построение
+        if self.plots:
             self.plot_data()
 
+    def on_rolling_window_changed(self, index):
+        """Смена окна скользящего расчета"""
+        self.rolling_window = self.rolling_window_combo.itemData(index)
+        for plot_info in self.plots:
+            if 'track' in plot_info:
+                self.compute_rolling_tracks(plot_info)
+                self.update_plot_lod(plot_info)
+
+    def on_rolling_metric_changed(self, index):
+        """Смена метрики дорожек (пересчет не нужен - все метрики уже рассчитаны)"""
+        self.rolling_metric = self.rolling_metric_combo.itemData(index)
+        for plot_info in self.plots:
+            if 'track' in plot_info:
+                self.build_track_lod(plot_info)
+                self.update_plot_lod(plot_info)
+                plot_info['track'].enableAutoRange(axis='y')
 
     def open_scale_settings(self):
         """Открыть диалог настройки шкал приборов"""
@@ -1653,6 +2241,12 @@ class AnalyzerComparisonApp(QMainWindow):
                     accuracy = settings.get('accuracy_class', 'не указано')
                     print(f"    {analyzer}: шкала={scale} мг/м³, класс точности={accuracy}%")
 
+            # Приведенная погрешность дорожек зависит от шкал
+            for plot_info in self.plots:
+                if 'track' in plot_info:
+                    self.compute_rolling_tracks(plot_info)
+                    self.update_plot_lod(plot_info)
+
     # ==================== МЕТОДЫ ВЫБОРКИ ДИАПАЗОНА ====================
 
     def get_button_style(self, active):
@@ -1934,12 +2528,14 @@ class AnalyzerComparisonApp(QMainWindow):
 
     def clear_all_selections(self):
         """Удалить все выделения со всех графиков"""
+        self.finish_selection_worker()
         for i in range(len(self.plots)):
             self.clear_selection_on_plot(i)
 
         self.selection_regions.clear()
         self.selection_results.clear()
         self.temp_selection_regions.clear()
+        self.crosshair_key = None
         self.btn_clear_selection.setEnabled(False)
 
         # Восстановить сообщение в info_label
@@ -1955,7 +2551,7 @@ class AnalyzerComparisonApp(QMainWindow):
             )
 
 
-    def format_selection_results(self, gas_type, x_start, x_end, averages, comparisons, plot_data):
+    def format_selection_results(self, gas_type, x_start, x_end, averages, comparisons, plot_data, lags=None):
         """Форматировать результаты выборки для отображения в info_label"""
         lines = []
 
@@ -1987,7 +2583,7 @@ class AnalyzerComparisonApp(QMainWindow):
             lines.append(
                 f"  • <b>{col}:</b> {stats['mean']:.4f} мг/м³ "
                 f"<span style='color: #7f8c8d; font-size: 10px;'>"
-                f"(n={stats['count']})</span>"
+                f"(медиана {stats['median']:.4f}, n={stats['count']})</span>"
             )
 
         # Сравнения
@@ -2034,6 +2630,12 @@ class AnalyzerComparisonApp(QMainWindow):
                     f"{error_str}"
                 )
 
+        # Задержки (в режиме их учета сравнения выше рассчитаны со сдвигом)
+        if lags:
+            lines.append("")
+            lines.append("<b style='color: #8e44ad;'>⏱ Задержка относительно эталона (учтена):</b>")
+            lines.extend(self.format_lag_lines(lags))
+
         return '<br>'.join(lines)
 
     def format_all_selection_results(self, x_start, x_end, results_by_plot):
@@ -2081,7 +2683,7 @@ class AnalyzerComparisonApp(QMainWindow):
             for col, stats in averages.items():
                 html += f"""
                         <span style='font-size: 10px;'>• <b>{col}:</b> {stats['mean']:.4f} мг/м³
-                        <span style='color: #7f8c8d; font-size: 9px;'>(n={stats['count']})</span></span><br>
+                        <span style='color: #7f8c8d; font-size: 9px;'>(медиана {stats['median']:.4f}, n={stats['count']})</span></span><br>
                 """
 
             # Сравнения
@@ -2128,6 +2730,16 @@ class AnalyzerComparisonApp(QMainWindow):
                         <span style='color: #3498db;'>{corr_str}</span>{error_str}</span><br>
                     """
 
+            # Задержки (в режиме их учета сравнения выше рассчитаны со сдвигом)
+            if result.get('lags'):
+                html += """
+                        <b style='color: #8e44ad; font-size: 10px;'>⏱ Задержка (учтена):</b><br>
+                """
+                for line in self.format_lag_lines(result['lags']):
+                    html += f"""
+                        <span style='font-size: 10px;'>{line.strip()}</span><br>
+                    """
+
             # Конец колонки
             html += """
                     </td>
@@ -2142,67 +2754,151 @@ class AnalyzerComparisonApp(QMainWindow):
 
         return html
 
-    def process_all_selections(self, x_start, x_end):
-        """Обработать выделение для всех графиков одновременно"""
-        results_by_plot = []
+    def compute_selection(self, plot_data, x_start, x_end):
+        """Данные выделения графика: (extracted_data, averages, aligned_data, paired_stats, lags)"""
+        time_index = plot_data['time_index']
+        filtered_data = plot_data['filtered_data']
+        offset = plot_data['range_offset']
 
-        for plot_index in range(len(self.plots)):
-            plot_data = self.plots[plot_index]
-            gas_type = plot_data['gas_type']
+        # В режиме учета задержки ряд каждого анализатора сдвигается на его задержку
+        lags = self.estimate_plot_lags(plot_data, x_start, x_end) if self.lag_mode else {}
+        shifts = {col: lags[col]['lag'] if lags.get(col) else 0.0 for col in plot_data['data_cols']}
 
-            # Извлечь данные в диапазоне
-            timestamps = plot_data['timestamps']
-            filtered_data = plot_data['filtered_data']
-            data_cols = plot_data['data_cols']
-            
-            extracted_data = {}
-            for col in data_cols:
-                if col in filtered_data:
-                    values = filtered_data[col]
-                    extracted = self.logic.extract_range_data(timestamps, values, x_start, x_end)
-                    if extracted is not None:
-                        extracted_data[col] = extracted
-
-            if not extracted_data or len(extracted_data) == 0:
+        # Сортированный индекс времени: диапазон ищется бинарным поиском
+        extracted_data = {}
+        averages = {}
+        for col in plot_data['data_cols']:
+            if col not in filtered_data:
+                continue
+            start, end = x_start + shifts[col], x_end + shifts[col]
+            extracted = self.logic.extract_range_data(time_index, filtered_data[col], start, end)
+            if extracted is not None:
+                extracted_data[col] = extracted
+
+            # Среднее, СКО, мин/макс - из префиксных сумм индекса диапазонов
+            index = plot_data['range_stats'][col]
+            stats = self.logic.calculate_range_averages(time_index, {col: index}, start, end, offset,
+                                                        median=False).get(col)
+            if stats is None:
                 continue
 
-            # Рассчитать средние значения
-            averages = self.logic.calculate_averages(extracted_data)
+            # Медиана: при перетаскивании обрабатываются только вошедшие и вышедшие отсчеты
+            sliding = plot_data['sliding'].get(col)
+            if sliding is None or sliding.values is not index.values:
+                sliding = plot_data['sliding'][col] = SlidingWindowStats(index.values)
+            lo, hi = time_index.bounds(start, end)
+            stats['median'] = sliding.move(offset + lo, offset + hi)['median']
+            averages[col] = stats
+
+        # Пары отсчетов, сопоставленные по времени (без сдвига - кэшированные конвейером)
+        aligned_data = None
+        paired_stats = None
+        if any(shifts.values()):
+            aligned_data = {}
+            for col1, col2 in plot_data['aligned']:
+                pair = align_pair(plot_data['timestamps'], filtered_data[col1], filtered_data[col2],
+                                  lag=shifts[col2] - shifts[col1])
+                aligned_data.update(self.logic.extract_aligned_pairs(
+                    {(col1, col2): pair}, time_index, x_start + shifts[col1], x_end + shifts[col1]
+                ))
+        else:
+            # Корреляция и разность пар тоже обновляются по краям выделения
+            lo, hi = time_index.bounds(x_start, x_end)
+            paired_stats = {}
+            for key, pair in plot_data['aligned'].items():
+                sliding = plot_data['sliding_pairs'].get(key)
+                if sliding is None or sliding.pair is not pair:
+                    sliding = plot_data['sliding_pairs'][key] = SlidingPairStats(pair)
+                paired_stats[key] = sliding.move(*pair.bounds(offset + lo, offset + hi))
+
+        return extracted_data, averages, aligned_data, paired_stats, lags
+
+    def selection_cache_key(self, plot_data, x_start, x_end):
+        """Ключ кэша результатов выделения: версия данных, границы в отсчетах, режимы и шкалы"""
+        lo, hi = plot_data['time_index'].bounds(x_start, x_end)
+        offset = plot_data['range_offset']
+        # Со сдвигом на задержку границы рядов зависят от точных значений, а не только от отсчетов
+        window = (x_start, x_end) if self.lag_mode else None
+        return (plot_data['gas_type'], plot_data['version'], offset + lo, offset + hi,
+                plot_data['filter_outliers'], self.lag_mode, window,
+                scales_key(self.analyzer_scales, plot_data['gas_type']))
+
+    def compute_all_selections(self, x_start, x_end, remember=True):
+        """
+        Результаты выделения по всем графикам (без обращения к виджетам - выполняется и в фоновом потоке).
+        remember=False - промежуточные положения при перетаскивании не вытесняют окна из кэша
+        """
+        results_by_plot = []
 
-            # Рассчитать попарные сравнения с корреляцией и приведенной погрешностью
-            comparisons = self.logic.calculate_comparisons(
-                averages, extracted_data, self.analyzer_scales, gas_type
-            )
+        for plot_index, plot_data in enumerate(list(self.plots)):
+            gas_type = plot_data['gas_type']
 
-            # Сохранить результаты
-            self.selection_results[plot_index] = {
-                'gas_type': gas_type,
-                'range': (x_start, x_end),
-                'averages': averages,
-                'comparisons': comparisons
-            }
+            key = self.selection_cache_key(plot_data, x_start, x_end)
+            cached = self.selection_cache.get(key)
+            if cached is None:
+                # Извлечь данные в диапазоне (в режиме учета задержки - со сдвигом)
+                extracted_data, averages, aligned_data, paired_stats, lags = self.compute_selection(
+                    plot_data, x_start, x_end
+                )
+
+                if not extracted_data or len(extracted_data) == 0:
+                    cached = ()
+                else:
+                    # Рассчитать попарные сравнения с корреляцией и приведенной погрешностью
+                    comparisons = self.logic.calculate_comparisons(
+                        averages, extracted_data, self.analyzer_scales, gas_type, aligned_data, paired_stats
+                    )
+                    cached = (averages, comparisons, lags)
+                if remember:
+                    self.selection_cache.put(key, cached)
+
+            if not cached:
+                continue
+            averages, comparisons, lags = cached
 
             results_by_plot.append({
                 'plot_index': plot_index,
                 'gas_type': gas_type,
                 'averages': averages,
                 'comparisons': comparisons,
+                'lags': lags,
                 'plot_data': plot_data
             })
 
+        return results_by_plot
+
+    def show_all_selection_results(self, x_start, x_end, results_by_plot):
+        """Сохранить и отобразить результаты выделения всех графиков"""
+        for result in results_by_plot:
+            self.selection_results[result['plot_index']] = {
+                'gas_type': result['gas_type'],
+                'range': (x_start, x_end),
+                'averages': result['averages'],
+                'comparisons': result['comparisons'],
+                'lags': result['lags']
+            }
+
+        formatted_text = self.format_all_selection_results(x_start, x_end, results_by_plot)
+        self.info_label.setText(formatted_text)
+
+    def process_all_selections(self, x_start, x_end):
+        """Обработать выделение для всех графиков одновременно"""
+        # Фоновый пересчет, если он идет, устаревает
+        self.finish_selection_worker()
+        results_by_plot = self.compute_all_selections(x_start, x_end)
+
         # Форматировать и отобразить результаты для всех графиков
         if results_by_plot:
-            formatted_text = self.format_all_selection_results(x_start, x_end, results_by_plot)
-            self.info_label.setText(formatted_text)
+            self.show_all_selection_results(x_start, x_end, results_by_plot)
 
             # Сделать LinearRegionItem перемещаемыми после создания
             for region in self.temp_selection_regions:
                 region.setMovable(True)
                 self.selection_regions.append(region)
 
-                # Подключить сигнал для автоматического пересчета при изменении
-                # Используем lambda с замыканием для передачи всех графиков
+                # Пересчет при перемещении - в фоне, с ограничением частоты и по окончании перетаскивания
                 region.sigRegionChanged.connect(self.on_any_selection_region_changed)
+                region.sigRegionChangeFinished.connect(self.on_selection_region_change_finished)
 
             self.temp_selection_regions.clear()
 
@@ -2216,21 +2912,12 @@ class AnalyzerComparisonApp(QMainWindow):
 
     def process_selection(self, plot_index, x_start, x_end):
         """Обработать выделение: извлечь данные, рассчитать и отобразить результаты"""
+        self.finish_selection_worker()
         plot_data = self.plots[plot_index]
         gas_type = plot_data['gas_type']
 
-        # Извлечь данные в диапазоне
-        timestamps = plot_data['timestamps']
-        filtered_data = plot_data['filtered_data']
-        data_cols = plot_data['data_cols']
-        
-        extracted_data = {}
-        for col in data_cols:
-            if col in filtered_data:
-                values = filtered_data[col]
-                extracted = self.logic.extract_range_data(timestamps, values, x_start, x_end)
-                if extracted is not None:
-                    extracted_data[col] = extracted
+        # Извлечь данные в диапазоне (в режиме учета задержки - со сдвигом)
+        extracted_data, averages, aligned_data, paired_stats, lags = self.compute_selection(plot_data, x_start, x_end)
 
         if not extracted_data or len(extracted_data) == 0:
             self.info_label.setText(
@@ -2239,17 +2926,14 @@ class AnalyzerComparisonApp(QMainWindow):
             self.clear_selection_on_plot(plot_index)
             return
 
-        # Рассчитать средние значения
-        averages = self.logic.calculate_averages(extracted_data)
-
         # Рассчитать попарные сравнения с корреляцией и приведенной погрешностью
         comparisons = self.logic.calculate_comparisons(
-            averages, extracted_data, self.analyzer_scales, gas_type
+            averages, extracted_data, self.analyzer_scales, gas_type, aligned_data, paired_stats
         )
 
         # Форматировать и отобразить результаты
         formatted_text = self.format_selection_results(
-            gas_type, x_start, x_end, averages, comparisons, plot_data
+            gas_type, x_start, x_end, averages, comparisons, plot_data, lags
         )
         self.info_label.setText(formatted_text)
 
@@ -2259,6 +2943,7 @@ class AnalyzerComparisonApp(QMainWindow):
             'range': (x_start, x_end),
             'averages': averages,
             'comparisons': comparisons,
+            'lags': lags,
             'formatted_text': formatted_text
         }
 
@@ -2279,19 +2964,84 @@ class AnalyzerComparisonApp(QMainWindow):
 
     def on_any_selection_region_changed(self):
         """Обработчик изменения любого выделения (пользователь переместил/изменил размер)"""
-        # Получаем новые границы из первого региона (все синхронизированы)
         if len(self.selection_regions) == 0:
             return
 
-        first_region = self.selection_regions[0]
-        x_start, x_end = first_region.getRegion()
+        # Границы берутся из перемещаемого региона
+        source = self.sender()
+        if source not in self.selection_regions:
+            source = self.selection_regions[0]
+        x_start, x_end = source.getRegion()
+
+        # Синхронизируем остальные регионы (без их сигналов - иначе каждый шаг выглядит как конец перетаскивания)
+        for region in self.selection_regions:
+            if region is not source:
+                region.blockSignals(True)
+                region.setRegion([x_start, x_end])
+                region.blockSignals(False)
+
+        # Пересчет - не чаще раза в SELECTION_UPDATE_MS, в фоновом потоке
+        if not self.selection_timer.isActive():
+            self.selection_timer.start()
+
+    def on_selection_region_change_finished(self):
+        """Перетаскивание закончено - итоговый пересчет без ожидания таймера"""
+        self.selection_timer.stop()
+        self.schedule_selection_update(final=True)
+
+    def schedule_selection_update(self, final=False):
+        """Запросить пересчет текущего выделения в фоне (final - окончательное положение, запоминается в кэше)"""
+        if len(self.selection_regions) == 0:
+            return
+        x_start, x_end = self.selection_regions[0].getRegion()
+        self.selection_generation += 1
+        self.pending_selection = (self.selection_generation, x_start, x_end, final)
+
+        # Пока идет расчет, хранится только последний запрос
+        if self.selection_worker is None:
+            self.start_selection_worker()
+
+    def start_selection_worker(self):
+        """Запуск фонового пересчета ожидающего запроса"""
+        generation, x_start, x_end, final = self.pending_selection
+        self.pending_selection = None
+        compute = partial(self.compute_all_selections, remember=final)
+        worker = SelectionWorker(generation, x_start, x_end, compute, self)
+        worker.computed.connect(self.on_selection_computed)
+        worker.finished.connect(worker.deleteLater)
+        self.selection_worker = worker
+        worker.start()
+
+    def on_selection_computed(self, generation, x_start, x_end, results_by_plot):
+        """Результат фонового пересчета: устаревшие результаты отбрасываются"""
+        worker = self.selection_worker
+        if worker is None or worker.generation != generation:
+            # Поток уже дождались при синхронном расчете или очистке
+            return
+        self.selection_worker = None
+
+        if self.pending_selection is not None:
+            # Выделение сдвинулось во время расчета - считаем последнее положение
+            self.start_selection_worker()
+            return
+        if generation != self.selection_generation or len(self.selection_regions) == 0 or results_by_plot is None:
+            return
 
-        # Синхронизируем все регионы
-        for region in self.selection_regions[1:]:
-            region.setRegion([x_start, x_end])
+        if results_by_plot:
+            self.show_all_selection_results(x_start, x_end, results_by_plot)
+        else:
+            self.info_label.setText(
+                '<span style="color: #e74c3c;">В выбранном диапазоне нет данных.</span>'
+            )
 
-        # Пересчитать для всех графиков с новыми границами
-        self.process_all_selections(x_start, x_end)
+    def finish_selection_worker(self):
+        """Дождаться фонового пересчета и отменить запланированные (перед синхронным расчетом или очисткой)"""
+        self.selection_timer.stop()
+        self.pending_selection = None
+        self.selection_generation += 1
+        if self.selection_worker is not None:
+            self.selection_worker.wait()
+            self.selection_worker = None
 
     def on_selection_region_changed(self, plot_index):
         """Обработчик изменения выделения (пользователь переместил/изменил размер)"""
@@ -2,7 +2,17 @@
 import pandas as pd
 import numpy as np
 import logging
+import time
+import warnings
 from itertools import combinations
+from numeric_conversion import to_float_array
+from pair_matrix import pairwise_stats
+from time_index import TimeIndex
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    guess_datetime_format = None
 
 class AnalyzerLogic:
     """
@@ -10,8 +20,20 @@ class AnalyzerLogic:
     Handles data parsing, conversion, filtering, and statistical calculations.
     """
 
+    # Explicit timestamp formats seen in historian exports
+    DATE_FORMATS = [
+        '%d.%m.%Y %H:%M',         # No seconds
+        '%d.%m.%Y %H:%M:%S',
+        '%Y-%m-%d %H:%M:%S',
+        '%Y-%m-%d %H:%M',
+    ]
+
+    # Number of distinct date strings used to infer the dominant format
+    DATE_SAMPLE_SIZE = 500
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.last_parse_stats = None
 
     def identify_columns(self, df):
         """
@@ -46,9 +68,9 @@ class AnalyzerLogic:
             try:
                 sample = df[col].dropna().head(100)
                 if len(sample) > 0:
-                    # Try converting sample
-                    numeric_sample = pd.to_numeric(sample, errors='coerce')
-                    if numeric_sample.notna().any():
+                    # Try converting sample (decimal comma aware)
+                    numeric_sample = to_float_array(sample)
+                    if np.isfinite(numeric_sample).any():
                         data_cols.append(col)
             except:
                 pass
@@ -60,15 +82,9 @@ class AnalyzerLogic:
         Optimized numeric conversion using vectorization.
         Handles comma as decimal separator.
         """
-        # Convert to string, replace comma with dot, then to numeric
-        # This is much faster than iterating row by row
-        if series.dtype == object:
-            # Only do string manipulation if it's an object type (strings)
-            series_str = series.astype(str).str.replace(',', '.', regex=False)
-            return pd.to_numeric(series_str, errors='coerce')
-        else:
-            # Already numeric or compatible
-            return pd.to_numeric(series, errors='coerce')
+        # Single pass: numeric cells stay as they are, only string cells with a
+        # decimal comma are parsed a second time (see numeric_conversion)
+        return pd.Series(to_float_array(series), index=series.index, name=series.name)
 
     def apply_outlier_filter(self, numeric_values):
         """
@@ -102,50 +118,136 @@ class AnalyzerLogic:
         
         return s_final.values
 
+    def infer_date_format(self, values):
+        """
+        Pick the format that parses most of a sample of date strings.
+        Returns None if no candidate parses anything.
+        """
+        if len(values) == 0:
+            return None
+
+        # Evenly spaced sample so both the start and the end of the file are represented
+        step = max(1, len(values) // self.DATE_SAMPLE_SIZE)
+        sample = pd.Series(values[::step][:self.DATE_SAMPLE_SIZE])
+
+        # Explicit formats win ties: the dayfirst guess of an ISO string swaps day and month
+        candidates = list(self.DATE_FORMATS)
+        if guess_datetime_format is not None:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                guessed = guess_datetime_format(str(sample.iloc[0]), dayfirst=True)
+            if guessed and guessed not in candidates:
+                candidates.append(guessed)
+
+        best_format, best_count = None, 0
+        for fmt in candidates:
+            count = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+            if count > best_count:
+                best_format, best_count = fmt, count
+                if count == len(sample):
+                    break
+        return best_format
+
     def parse_dates(self, series):
         """
         Robust date parsing with multiple strategies.
-        Returns parsed Series and success boolean.
+        Each distinct value is parsed once; the dominant format is inferred from
+        a sample and applied in one pass (then the next one on the strings left,
+        for files mixing formats), only the residual goes through the slower
+        fallback chain. Per-strategy timings are kept in self.last_parse_stats.
+        Returns parsed Series.
         """
-        # 1. Try dayfirst=True (most common for RU locale)
-        parsed = pd.to_datetime(series, dayfirst=True, errors='coerce')
-        
-        if parsed.isna().all():
-             # 2. Try dayfirst=False
-            parsed = pd.to_datetime(series, dayfirst=False, errors='coerce')
-
-        # 3. If still have NaNs, try specific formats for remaining invalid
-        if parsed.isna().any():
-            # Formats to try for stubborn values
-            formats = [
-                '%d.%m.%Y %H:%M',         # No seconds
-                '%d.%m.%Y %H:%M:%S',
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%d %H:%M',
-            ]
-            
-            for fmt in formats:
-                mask = parsed.isna()
-                if not mask.any():
+        stats = {'rows': len(series), 'format': None, 'timings': {}, 'parsed': {}}
+        self.last_parse_stats = stats
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            stats['parsed']['already_datetime'] = int(series.notna().sum())
+            return series
+
+        # 1. Unique-value memoization: repeated strings are parsed once
+        t0 = time.perf_counter()
+        codes, uniques = pd.factorize(series)
+        uniques = pd.Series(np.asarray(uniques, dtype=object))
+        parsed_uniques = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+        stats['unique'] = len(uniques)
+        stats['timings']['factorize'] = time.perf_counter() - t0
+
+        # 2. Cells that are already datetimes (native Excel dates)
+        t0 = time.perf_counter()
+        if pd.api.types.infer_dtype(uniques, skipna=True) == 'string':
+            is_string = np.ones(len(uniques), dtype=bool)
+        else:
+            is_string = uniques.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+        if (~is_string).any():
+            non_strings = uniques[~is_string]
+            parsed_uniques[~is_string] = pd.to_datetime(non_strings, errors='coerce')
+            stats['parsed']['native'] = int(parsed_uniques[~is_string].notna().sum())
+        stats['timings']['native'] = time.perf_counter() - t0
+
+        # 3. Dominant format, explicit one-pass parse; repeated on the rest for files mixing formats
+        strings = uniques[is_string]
+        if len(strings) > 0:
+            t0 = time.perf_counter()
+            formats = []
+            for _ in range(len(self.DATE_FORMATS) + 1):
+                rest = strings[parsed_uniques[strings.index].isna().to_numpy()]
+                fmt = self.infer_date_format(rest.to_numpy()) if len(rest) else None
+                if fmt is None or fmt in formats:
                     break
-                
-                try:
-                    # Try parsing only the invalid ones
-                    subset = pd.to_datetime(series[mask], format=fmt, errors='coerce')
-                    # Fill in successful parses
-                    parsed = parsed.fillna(subset)
-                except:
-                    pass
+                formats.append(fmt)
+                # Values are already unique, pandas' own conversion cache would only add work
+                parsed_uniques[rest.index] = pd.to_datetime(rest, format=fmt, errors='coerce', cache=False)
+                stats['parsed'][f'format:{fmt}'] = int(parsed_uniques[rest.index].notna().sum())
+            stats['format'] = formats[0] if formats else None
+            stats['timings']['format'] = time.perf_counter() - t0
+
+        # 4. Fallback chain for the residual only, in the original order: dayfirst=True,
+        # dayfirst=False only when nothing has parsed at all, then the explicit formats
+        strategies = [('dayfirst=True', {'dayfirst': True}), ('dayfirst=False', {'dayfirst': False})]
+        strategies += [(f'format:{fmt}', {'format': fmt}) for fmt in self.DATE_FORMATS]
+        for name, kwargs in strategies:
+            residual = parsed_uniques.isna().to_numpy() & is_string
+            if not residual.any():
+                break
+            if name == 'dayfirst=False' and parsed_uniques.notna().any():
+                continue
+            t0 = time.perf_counter()
+            try:
+                # Guessing strategies: format-inference warnings are expected here
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', UserWarning)
+                    subset = pd.to_datetime(uniques[residual].str.strip(), errors='coerce', **kwargs)
+                parsed_uniques = parsed_uniques.fillna(subset)
+                stats['parsed'][f'fallback:{name}'] = int(subset.notna().sum())
+            except Exception:
+                pass
+            stats['timings'][f'fallback:{name}'] = time.perf_counter() - t0
+
+        # Map unique results back onto the rows (code -1 means missing value)
+        values = parsed_uniques.to_numpy()
+        result = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+        present = codes >= 0
+        result[present] = values[codes[present]]
+        parsed = pd.Series(result, index=series.index)
 
+        total_time = sum(stats['timings'].values())
+        timings = ', '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in stats['timings'].items())
+        self.logger.info(f"Date parsing: {parsed.notna().sum()}/{len(series)} rows, {stats['unique']} unique, "
+                         f"format={stats['format']}, {total_time * 1000:.1f}ms ({timings})")
         return parsed
 
     def extract_range_data(self, timestamps, data_values, x_start, x_end):
         """
         Extract data within a time range.
+        With a TimeIndex the range is found by binary search and a view is returned.
         """
         if len(timestamps) != len(data_values):
             return None
-            
+
+        if isinstance(timestamps, TimeIndex):
+            extracted = timestamps.slice(data_values, x_start, x_end)
+            return extracted if len(extracted) > 0 else None
+
         # Create mask
         if isinstance(timestamps, pd.Series):
             mask = (timestamps >= x_start) & (timestamps <= x_end)
@@ -177,9 +279,72 @@ class AnalyzerLogic:
                 }
         return results
 
-    def calculate_comparisons(self, averages, extracted_data, analyzer_scales=None, gas_type=None):
+    def calculate_range_averages(self, time_index, range_stats, x_start, x_end, offset=0, median=True):
+        """
+        Same statistics as calculate_averages, read from precomputed RangeStatsIndex
+        objects: the range is located on the TimeIndex and mean/std/count/min/max
+        come from prefix sums and min/max tables. offset maps positions of the
+        TimeIndex to positions of the indexed arrays. median=False skips the
+        only O(k) statistic.
+        """
+        lo, hi = time_index.bounds(x_start, x_end)
+        results = {}
+        for col, index in range_stats.items():
+            stats = index.stats(offset + lo, offset + hi, median)
+            if stats is not None:
+                results[col] = stats
+        return results
+
+    def extract_aligned_pairs(self, aligned, time_index, x_start, x_end, offset=0):
+        """
+        (x, y) arrays of every aligned pair ({(col1, col2): AlignedPair}) whose
+        first sample lies within the time range; offset maps positions of the
+        TimeIndex to the rows the pairs were built on.
+        """
+        lo, hi = time_index.bounds(x_start, x_end)
+        return {pair: aligned_pair.range(offset + lo, offset + hi) for pair, aligned_pair in aligned.items()}
+
+    @staticmethod
+    def is_reference_column(col):
+        """
+        Reference analyzer (Ametek) columns are recognised by name.
+        """
+        col_lower = str(col).lower()
+        return 'ametek' in col_lower or 'амetek' in col_lower
+
+    @staticmethod
+    def reference_column(columns):
+        """
+        Column the other analyzers are compared with: the first reference (Ametek) column, or the first column.
+        """
+        columns = list(columns)
+        if not columns:
+            return None
+        return next((col for col in columns if AnalyzerLogic.is_reference_column(col)), columns[0])
+
+    @staticmethod
+    def pair_scale(analyzer_scales, gas_type, col1, col2):
+        """
+        Scale the reduced error of a pair is taken against: the larger configured scale, or None.
+        """
+        if not (analyzer_scales and gas_type and gas_type in analyzer_scales):
+            return None
+        scale1 = analyzer_scales[gas_type].get(col1, {}).get('scale')
+        scale2 = analyzer_scales[gas_type].get(col2, {}).get('scale')
+
+        if scale1 and scale2:
+            return max(scale1, scale2)
+        return scale1 or scale2 or None
+
+    def calculate_comparisons(self, averages, extracted_data, analyzer_scales=None, gas_type=None,
+                              aligned_data=None, paired_stats=None):
         """
         Calculate pairwise comparisons.
+        aligned_data ({(col1, col2): (x, y)}, see extract_aligned_pairs) pairs the
+        samples by time for the correlation and the paired difference; without it
+        the columns are assumed to be row-aligned and all pairs are computed at
+        once (pair_matrix). paired_stats ({(col1, col2): SlidingPairStats.stats()})
+        gives those results directly for its pairs.
         """
         comparisons = []
         col_names = list(averages.keys())
@@ -187,80 +352,125 @@ class AnalyzerLogic:
         if len(col_names) < 2:
             return comparisons
 
+        # Reference (Ametek) first in every pair
+        pairs = []
         for col1, col2 in combinations(col_names, 2):
-            mean1 = averages[col1]['mean']
-            mean2 = averages[col2]['mean']
-
-            # Determine reference (Ametek)
-            col1_lower = col1.lower()
-            col2_lower = col2.lower()
-            is_col1_ref = 'ametek' in col1_lower or 'амetek' in col1_lower
-            is_col2_ref = 'ametek' in col2_lower or 'амetek' in col2_lower
-
-            if is_col1_ref:
-                base_mean = mean1
-                diff_abs = mean2 - mean1
-            elif is_col2_ref:
-                # Swap so col1 is reference
+            if not self.is_reference_column(col1) and self.is_reference_column(col2):
                 col1, col2 = col2, col1
-                mean1, mean2 = mean2, mean1
-                base_mean = mean1
-                diff_abs = mean2 - mean1
-            else:
-                base_mean = mean1
-                diff_abs = mean2 - mean1
+            pairs.append((col1, col2))
 
-            # Relative difference
-            if base_mean != 0:
-                diff_pct = (diff_abs / base_mean) * 100
-            else:
-                diff_pct = np.nan if diff_abs != 0 else 0.0
+        # Differences of the means and reduced errors of all pairs at once
+        position = {col: i for i, col in enumerate(col_names)}
+        means = np.array([averages[col]['mean'] for col in col_names], dtype=np.float64)
+        mean1 = means[[position[col1] for col1, _ in pairs]]
+        mean2 = means[[position[col2] for _, col2 in pairs]]
+        diff_abs = mean2 - mean1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diff_pct = np.where(mean1 != 0, diff_abs / mean1 * 100, np.where(diff_abs != 0, np.nan, 0.0))
+        scales = [self.pair_scale(analyzer_scales, gas_type, col1, col2) for col1, col2 in pairs]
+        reduced_errors = diff_abs / np.array([scale or np.nan for scale in scales]) * 100.0
 
-            # Correlation
-            correlation = np.nan
-            try:
-                data1 = extracted_data.get(col1)
-                data2 = extracted_data.get(col2)
-                
-                if data1 is not None and data2 is not None:
-                    # Align lengths if needed (should be same from extract_range_data but safe check)
-                    min_len = min(len(data1), len(data2))
-                    d1 = data1[:min_len]
-                    d2 = data2[:min_len]
-                    
-                    valid = np.isfinite(d1) & np.isfinite(d2)
-                    if valid.sum() > 1:
-                        correlation = np.corrcoef(d1[valid], d2[valid])[0, 1]
-            except Exception as e:
-                self.logger.error(f"Correlation error {col1} vs {col2}: {e}")
-
-            # Reduced error
-            reduced_error = None
-            if analyzer_scales and gas_type and gas_type in analyzer_scales:
-                scale1 = analyzer_scales[gas_type].get(col1, {}).get('scale')
-                scale2 = analyzer_scales[gas_type].get(col2, {}).get('scale')
-                
-                max_scale = None
-                if scale1 and scale2:
-                    max_scale = max(scale1, scale2)
-                elif scale1:
-                    max_scale = scale1
-                elif scale2:
-                    max_scale = scale2
-                    
-                if max_scale:
-                    reduced_error = (diff_abs / max_scale) * 100.0
+        # Correlation and mean difference over samples paired by time
+        paired = self._pair_results(pairs, extracted_data, aligned_data, paired_stats)
 
+        for k, (col1, col2) in enumerate(pairs):
+            correlation, paired_count, paired_diff = paired[k]
             comparisons.append({
                 'pair': (col1, col2),
-                'mean1': mean1,
-                'mean2': mean2,
-                'diff_abs': diff_abs,
-                'diff_pct': diff_pct,
+                'mean1': float(mean1[k]),
+                'mean2': float(mean2[k]),
+                'diff_abs': float(diff_abs[k]),
+                'diff_pct': float(diff_pct[k]),
                 'count1': averages[col1]['count'],
                 'count2': averages[col2]['count'],
                 'correlation': correlation,
-                'reduced_error': reduced_error
+                'paired_count': paired_count,
+                'paired_diff': paired_diff,
+                'reduced_error': float(reduced_errors[k]) if scales[k] else None
             })
 
         return comparisons
+
+    def _pair_results(self, pairs, extracted_data, aligned_data=None, paired_stats=None):
+        """
+        (correlation, paired_count, paired_diff) of every pair: from paired_stats,
+        from the time-aligned samples, or for row-aligned columns of equal length
+        from one pairwise_stats matrix computation.
+        """
+        results = [(np.nan, 0, np.nan)] * len(pairs)
+        row_aligned = []
+        for k, (col1, col2) in enumerate(pairs):
+            stats, sign = None, 1.0
+            if paired_stats is not None:
+                stats = paired_stats.get((col1, col2))
+                if stats is None and (col2, col1) in paired_stats:
+                    stats, sign = paired_stats[(col2, col1)], -1.0
+            if stats is not None:
+                results[k] = (stats['correlation'], stats['paired_count'], sign * stats['paired_diff'])
+            elif aligned_data is not None and ((col1, col2) in aligned_data or (col2, col1) in aligned_data):
+                results[k] = self._sample_results(col1, col2, extracted_data, aligned_data)
+            else:
+                row_aligned.append(k)
+
+        if not row_aligned:
+            return results
+        columns = {col: extracted_data.get(col) for k in row_aligned for col in pairs[k]}
+        present = [col for col, data in columns.items() if data is not None]
+        if len({len(columns[col]) for col in present}) > 1:
+            # Columns of different lengths are truncated pair by pair
+            for k in row_aligned:
+                results[k] = self._sample_results(*pairs[k], extracted_data)
+            return results
+
+        if len(present) > 1:
+            matrix = pairwise_stats(np.column_stack([columns[col] for col in present]))
+            index = {col: i for i, col in enumerate(present)}
+            for k in row_aligned:
+                col1, col2 = pairs[k]
+                if col1 in index and col2 in index:
+                    i, j = index[col1], index[col2]
+                    count = int(matrix['count'][i, j])
+                    paired_diff = float(matrix['mean_diff'][i, j]) if count > 0 else np.nan
+                    results[k] = (matrix['correlation'][i, j], count, paired_diff)
+        return results
+
+    def _sample_results(self, col1, col2, extracted_data, aligned_data=None):
+        """
+        (correlation, paired_count, paired_diff) of one pair from its samples.
+        """
+        correlation = np.nan
+        paired_count = 0
+        paired_diff = np.nan
+        try:
+            pair = self._paired_samples(col1, col2, extracted_data, aligned_data)
+            if pair is not None:
+                d1, d2 = pair
+                valid = np.isfinite(d1) & np.isfinite(d2)
+                paired_count = int(valid.sum())
+                if paired_count > 0:
+                    paired_diff = float(np.mean(d2[valid] - d1[valid]))
+                if paired_count > 1:
+                    correlation = np.corrcoef(d1[valid], d2[valid])[0, 1]
+        except Exception as e:
+            self.logger.error(f"Correlation error {col1} vs {col2}: {e}")
+        return correlation, paired_count, paired_diff
+
+    @staticmethod
+    def _paired_samples(col1, col2, extracted_data, aligned_data=None):
+        """
+        (data1, data2) of a pair: time-aligned arrays when available, otherwise
+        the extracted ranges truncated to a common length (row-aligned columns).
+        """
+        if aligned_data is not None:
+            if (col1, col2) in aligned_data:
+                return aligned_data[(col1, col2)]
+            if (col2, col1) in aligned_data:
+                data2, data1 = aligned_data[(col2, col1)]
+                return data1, data2
+
+        data1 = extracted_data.get(col1)
+        data2 = extracted_data.get(col2)
+        if data1 is None or data2 is None:
+            return None
+        min_len = min(len(data1), len(data2))
+        return data1[:min_len], data2[:min_len]
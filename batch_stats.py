@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch statistics over time windows (no PyQt5 needed).
+Loads the exports of each gas and computes the selection statistics and
+pairwise comparisons for a list of windows at once. Consecutive windows
+(every hour/day/shift/...) go through the grouped WindowStatsEngine; explicit,
+possibly overlapping ranges are located with one vectorized binary search and
+answered from prefix sums (count/mean/std, correlations), one reduceat pass
+(min/max) and one sort (medians). Results go to CSV or Excel.
+
+    python batch_stats.py --h2s H2S.xlsx --so2 week1.xlsx week2.xlsx --every shift -o report.xlsx
+    python batch_stats.py --h2s H2S.csv --range "01.10.2025 08:00" "01.10.2025 20:00" -o report.csv
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from data_cache import DataCache
+from data_loader import load_data_file
+from campaign_loader import load_campaign
+from centered_sums import range_sums, windowed_correlation
+from plot_pipeline import PlotPipeline
+from series_store import compact_file_data
+from time_alignment import get_pair
+from time_index import TimeIndex
+from window_stats import (PERIODS, STATS_COLUMNS, COMPARISON_COLUMNS, WindowStatsEngine,
+                          window_boundaries, tidy_tables)
+
+logger = logging.getLogger(__name__)
+
+
+def explicit_windows(ranges):
+    """
+    (starts, ends) int64 nanoseconds for a list of (start, end) date strings or timestamps.
+    """
+    starts = [pd.to_datetime(start, dayfirst=True).value for start, _ in ranges]
+    ends = [pd.to_datetime(end, dayfirst=True).value for _, end in ranges]
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+
+def pair_correlations(x, y, lo, hi):
+    """
+    Pearson correlation of x and y over the rows where both are finite, for
+    every range [lo, hi) at once (NaN with fewer than two such rows).
+    """
+    return windowed_correlation(x, y, range_sums(lo, hi))
+
+
+def window_statistics(series, starts, ends, analyzer_scales=None, median=True):
+    """
+    Statistics and comparisons of one prepared series (PlotPipeline.prepare)
+    for arbitrary closed windows [starts[i], ends[i]] (int64 nanoseconds):
+    tidy tables as produced by window_stats.tidy_tables.
+    """
+    epoch = series['time_data'].to_numpy().view('int64')
+    lo, hi = TimeIndex(epoch).bounds_many(starts, ends)
+    offset = series['range_offset']
+    stats = {col: series['range_stats'][col].stats_many(offset + lo, offset + hi, median)
+             for col in series['data_cols']}
+
+    def correlation(col1, col2):
+        # Over the samples the pipeline paired by time
+        pair = get_pair(series['aligned'], col1, col2)
+        pair_lo, pair_hi = pair.bounds(offset + lo, offset + hi)
+        return pair_correlations(pair.x, pair.y, pair_lo, pair_hi)
+
+    return tidy_tables(series['gas_type'], starts, ends, series['data_cols'], stats, correlation, analyzer_scales)
+
+
+def batch_statistics(data_files, windows=None, every=None, filter_outliers=False,
+                     analyzer_scales=None, median=True, logic=None):
+    """
+    Window statistics for data_files ({gas_type: data_files entry}, as in the GUI).
+    windows is (starts, ends) in int64 nanoseconds; with every (a window_stats
+    period or a fixed step) consecutive windows over the time span of all files
+    are used instead, the same for every gas. Returns (stats, comparisons) DataFrames.
+    """
+    logic = logic or AnalyzerLogic()
+    pipeline = PlotPipeline(logic)
+    series_list = []
+    for gas_type, file_data in data_files.items():
+        if not (file_data.get('time_col') and file_data.get('data_cols')):
+            logger.warning(f"{gas_type}: no time or data columns, skipped")
+            continue
+        series = pipeline.prepare(gas_type, file_data, filter_outliers)
+        if series['time_data'] is None or len(series['timestamps']) == 0:
+            logger.warning(f"{gas_type}: no rows with a valid time, skipped")
+            continue
+        series_list.append(series)
+
+    if windows is None and every is None:
+        raise ValueError('either windows or every must be given')
+    if not series_list:
+        return pd.DataFrame(columns=STATS_COLUMNS), pd.DataFrame(columns=COMPARISON_COLUMNS)
+
+    boundaries = None
+    if windows is None:
+        first = min(series['time_data'].iloc[0] for series in series_list)
+        last = max(series['time_data'].iloc[-1] for series in series_list)
+        boundaries = window_boundaries(first, last, every)
+    engine = WindowStatsEngine(logic)
+
+    stats_frames, comparison_frames = [], []
+    for series in series_list:
+        if boundaries is not None:
+            epoch = series['time_data'].to_numpy().view('int64')
+            stats, comparisons = engine.statistics(epoch, series['values'], boundaries,
+                                                   series['gas_type'], analyzer_scales, median)
+        else:
+            stats, comparisons = window_statistics(series, *windows, analyzer_scales, median)
+        logger.info(f"{series['gas_type']}: {len(stats)} analyzer rows, {len(comparisons)} comparison rows")
+        stats_frames.append(stats)
+        comparison_frames.append(comparisons)
+
+    return pd.concat(stats_frames, ignore_index=True), pd.concat(comparison_frames, ignore_index=True)
+
+
+def load_gas(paths, logic, cache=None):
+    """
+    data_files entry for one gas: a single export, or a campaign of several files / a folder.
+    """
+    if len(paths) == 1 and os.path.isfile(paths[0]):
+        file_data = load_data_file(paths[0], logic, cache)
+    else:
+        file_data = load_campaign(paths, cache)
+    return compact_file_data(file_data)
+
+
+def write_results(stats, comparisons, output):
+    """
+    Write both tables: two sheets of one .xlsx, or <name>_stats.csv and
+    <name>_comparisons.csv (';' separated, decimal comma, as Excel opens them
+    with Russian settings). Returns the written paths.
+    """
+    root, extension = os.path.splitext(output)
+    if extension.lower() in ('.xlsx', '.xlsm'):
+        with pd.ExcelWriter(output) as writer:
+            stats.to_excel(writer, sheet_name='Статистика', index=False)
+            comparisons.to_excel(writer, sheet_name='Сравнения', index=False)
+        return [output]
+
+    paths = [f"{root}_stats.csv", f"{root}_comparisons.csv"]
+    for table, path in zip((stats, comparisons), paths):
+        table.to_csv(path, sep=';', decimal=',', index=False, encoding='utf-8-sig',
+                     date_format='%d.%m.%Y %H:%M:%S')
+    return paths
+
+
+def period(text):
+    """
+    argparse type for --every: a calendar period or a fixed step.
+    """
+    if text in PERIODS:
+        return text
+    try:
+        if pd.Timedelta(text) > pd.Timedelta(0):
+            return text
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"неизвестный период: {text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Статистика анализаторов по временным окнам без графического интерфейса')
+    parser.add_argument('--h2s', nargs='+', metavar='ФАЙЛ', help='файл(ы) или папка H2S')
+    parser.add_argument('--so2', nargs='+', metavar='ФАЙЛ', help='файл(ы) или папка SO2')
+    windows = parser.add_mutually_exclusive_group(required=True)
+    windows.add_argument('--range', nargs=2, action='append', metavar=('НАЧАЛО', 'КОНЕЦ'),
+                         help='окно "дд.мм.гггг чч:мм" (можно указать несколько раз)')
+    windows.add_argument('--every', type=period, metavar='ПЕРИОД',
+                         help='окна hour, day, shift, week, month или фиксированный шаг (15min, 2h)')
+    parser.add_argument('--filter-outliers', action='store_true', help='заменять выбросы 0/1 (как кнопка фильтра)')
+    parser.add_argument('--scales', metavar='JSON', help='шкалы анализаторов: {газ: {анализатор: {"scale": ...}}}')
+    parser.add_argument('--no-median', action='store_true', help='не считать медианы')
+    parser.add_argument('--no-cache', action='store_true', help='не использовать дисковый кэш')
+    parser.add_argument('-o', '--output', default='batch_stats.xlsx', help='файл результата (.xlsx или .csv)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sources = {gas: paths for gas, paths in (('H2S', args.h2s), ('SO2', args.so2)) if paths}
+    if not sources:
+        parser.error('укажите --h2s и/или --so2')
+
+    analyzer_scales = None
+    if args.scales:
+        with open(args.scales, 'r', encoding='utf-8') as f:
+            analyzer_scales = json.load(f)
+
+    logic = AnalyzerLogic()
+    cache = None if args.no_cache else DataCache()
+    data_files = {gas: load_gas(paths, logic, cache) for gas, paths in sources.items()}
+
+    stats, comparisons = batch_statistics(
+        data_files,
+        windows=explicit_windows(args.range) if args.range else None,
+        every=args.every,
+        filter_outliers=args.filter_outliers,
+        analyzer_scales=analyzer_scales,
+        median=not args.no_median,
+        logic=logic
+    )
+    for path in write_results(stats, comparisons, args.output):
+        print(f"Сохранено: {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Reproducible performance benchmarks on large synthetic exports.
+generate_export builds a historian-like table of any size (10k .. 10M rows):
+timestamps as strings in mixed formats, analyzer values as decimal-comma
+strings mixed with native numbers, empty cells, 0/1 dropouts and outage gaps.
+The data-path functions of AnalyzerLogic and a headless plot_data are timed
+on it (best and median of several runs) and the results are written as JSON
+together with the commit and library versions, so runs on different commits
+can be compared with --compare.
+
+    python benchmark.py --rows 10k 100k 1M -o bench_results.json
+    python benchmark.py --rows 1M --compare bench_baseline.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+import subprocess
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from time_index import TimeIndex
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS = ('parse_dates', 'manual_numeric_conversion', 'apply_outlier_filter', 'extract_range_data',
+              'calculate_averages', 'calculate_comparisons', 'plot_data')
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+
+TIME_COL = 'Дата и время'
+ANALYZER_NAMES = ['Ametek', 'ЭкоСпектр', 'Хромос', 'ГАНК', 'Оптэк']
+
+# Timestamp formats of the export and the share of rows written in each
+DATE_MIX = (('%d.%m.%Y %H:%M:%S', 0.85), ('%d.%m.%Y %H:%M', 0.10), ('%Y-%m-%d %H:%M:%S', 0.05))
+
+# Ratio of a run's best time to the baseline's above which --compare reports a regression
+REGRESSION_THRESHOLD = 1.25
+
+
+def generate_export(rows, analyzers=3, seed=0, step=60, start='2025-09-01',
+                    dropout_share=0.005, empty_share=0.005, native_share=0.2, gaps=None, return_times=False):
+    """
+    Synthetic export of rows rows (DataFrame with TIME_COL and one column per analyzer).
+    Samples come every step seconds with gaps outages of up to a day (default: one
+    per 50k rows); values are a shared drifting signal plus per-analyzer bias and
+    noise, written as decimal-comma strings except native_share of the cells.
+    dropout_share of the cells are 0/1 dropouts (single cells and short runs),
+    empty_share are empty strings. The same arguments give the same table.
+    With return_times, (table, true timestamps as a DatetimeIndex) is returned.
+    """
+    rng = np.random.default_rng(seed)
+    if gaps is None:
+        gaps = rows // 50_000 + 1
+
+    # Time axis: regular steps, a few long outages
+    steps = np.full(rows, float(step))
+    steps[0] = 0.0
+    outages = rng.choice(np.arange(1, rows), size=min(gaps, rows - 1), replace=False) if rows > 1 else []
+    steps[outages] += rng.integers(1, 24 * 3600 // step, size=len(outages)) * step
+    times = pd.Timestamp(start) + pd.to_timedelta(np.cumsum(steps), unit='s')
+
+    dates = np.empty(rows, dtype=object)
+    formats = rng.choice(len(DATE_MIX), size=rows, p=[share for _, share in DATE_MIX])
+    for i, (fmt, _) in enumerate(DATE_MIX):
+        rows_in_format = np.flatnonzero(formats == i)
+        dates[rows_in_format] = times[rows_in_format].strftime(fmt)
+
+    signal = 5.0 + np.cumsum(rng.normal(0, 0.02, rows)) + np.sin(np.arange(rows) * 2 * np.pi / 1440)
+    data = {TIME_COL: dates}
+    for k in range(analyzers):
+        values = np.round(np.abs(signal * (1 + 0.02 * k) + 0.1 * k + rng.normal(0, 0.1, rows)), 4)
+
+        # 0/1 dropouts: half single cells, half runs of 10 samples
+        singles = rng.random(rows) < dropout_share / 2
+        run_starts = np.flatnonzero(rng.random(rows) < dropout_share / 20)
+        runs = np.zeros(rows, dtype=bool)
+        for offset in range(10):
+            runs[np.minimum(run_starts + offset, rows - 1)] = True
+        dropouts = singles | runs
+        values[dropouts] = rng.integers(0, 2, size=int(dropouts.sum()))
+
+        cells = np.char.replace(np.char.mod('%.4f', values), '.', ',').astype(object)
+        native = rng.random(rows) < native_share
+        cells[native] = values[native]
+        cells[dropouts] = np.where(values[dropouts] == 0, '0', '1')
+        cells[rng.random(rows) < empty_share] = ''
+        data[ANALYZER_NAMES[k] if k < len(ANALYZER_NAMES) else f'Анализатор {k + 1}'] = cells
+    df = pd.DataFrame(data)
+    return (df, times) if return_times else df
+
+
+def time_call(func, repeat=3, setup=None):
+    """
+    Run func repeat times ({'best', 'median', 'runs'} in seconds); setup() runs untimed before each call.
+    """
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - t0)
+    return {'best': min(runs), 'median': float(np.median(runs)), 'runs': runs}
+
+
+def time_plot_data(df, parsed_dates, data_cols, repeat=3):
+    """
+    plot_data of the GUI for the export loaded as H2S, without a display
+    (offscreen Qt platform). Every run starts from a cold pipeline.
+    Returns None when PyQt5/pyqtgraph are not installed.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PyQt5.QtWidgets import QApplication
+        import analyzer_comparison
+    except ImportError as e:
+        logger.warning(f"plot_data skipped: {e}")
+        return None
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = analyzer_comparison.AnalyzerComparisonApp()
+
+    def setup():
+        # New data version: nothing is reused from the previous run
+        window.plot_pipeline.clear()
+        window.data_files = {'H2S': {'path': '<synthetic>', 'data': df, 'time_col': TIME_COL,
+                                     'data_cols': list(data_cols), 'parsed_dates': parsed_dates}}
+
+    result = time_call(window.plot_data, repeat, setup)
+    window.close()
+    app.processEvents()
+    return result
+
+
+def run_benchmarks(rows_list=DEFAULT_ROWS, repeat=3, analyzers=3, seed=0, only=None):
+    """
+    Time every benchmark (or those in only) on an export of each size.
+    Returns a list of {'benchmark', 'rows', 'best', 'median', 'runs'}.
+    """
+    only = set(only or BENCHMARKS)
+    logic = AnalyzerLogic()
+    results = []
+
+    def record(name, rows, timing):
+        if timing is None:
+            return
+        results.append({'benchmark': name, 'rows': rows, **timing})
+        logger.info(f"{name} [{rows}]: best {timing['best'] * 1000:.1f} ms")
+
+    for rows in rows_list:
+        t0 = time.perf_counter()
+        df = generate_export(rows, analyzers, seed)
+        logger.info(f"Generated {rows} rows in {time.perf_counter() - t0:.1f} s")
+        data_cols = [col for col in df.columns if col != TIME_COL]
+
+        # Prepared inputs for the later stages, computed once outside the timings
+        parsed_dates = logic.parse_dates(df[TIME_COL])
+        numeric = {col: logic.manual_numeric_conversion(df[col]).to_numpy() for col in data_cols}
+        filtered = {col: np.asarray(logic.apply_outlier_filter(values), dtype=np.float64)
+                    for col, values in numeric.items()}
+        valid = np.flatnonzero(parsed_dates.notna().to_numpy())
+        order = valid[np.argsort(parsed_dates.to_numpy()[valid], kind='stable')]
+        seconds = parsed_dates.to_numpy()[order].astype('datetime64[ns]').view('int64') / 1e9
+        time_index = TimeIndex(seconds)
+        values = {col: filtered[col][order] for col in data_cols}
+
+        # Selection: the middle half of the series
+        x_start = seconds[len(seconds) // 4]
+        x_end = seconds[3 * len(seconds) // 4]
+        extracted = {col: logic.extract_range_data(time_index, values[col], x_start, x_end) for col in data_cols}
+        averages = logic.calculate_averages(extracted)
+
+        if 'parse_dates' in only:
+            record('parse_dates', rows, time_call(lambda: logic.parse_dates(df[TIME_COL]), repeat))
+        if 'manual_numeric_conversion' in only:
+            record('manual_numeric_conversion', rows, time_call(
+                lambda: [logic.manual_numeric_conversion(df[col]) for col in data_cols], repeat))
+        if 'apply_outlier_filter' in only:
+            record('apply_outlier_filter', rows, time_call(
+                lambda: [logic.apply_outlier_filter(values) for values in numeric.values()], repeat))
+        if 'extract_range_data' in only:
+            record('extract_range_data', rows, time_call(
+                lambda: [logic.extract_range_data(time_index, values[col], x_start, x_end) for col in data_cols],
+                repeat))
+        if 'calculate_averages' in only:
+            record('calculate_averages', rows, time_call(lambda: logic.calculate_averages(extracted), repeat))
+        if 'calculate_comparisons' in only:
+            record('calculate_comparisons', rows, time_call(
+                lambda: logic.calculate_comparisons(averages, extracted), repeat))
+        if 'plot_data' in only:
+            record('plot_data', rows, time_plot_data(df, parsed_dates, data_cols, repeat))
+    return results
+
+
+def git_commit():
+    """
+    Current commit hash of the working tree, or None outside a git checkout.
+    """
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def benchmark_report(results, repeat, analyzers, seed):
+    """
+    JSON-ready report: results plus the commit, library versions and settings they were measured with.
+    """
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine()
+        },
+        'settings': {'repeat': repeat, 'analyzers': analyzers, 'seed': seed},
+        'results': results
+    }
+
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Best-time ratios current / baseline for the benchmarks present in both reports:
+    a list of {'benchmark', 'rows', 'baseline', 'current', 'ratio', 'regression'}.
+    """
+    previous = {(r['benchmark'], r['rows']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        old = previous.get((result['benchmark'], result['rows']))
+        if old is None or not old['best'] > 0:
+            continue
+        ratio = result['best'] / old['best']
+        rows.append({'benchmark': result['benchmark'], 'rows': result['rows'], 'baseline': old['best'],
+                     'current': result['best'], 'ratio': ratio, 'regression': ratio > threshold})
+    return rows
+
+
+def row_count(text):
+    """
+    argparse type for --rows: an integer with an optional k/M suffix (10k, 2.5M).
+    """
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    text = text.strip()
+    try:
+        if text[-1:].lower() in multipliers:
+            rows = int(float(text[:-1]) * multipliers[text[-1].lower()])
+        else:
+            rows = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"неверное число строк: {text}")
+    if rows < 2:
+        raise argparse.ArgumentTypeError(f"нужно не меньше 2 строк: {text}")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Замеры производительности на синтетических выгрузках')
+    parser.add_argument('--rows', nargs='+', type=row_count, default=list(DEFAULT_ROWS), metavar='N',
+                        help='размеры выгрузки, строк (например 10k 100k 1M 10M)')
+    parser.add_argument('--repeat', type=int, default=3, help='повторов каждого замера (берется лучший)')
+    parser.add_argument('--analyzers', type=int, default=3, help='колонок анализаторов')
+    parser.add_argument('--seed', type=int, default=0, help='зерно генератора данных')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, metavar='ЗАМЕР',
+                        help=f"только указанные замеры: {', '.join(BENCHMARKS)}")
+    parser.add_argument('-o', '--output', default='bench_results.json', help='файл результатов (JSON)')
+    parser.add_argument('--compare', metavar='JSON', help='сравнить с результатами другого запуска')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='отношение времен, выше которого замедление считается регрессией')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Per-call logging of the measured functions would only add noise and time
+    logging.getLogger('analyzer_logic').setLevel(logging.WARNING)
+    logging.getLogger('analyzer_comparison').setLevel(logging.WARNING)
+
+    results = run_benchmarks(args.rows, args.repeat, args.analyzers, args.seed, args.only)
+    report = benchmark_report(results, args.repeat, args.analyzers, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{'Замер':28s} {'Строк':>10s} {'Лучшее, мс':>12s} {'Медиана, мс':>12s}")
+    for r in results:
+        print(f"{r['benchmark']:28s} {r['rows']:>10d} {r['best'] * 1000:>12.3f} {r['median'] * 1000:>12.3f}")
+    print(f"Сохранено: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_results(baseline, report, args.threshold)
+        print(f"\nСравнение с {args.compare} (коммит {baseline.get('commit')}):")
+        if not comparison:
+            print("  нет замеров с теми же размерами")
+        for r in comparison:
+            flag = '  <- РЕГРЕССИЯ' if r['regression'] else ''
+            print(f"{r['benchmark']:28s} {r['rows']:>10d} {r['baseline'] * 1000:>10.1f} -> "
+                  f"{r['current'] * 1000:>10.1f} мс  x{r['ratio']:.2f}{flag}")
+        if any(r['regression'] for r in comparison):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
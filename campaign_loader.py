@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Campaign loader: many exports per gas merged into one time series.
+Files are read in parallel, each file becomes a time-sorted chunk, and
+the chunks are combined with a k-way merge (pairwise merge tree), then
+rows with equal timestamps are merged column by column. Overlaps and gaps between files are reported.
+"""
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from data_loader import load_data_file, LoadCancelled
+from csv_reader import CSV_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+DATA_EXTENSIONS = ('.xlsx', '.xlsm', '.xls') + CSV_EXTENSIONS
+
+# Gap between files is reported when it exceeds this many sampling intervals
+GAP_FACTOR = 2.0
+
+
+def collect_files(source):
+    """
+    Expand a folder or a list of files/folders into a sorted list of data files.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = [source]
+
+    files = []
+    for item in source:
+        if os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                # Skip Excel lock files (~$name.xlsx)
+                if name.startswith('~$'):
+                    continue
+                if os.path.splitext(name)[1].lower() in DATA_EXTENSIONS:
+                    files.append(os.path.join(item, name))
+        else:
+            files.append(item)
+    return files
+
+
+def _load_chunk(path, cache):
+    """
+    Load one file and return it as a time-sorted chunk (runs in a worker).
+    """
+    file_data = load_data_file(path, AnalyzerLogic(), cache)
+    parsed_dates = file_data['parsed_dates']
+    if parsed_dates is None:
+        raise ValueError(f'{path}: time column not found')
+
+    ts = np.asarray(parsed_dates, dtype='datetime64[ns]').view('int64')
+    valid = parsed_dates.notna().to_numpy()
+    ts = ts[valid]
+    values = {col: file_data['numeric'][col][valid] for col in file_data['data_cols']}
+
+    # Exports are normally already in time order; sort only when they are not
+    if len(ts) > 1 and np.any(ts[1:] < ts[:-1]):
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order]
+        values = {col: arr[order] for col, arr in values.items()}
+
+    return {
+        'path': path,
+        'time_col': file_data['time_col'],
+        'data_cols': file_data['data_cols'],
+        'ts': ts,
+        'values': values,
+        'rows': len(file_data['data'])
+    }
+
+
+def merge_two(a, b, columns):
+    """
+    Merge two time-sorted chunks; on equal timestamps rows of `a` come first.
+    """
+    a_ts, b_ts = a['ts'], b['ts']
+    n_a, n_b = len(a_ts), len(b_ts)
+
+    def column(chunk, col, n):
+        values = chunk['values'].get(col)
+        return values if values is not None else np.full(n, np.nan)
+
+    # Non-overlapping chunks just concatenate
+    if n_a == 0 or n_b == 0 or a_ts[-1] <= b_ts[0]:
+        return {
+            'ts': np.concatenate([a_ts, b_ts]),
+            'values': {col: np.concatenate([column(a, col, n_a), column(b, col, n_b)]) for col in columns}
+        }
+
+    # Output position of every b row: number of a rows <= it plus its own rank
+    pos_b = np.searchsorted(a_ts, b_ts, side='right') + np.arange(n_b)
+    from_b = np.zeros(n_a + n_b, dtype=bool)
+    from_b[pos_b] = True
+
+    ts = np.empty(n_a + n_b, dtype=np.int64)
+    ts[from_b] = b_ts
+    ts[~from_b] = a_ts
+
+    values = {}
+    for col in columns:
+        merged = np.empty(n_a + n_b, dtype=np.float64)
+        merged[from_b] = column(b, col, n_b)
+        merged[~from_b] = column(a, col, n_a)
+        values[col] = merged
+    return {'ts': ts, 'values': values}
+
+
+def kway_merge(chunks, columns):
+    """
+    Merge k sorted chunks with a balanced tree of pairwise merges, O(n log k).
+    """
+    if not chunks:
+        return {'ts': np.empty(0, dtype=np.int64), 'values': {col: np.empty(0) for col in columns}}
+
+    level = list(chunks)
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level) - 1, 2):
+            next_level.append(merge_two(level[i], level[i + 1], columns))
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+
+    # A single chunk never went through merge_two - fill in missing columns
+    merged = level[0]
+    n = len(merged['ts'])
+    return {
+        'ts': merged['ts'],
+        'values': {col: merged['values'].get(col, np.full(n, np.nan)) for col in columns}
+    }
+
+
+def drop_duplicates(merged):
+    """
+    Collapse every run of equal timestamps into one row: each column takes the
+    first finite value of the run (files earlier in the merge first), so a
+    column present only in a later file is not lost.
+    """
+    ts = merged['ts']
+    if len(ts) < 2:
+        return merged, 0
+    keep = np.ones(len(ts), dtype=bool)
+    keep[1:] = ts[1:] != ts[:-1]
+    removed = int(len(ts) - keep.sum())
+    if removed == 0:
+        return merged, 0
+
+    group = np.cumsum(keep) - 1
+    n_groups = int(group[-1]) + 1
+    values = {}
+    for col, arr in merged['values'].items():
+        finite = np.flatnonzero(np.isfinite(arr))
+        groups, first = np.unique(group[finite], return_index=True)
+        merged_col = np.full(n_groups, np.nan)
+        merged_col[groups] = arr[finite[first]]
+        values[col] = merged_col
+    return {'ts': ts[keep], 'values': values}, removed
+
+
+def build_report(chunks, merged_ts, duplicates_removed, gap_threshold=None):
+    """
+    Describe per-file coverage, overlaps and gaps between files.
+    """
+    if gap_threshold is None and len(merged_ts) > 1:
+        gap_threshold = GAP_FACTOR * float(np.median(np.diff(merged_ts)))
+
+    to_ts = lambda v: pd.Timestamp(int(v))
+    files = []
+    for chunk in chunks:
+        if len(chunk['ts']) == 0:
+            files.append({'path': chunk['path'], 'rows': chunk['rows'], 'start': None, 'end': None})
+        else:
+            files.append({'path': chunk['path'], 'rows': chunk['rows'],
+                          'start': to_ts(chunk['ts'][0]), 'end': to_ts(chunk['ts'][-1])})
+
+    overlaps = []
+    gaps = []
+    covered = [(c['ts'][0], c['ts'][-1], c['path']) for c in chunks if len(c['ts']) > 0]
+    if covered:
+        cur_end, cur_path = covered[0][1], covered[0][2]
+        for start, end, path in covered[1:]:
+            if start <= cur_end:
+                overlaps.append({'files': (cur_path, path), 'start': to_ts(start), 'end': to_ts(min(end, cur_end))})
+            elif gap_threshold is not None and start - cur_end > gap_threshold:
+                gaps.append({'files': (cur_path, path), 'start': to_ts(cur_end), 'end': to_ts(start)})
+            if end > cur_end:
+                cur_end, cur_path = end, path
+
+    return {
+        'files': files,
+        'overlaps': overlaps,
+        'gaps': gaps,
+        'duplicates_removed': duplicates_removed
+    }
+
+
+def load_campaign(source, cache=None, progress=None, is_cancelled=None,
+                  max_workers=None, use_processes=True, gap_threshold=None):
+    """
+    Load a folder or list of exports for one gas and return a data_files entry
+    with a merged, de-duplicated series and a 'campaign_report'.
+
+    progress(stage, percent) reports files read; is_cancelled() is polled
+    as files complete. gap_threshold is in nanoseconds (default: 2 sampling steps).
+    """
+    files = collect_files(source)
+    if not files:
+        raise ValueError('no data files found')
+
+    def report(stage, percent):
+        if progress is not None:
+            progress(stage, percent)
+
+    report('read', 0)
+    chunks = [None] * len(files)
+    executor_cls = ProcessPoolExecutor if use_processes and len(files) > 1 else ThreadPoolExecutor
+    with executor_cls(max_workers=max_workers) as pool:
+        futures = {pool.submit(_load_chunk, path, cache): i for i, path in enumerate(files)}
+        done = 0
+        for future in as_completed(futures):
+            chunks[futures[future]] = future.result()
+            done += 1
+            report('read', int(100 * done / len(files)))
+            if is_cancelled is not None and is_cancelled():
+                for pending in futures:
+                    pending.cancel()
+                raise LoadCancelled(files[0])
+
+    # Columns in order of first appearance across files
+    time_col = chunks[0]['time_col']
+    data_cols = []
+    for chunk in chunks:
+        for col in chunk['data_cols']:
+            if col not in data_cols:
+                data_cols.append(col)
+    report('columns', 100)
+
+    # Chunks ordered by first timestamp so non-overlapping files just concatenate
+    ordered = sorted(chunks, key=lambda c: c['ts'][0] if len(c['ts']) else np.iinfo(np.int64).max)
+    merged = kway_merge(ordered, data_cols)
+    merged, duplicates_removed = drop_duplicates(merged)
+    campaign_report = build_report(ordered, merged['ts'], duplicates_removed, gap_threshold)
+    logger.info(f"Campaign: {len(files)} files, {len(merged['ts'])} rows, "
+                f"{len(campaign_report['overlaps'])} overlaps, {len(campaign_report['gaps'])} gaps, "
+                f"{duplicates_removed} duplicates removed")
+    report('dates', 100)
+
+    parsed_dates = pd.Series(merged['ts'].view('datetime64[ns]'))
+    numeric = merged['values']
+    columns = {time_col: parsed_dates}
+    columns.update(numeric)
+    report('numeric', 100)
+
+    return {
+        'path': '; '.join(os.path.basename(path) for path in files),
+        'paths': files,
+        'data': pd.DataFrame(columns),
+        'time_col': time_col,
+        'data_cols': data_cols,
+        'parsed_dates': parsed_dates,
+        'numeric': numeric,
+        'from_cache': False,
+        'campaign_report': campaign_report
+    }
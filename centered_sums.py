@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Precision helpers for statistics assembled from running sums.
+Prefix sums, bincounts and matrix products give the count, sums, sums of
+squares and cross products of any window in O(1), and the variance and
+covariance then come from differences such as sum(x * x) - sum(x)^2 / n.
+Readings sit on a large level (ppm offsets, baselines) next to small
+variations, so with raw values both terms are huge and nearly equal and
+their difference loses the digits the variance lives in. The values are
+therefore centred on their mean first; the window sums then stay of the
+order of the variations themselves.
+"""
+import numpy as np
+
+# Relative rounding error of sums over centred values (a few ulps per term, summed)
+NOISE = 64 * np.finfo(np.float64).eps
+
+
+def centered(values, valid=None):
+    """
+    values minus the mean of their valid entries (per column for 2-D input),
+    zero where not valid: (centred values, mean). valid defaults to the finite
+    entries; the mean is 0 when there are none.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if valid is None:
+        valid = np.isfinite(values)
+    counts = valid.sum(axis=0)
+    mean = np.sum(values, axis=0, where=valid) / np.maximum(counts, 1)
+    return np.where(valid, values - mean, 0.0), mean
+
+
+def varying(var, total_sq):
+    """
+    True where var (a window's sum of squared deviations) is above the rounding
+    noise. Prefix differences and cancellations leave an error of about
+    eps * total_sq, total_sq being the sum of squares over all the data the
+    sums ran through; a smaller var cannot be told from a constant window.
+    """
+    with np.errstate(invalid='ignore'):
+        return var > NOISE * total_sq
+
+
+def range_sums(lo, hi):
+    """
+    window_sums for windowed_correlation: sums over the ranges [lo, hi) of the
+    pair arrays, from prefix sums.
+    """
+    def window_sums(values):
+        prefix = np.concatenate([[0.0], np.cumsum(values)])
+        return prefix[hi] - prefix[lo]
+    return window_sums
+
+
+def windowed_correlation(x, y, window_sums, valid=None):
+    """
+    Pearson correlation of the pairs x, y within every window at once.
+    window_sums(values) returns the per-window sums of a per-pair array
+    (range_sums, np.bincount by window, ...). Only pairs with both values
+    finite (or valid) count; NaN with fewer than two pairs or a constant side.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if valid is None:
+        valid = np.isfinite(x) & np.isfinite(y)
+    xc, _ = centered(x, valid)
+    yc, _ = centered(y, valid)
+
+    n = window_sums(valid.astype(np.float64))
+    sx, sy = window_sums(xc), window_sums(yc)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx = window_sums(xc * xc) - sx * sx / n
+        syy = window_sums(yc * yc) - sy * sy / n
+        sxy = window_sums(xc * yc) - sx * sy / n
+        correlation = sxy / np.sqrt(sxx * syy)
+    flat = ~varying(sxx, np.sum(xc * xc)) | ~varying(syy, np.sum(yc * yc))
+    correlation[(n < 2) | flat] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Fast CSV/TSV reader for historian exports.
+Sniffs delimiter, decimal separator, encoding and timestamp format from
+the head of the file, then reads only the needed columns with explicit
+float64 dtypes and an explicit date format.
+"""
+import csv
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CSV_EXTENSIONS = ('.csv', '.tsv', '.txt')
+SNIFF_BYTES = 64 * 1024
+SNIFF_ROWS = 1000
+DELIMITERS = ';\t,'
+
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def sniff_csv(path):
+    """
+    Detect encoding, delimiter and decimal separator from the head of the file.
+    """
+    with open(path, 'rb') as f:
+        head_bytes = f.read(SNIFF_BYTES)
+
+    # Historian exports are either UTF-8 or Windows-1251
+    try:
+        encoding = 'utf-8-sig'
+        head = head_bytes.decode(encoding)
+    except UnicodeDecodeError:
+        encoding = 'cp1251'
+        head = head_bytes.decode(encoding, errors='replace')
+
+    lines = head.splitlines()[:50]
+    if len(head_bytes) == SNIFF_BYTES and len(lines) > 1:
+        lines = lines[:-1]  # last line may be cut in the middle
+    sample = '\n'.join(lines)
+
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = '\t' if path.lower().endswith('.tsv') else ';'
+
+    # Comma decimals are only possible when the comma is not the delimiter
+    decimal = '.'
+    if delimiter != ',':
+        for line in lines[1:]:
+            for field in line.split(delimiter):
+                field = field.strip().strip('"')
+                if ',' in field and field.replace(',', '', 1).lstrip('+-').isdigit():
+                    decimal = ','
+                    break
+            if decimal == ',':
+                break
+
+    return encoding, delimiter, decimal
+
+
+def detect_date_format(values, formats):
+    """
+    Return the first format that parses every non-empty sample value, or None.
+    """
+    sample = pd.Series(values).dropna().astype(str).str.strip()
+    sample = sample[sample != '']
+    if sample.empty:
+        return None
+    for fmt in formats:
+        if pd.to_datetime(sample, format=fmt, errors='coerce').notna().all():
+            return fmt
+    return None
+
+
+def read_csv_fast(path, logic, progress=None):
+    """
+    Read a CSV/TSV export into a DataFrame with a datetime64 time column
+    and float64 data columns, using only the columns identify_columns selects.
+    """
+    encoding, delimiter, decimal = sniff_csv(path)
+    options = dict(sep=delimiter, decimal=decimal, encoding=encoding)
+    logger.info(f"CSV {path}: delimiter={delimiter!r}, decimal={decimal!r}, encoding={encoding}")
+
+    # Sniff columns on a sample
+    sample_df = pd.read_csv(path, nrows=SNIFF_ROWS, **options)
+    if sample_df.empty:
+        return sample_df
+    time_col, data_cols = logic.identify_columns(sample_df)
+    usecols = ([time_col] if time_col is not None else []) + list(data_cols)
+    if progress is not None:
+        progress(10)
+
+    dtypes = {col: np.float64 for col in data_cols}
+    if time_col is not None:
+        dtypes[time_col] = str
+
+    engines = ['pyarrow', 'c'] if has_pyarrow() else ['c']
+    df = None
+    for engine in engines:
+        try:
+            df = pd.read_csv(path, usecols=usecols, dtype=dtypes, engine=engine, **options)
+            break
+        except ValueError as e:
+            # Unsupported option for this engine or non-numeric cells in a data column
+            logger.info(f"CSV fast path ({engine}) failed: {e}")
+
+    if df is None:
+        # Slow path: text cells in numeric columns go through manual conversion
+        df = pd.read_csv(path, usecols=usecols, dtype=str, **options)
+        for col in data_cols:
+            df[col] = logic.manual_numeric_conversion(df[col]).astype(np.float64)
+    df = df[usecols]
+    if progress is not None:
+        progress(80)
+
+    # Explicit-format date parsing; stubborn values fall back to the generic parser
+    if time_col is not None:
+        fmt = detect_date_format(sample_df[time_col], logic.DATE_FORMATS)
+        if fmt is not None:
+            parsed = pd.to_datetime(df[time_col], format=fmt, errors='coerce')
+            if parsed.isna().any():
+                parsed = parsed.fillna(logic.parse_dates(df[time_col][parsed.isna()]))
+            df[time_col] = parsed
+
+    if progress is not None:
+        progress(100)
+    return df
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent columnar cache for parsed analyzer exports.
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.analyzer_cache')
+
+
+class DataCache:
+    """
+    On-disk cache of parsed timestamps and converted numeric columns.
+
+    Each entry is an uncompressed .npz archive (one .npy array per column)
+    plus a JSON metadata file. Entries are keyed by file path, size, mtime
+    and content hash, so a modified export never hits a stale entry.
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir=None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+
+    def content_hash(self, path):
+        """
+        SHA-1 of the file contents.
+        """
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def file_key(self, path):
+        """
+        Build the cache key for a file: path + size + mtime + content hash.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        raw_key = f"{CACHE_FORMAT_VERSION}|{path}|{stat.st_size}|{stat.st_mtime_ns}|{self.content_hash(path)}"
+        return hashlib.sha1(raw_key.encode('utf-8')).hexdigest()
+
+    def _entry_paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.npz', base + '.json'
+
+    def load(self, path):
+        """
+        Return cached {'time_col', 'data_cols', 'parsed_dates', 'numeric'} or None on miss.
+        """
+        try:
+            key = self.file_key(path)
+        except OSError:
+            return None
+
+        npz_path, meta_path = self._entry_paths(key)
+        if not (os.path.exists(npz_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            with np.load(npz_path, allow_pickle=False) as archive:
+                parsed_dates = None
+                if meta['has_dates']:
+                    parsed_dates = pd.Series(archive['time'].view('datetime64[ns]'))
+
+                numeric = {}
+                for i, col in enumerate(meta['data_cols']):
+                    numeric[col] = archive[f'col_{i}']
+        except Exception as e:
+            self.logger.warning(f"Damaged cache entry for {path}, ignoring: {e}")
+            return None
+
+        return {
+            'time_col': meta['time_col'],
+            'data_cols': meta['data_cols'],
+            'parsed_dates': parsed_dates,
+            'numeric': numeric
+        }
+
+    def save(self, path, time_col, data_cols, parsed_dates, numeric):
+        """
+        Store parsed dates and numeric columns for a file.
+        """
+        try:
+            key = self.file_key(path)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            npz_path, meta_path = self._entry_paths(key)
+
+            arrays = {}
+            if parsed_dates is not None:
+                arrays['time'] = np.asarray(parsed_dates, dtype='datetime64[ns]').view('int64')
+            for i, col in enumerate(data_cols):
+                arrays[f'col_{i}'] = np.asarray(numeric[col], dtype=np.float64)
+
+            # Write to temp names first so a crash never leaves a half-written entry
+            tmp_npz = npz_path + '.tmp.npz'
+            np.savez(tmp_npz, **arrays)
+            os.replace(tmp_npz, npz_path)
+
+            meta = {
+                'version': CACHE_FORMAT_VERSION,
+                'path': os.path.abspath(path),
+                'time_col': None if time_col is None else str(time_col),
+                'data_cols': [str(col) for col in data_cols],
+                'has_dates': parsed_dates is not None
+            }
+            tmp_meta = meta_path + '.tmp'
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_meta, meta_path)
+        except Exception as e:
+            self.logger.warning(f"Could not write cache entry for {path}: {e}")
+
+    def _iter_entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                yield name[:-len('.json')]
+
+    def _remove_entry(self, key):
+        for entry_path in self._entry_paths(key):
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, path):
+        """
+        Drop all cache entries for a file (any size/mtime/content). Returns removed count.
+        """
+        path = os.path.abspath(path)
+        removed = 0
+        for key in list(self._iter_entries()):
+            _, meta_path = self._entry_paths(key)
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    entry_file = json.load(f).get('path')
+            except Exception:
+                entry_file = None
+            if entry_file is None or entry_file == path:
+                self._remove_entry(key)
+                removed += 1
+        return removed
+
+    def clear(self):
+        """
+        Remove every cache entry. Returns removed count.
+        """
+        removed = 0
+        for key in list(self._iter_entries()):
+            self._remove_entry(key)
+            removed += 1
+        return removed
+
+
+if __name__ == '__main__':
+    # python data_cache.py --clear | --invalidate <file>
+    cache = DataCache()
+    if len(sys.argv) >= 2 and sys.argv[1] == '--clear':
+        print(f"Удалено записей кэша: {cache.clear()}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == '--invalidate':
+        print(f"Удалено записей кэша: {cache.invalidate(sys.argv[2])}")
+    else:
+        print("Использование: python data_cache.py --clear | --invalidate <файл>")
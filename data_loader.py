@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+File loading pipeline shared by the GUI workers.
+Runs read -> column detection -> date parsing -> numeric conversion
+with per-stage progress reporting and cooperative cancellation.
+"""
+import os
+import logging
+import numpy as np
+import pandas as pd
+from excel_reader import read_excel_streaming
+from csv_reader import read_csv_fast, CSV_EXTENSIONS
+from numeric_conversion import to_float_array
+
+logger = logging.getLogger(__name__)
+
+# Stage keys in execution order
+LOAD_STAGES = ['read', 'columns', 'dates', 'numeric']
+
+# Formats openpyxl can stream in read-only mode
+STREAMING_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+class LoadCancelled(Exception):
+    """Raised when a load is cancelled between stages."""
+    pass
+
+
+def load_data_file(path, logic, cache=None, progress=None, is_cancelled=None, debug_hook=None):
+    """
+    Load an analyzer export and return the data_files entry for it.
+
+    progress(stage, percent) is called as each stage starts/finishes;
+    is_cancelled() is polled between stages and raises LoadCancelled;
+    debug_hook(df) receives the raw DataFrame right after reading.
+    """
+    def report(stage, percent):
+        if progress is not None:
+            progress(stage, percent)
+
+    def check_cancelled():
+        if is_cancelled is not None and is_cancelled():
+            raise LoadCancelled(path)
+
+    # Cached entry already holds parsed dates and converted columns
+    report('read', 0)
+    cached = cache.load(path) if cache is not None else None
+    if cached is not None:
+        logger.info(f"Loaded from cache: {path}")
+        time_col = cached['time_col']
+        data_cols = cached['data_cols']
+        parsed_dates = cached['parsed_dates']
+        numeric = cached['numeric']
+
+        columns = {}
+        if time_col is not None and parsed_dates is not None:
+            columns[time_col] = parsed_dates
+        for col in data_cols:
+            columns[col] = numeric[col]
+        for stage in LOAD_STAGES:
+            report(stage, 100)
+
+        return {
+            'path': path,
+            'data': pd.DataFrame(columns),
+            'time_col': time_col,
+            'data_cols': data_cols,
+            'parsed_dates': parsed_dates,
+            'numeric': numeric,
+            'from_cache': True
+        }
+
+    # 1. Read (.xlsx streams only the needed columns, legacy .xls goes through pandas)
+    extension = os.path.splitext(path)[1].lower()
+    if extension in CSV_EXTENSIONS:
+        df = read_csv_fast(path, logic, progress=lambda percent: report('read', percent))
+    elif extension in STREAMING_EXTENSIONS:
+        df = read_excel_streaming(path, logic,
+                                  progress=lambda percent: report('read', percent),
+                                  is_cancelled=is_cancelled)
+        if df is None:
+            raise LoadCancelled(path)
+    else:
+        df = pd.read_excel(path)
+    if df.empty:
+        raise ValueError('file is empty')
+    report('read', 100)
+    check_cancelled()
+
+    if debug_hook is not None:
+        debug_hook(df)
+
+    # 2. Column detection
+    report('columns', 0)
+    time_col, data_cols = logic.identify_columns(df)
+    report('columns', 100)
+    check_cancelled()
+
+    # 3. Date parsing
+    report('dates', 0)
+    parsed_dates = None
+    if time_col and pd.api.types.is_datetime64_any_dtype(df[time_col]):
+        # Already parsed by the reader (CSV with explicit format)
+        parsed_dates = df[time_col]
+    elif time_col:
+        parsed_dates = logic.parse_dates(df[time_col])
+        logger.info(f"Parsed dates: {parsed_dates.notna().sum()}/{len(df)}")
+    report('dates', 100)
+    check_cancelled()
+
+    # 4. Numeric conversion
+    numeric = {}
+    for i, col in enumerate(data_cols):
+        report('numeric', int(100 * i / max(len(data_cols), 1)))
+        if pd.api.types.is_float_dtype(df[col]):
+            # Typed by the reader - no object-dtype round trip needed
+            numeric[col] = df[col].to_numpy(dtype=np.float64)
+        else:
+            numeric[col] = to_float_array(df[col])
+        check_cancelled()
+    report('numeric', 100)
+
+    if cache is not None:
+        cache.save(path, time_col, data_cols, parsed_dates, numeric)
+
+    return {
+        'path': path,
+        'data': df,
+        'time_col': time_col,
+        'data_cols': data_cols,
+        'parsed_dates': parsed_dates,
+        'numeric': numeric,
+        'from_cache': False
+    }
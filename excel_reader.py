@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming Excel reader built on openpyxl read-only mode.
+Sniffs the header and a sample of rows first, then keeps only the time
+column and the numeric analyzer columns, converting them chunk by chunk.
+Columns the sample cannot decide on (too few non-empty cells, e.g. an
+analyzer switched on mid-export) are kept raw and checked on the full column.
+"""
+import logging
+import numpy as np
+import pandas as pd
+import openpyxl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_SNIFF_ROWS = 1000
+
+# identify_columns decides on the first this many non-empty cells of a column
+IDENTIFY_SAMPLE = 100
+
+
+def make_header(raw_header):
+    """
+    Column names the way pd.read_excel builds them (Unnamed: i, duplicates get .1, .2).
+    """
+    header = []
+    seen = {}
+    for i, name in enumerate(raw_header):
+        name = f'Unnamed: {i}' if name is None else name
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+
+def read_excel_streaming(path, logic, chunk_size=DEFAULT_CHUNK_SIZE, sniff_rows=DEFAULT_SNIFF_ROWS,
+                         progress=None, is_cancelled=None):
+    """
+    Read the first worksheet keeping only the columns identify_columns selects.
+
+    Returns a DataFrame with the raw time column and float64 data columns.
+    progress(percent) is called after every chunk; is_cancelled() is polled
+    per chunk and stops reading early (returns None).
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        total_rows = ws.max_row
+        rows = ws.iter_rows(values_only=True)
+
+        raw_header = next(rows, None)
+        if raw_header is None:
+            return pd.DataFrame()
+        header = make_header(raw_header)
+
+        # Sniff a sample to decide which columns to keep
+        sample = []
+        for row in rows:
+            sample.append(row)
+            if len(sample) >= sniff_rows:
+                break
+        if not sample:
+            return pd.DataFrame(columns=header)
+
+        sample_df = pd.DataFrame(sample, columns=header)
+        time_col, data_cols = logic.identify_columns(sample_df)
+
+        # Rejected on fewer non-empty cells than identify_columns looks at: decided after the full read
+        pending_cols = [col for col in header
+                        if col != time_col and col not in data_cols
+                        and sample_df[col].notna().sum() < IDENTIFY_SAMPLE]
+        keep_cols = ([time_col] if time_col is not None else []) + list(data_cols) + pending_cols
+        keep_idx = [header.index(col) for col in keep_cols]
+        logger.info(f"Streaming {path}: keeping {len(keep_cols) - len(pending_cols)} of {len(header)} columns"
+                    f" ({len(pending_cols)} undecided)")
+
+        time_chunks = []
+        data_chunks = {col: [] for col in data_cols}
+        pending_chunks = {col: [] for col in pending_cols}
+        rows_read = 0
+
+        def flush(chunk):
+            # Transpose only the kept columns of this chunk
+            columns = list(zip(*[[row[i] if i < len(row) else None for i in keep_idx] for row in chunk]))
+            offset = 0
+            if time_col is not None:
+                time_chunks.append(np.array(columns[0], dtype=object))
+                offset = 1
+            for j, col in enumerate(data_cols):
+                values = pd.Series(columns[offset + j], dtype=object)
+                data_chunks[col].append(np.asarray(logic.manual_numeric_conversion(values), dtype=np.float64))
+            offset += len(data_cols)
+            for j, col in enumerate(pending_cols):
+                pending_chunks[col].append(np.array(columns[offset + j], dtype=object))
+
+        flush(sample)
+        rows_read += len(sample)
+
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                rows_read += len(chunk)
+                chunk = []
+                if progress is not None and total_rows:
+                    progress(min(99, int(100 * rows_read / total_rows)))
+                if is_cancelled is not None and is_cancelled():
+                    return None
+        if chunk:
+            flush(chunk)
+            rows_read += len(chunk)
+
+        if pending_cols:
+            # Undecided columns are judged on the whole column, as identify_columns does on a full table
+            pending = pd.DataFrame({col: np.concatenate(pending_chunks[col]) for col in pending_cols})
+            if time_col is not None:
+                pending.insert(0, time_col, np.concatenate(time_chunks))
+            _, late_cols = logic.identify_columns(pending)
+            late_cols = [col for col in late_cols if col in pending_chunks]
+            for col in late_cols:
+                values = logic.manual_numeric_conversion(pending[col])
+                data_chunks[col] = [np.asarray(values, dtype=np.float64)]
+            if late_cols:
+                logger.info(f"Streaming {path}: columns empty or non-numeric at the start kept: {late_cols}")
+            data_cols = [col for col in header if col in data_chunks]
+
+        # Trailing fully empty rows are dropped, as pd.read_excel does
+        frame = {}
+        if time_col is not None:
+            frame[time_col] = np.concatenate(time_chunks)
+        for col in data_cols:
+            frame[col] = np.concatenate(data_chunks[col])
+        df = pd.DataFrame(frame)
+        non_empty = df.notna().any(axis=1).to_numpy()
+        last = np.flatnonzero(non_empty)
+        df = df.iloc[:last[-1] + 1 if len(last) else 0]
+
+        if progress is not None:
+            progress(100)
+        return df
+    finally:
+        wb.close()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Transport delay between analyzers from the full cross-correlation.
+Both columns are resampled to a common grid (bin means, gaps stay NaN) and
+the Pearson correlation for every lag is computed at once with FFTs of the
+values, their squares and the validity masks, so gaps are handled exactly
+and the cost is O(n log n) instead of O(n * lags). The lag with the
+highest correlation is reported; its correlation is recomputed directly.
+"""
+import logging
+import numpy as np
+from analyzer_logic import AnalyzerLogic
+from centered_sums import centered, varying
+
+logger = logging.getLogger(__name__)
+
+# Lags are searched up to this many seconds and this share of the series span
+MAX_LAG_SECONDS = 2 * 3600
+MAX_LAG_FRACTION = 0.25
+
+# Paired grid cells needed for the correlation at a lag to count
+MIN_OVERLAP = 10
+
+
+def sampling_step(timestamps):
+    """
+    Median positive step of sorted timestamps (0.0 with fewer than two distinct values).
+    """
+    steps = np.diff(timestamps)
+    steps = steps[steps > 0]
+    return float(np.median(steps)) if len(steps) else 0.0
+
+
+def resample_to_grid(timestamps, values, start, step, n_cells):
+    """
+    Mean of the finite values falling into each of n_cells grid cells centred
+    on start + i * step (NaN for empty cells).
+    """
+    finite = np.isfinite(values)
+    cells = np.rint((timestamps[finite] - start) / step).astype(np.int64)
+    inside = (cells >= 0) & (cells < n_cells)
+    cells = cells[inside]
+    counts = np.bincount(cells, minlength=n_cells)
+    sums = np.bincount(cells, weights=values[finite][inside], minlength=n_cells)
+    with np.errstate(invalid='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def masked_cross_correlation(x, y, max_lag, min_overlap=MIN_OVERLAP):
+    """
+    Pearson correlation of x[i] with y[i + k] over the cells where both are
+    finite, for every k in [-max_lag, max_lag]: (lags, correlations, overlaps).
+    Correlations with fewer than min_overlap pairs are NaN.
+    """
+    n = len(x)
+    max_lag = int(min(max_lag, n - 1))
+    mask_x, mask_y = np.isfinite(x), np.isfinite(y)
+    x0, _ = centered(x, mask_x)
+    y0, _ = centered(y, mask_y)
+
+    size = 1 << int(2 * n - 1).bit_length()
+    lags = np.arange(-max_lag, max_lag + 1)
+    spectra_x = [np.fft.rfft(a, size) for a in (mask_x.astype(np.float64), x0, x0 * x0)]
+    spectra_y = [np.fft.rfft(b, size) for b in (mask_y.astype(np.float64), y0, y0 * y0)]
+
+    def correlate(fa, fb):
+        # sum_i a[i] * b[i + k]; negative lags wrap to the end of the circular result
+        return np.fft.irfft(np.conj(fa) * fb, size)[lags % size]
+
+    overlaps = np.rint(correlate(spectra_x[0], spectra_y[0]))
+    sum_x = correlate(spectra_x[1], spectra_y[0])
+    sum_y = correlate(spectra_x[0], spectra_y[1])
+    sum_xx = correlate(spectra_x[2], spectra_y[0])
+    sum_yy = correlate(spectra_x[0], spectra_y[2])
+    sum_xy = correlate(spectra_x[1], spectra_y[1])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_y / overlaps
+        var_x = sum_xx - sum_x * sum_x / overlaps
+        var_y = sum_yy - sum_y * sum_y / overlaps
+        correlations = cov / np.sqrt(var_x * var_y)
+    flat = ~varying(var_x, np.sum(x0 * x0)) | ~varying(var_y, np.sum(y0 * y0))
+    correlations[(overlaps < max(min_overlap, 2)) | flat] = np.nan
+    return lags, np.clip(correlations, -1.0, 1.0), overlaps.astype(np.int64)
+
+
+def _pearson(x, y):
+    valid = np.isfinite(x) & np.isfinite(y)
+    if valid.sum() < 2:
+        return np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.corrcoef(x[valid], y[valid])[0, 1])
+
+
+def estimate_lag(timestamps, x, y, step=None, max_lag=None, min_overlap=MIN_OVERLAP):
+    """
+    Delay of y relative to x (both aligned with the sorted timestamps).
+    Returns {'lag' (timestamp units, positive when y lags x), 'lag_steps',
+    'correlation' (at the lag), 'zero_lag_correlation', 'step', 'overlap',
+    'at_limit' (the peak is the largest lag searched, so the true lag may be
+    beyond it)}, or None when there are too few paired samples.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(timestamps) < 2:
+        return None
+    if step is None:
+        step = sampling_step(timestamps)
+    if not step > 0:
+        return None
+
+    start = timestamps[0]
+    n_cells = int(np.rint((timestamps[-1] - start) / step)) + 1
+    grid_x = resample_to_grid(timestamps, x, start, step, n_cells)
+    grid_y = resample_to_grid(timestamps, y, start, step, n_cells)
+    if max_lag is None:
+        max_lag = min(MAX_LAG_SECONDS, (timestamps[-1] - start) * MAX_LAG_FRACTION)
+    max_steps = int(max_lag // step)
+
+    lags, correlations, overlaps = masked_cross_correlation(grid_x, grid_y, max_steps, min_overlap)
+    if not np.isfinite(correlations).any():
+        return None
+    best = int(np.nanargmax(correlations))
+    k = int(lags[best])
+
+    # Exact correlations at the best and at zero lag
+    if k >= 0:
+        at_lag = _pearson(grid_x[:n_cells - k], grid_y[k:])
+    else:
+        at_lag = _pearson(grid_x[-k:], grid_y[:n_cells + k])
+    return {
+        'lag': k * step,
+        'lag_steps': k,
+        'correlation': at_lag,
+        'zero_lag_correlation': _pearson(grid_x, grid_y),
+        'step': step,
+        'overlap': int(overlaps[best]),
+        'at_limit': bool(k != 0 and abs(k) == lags[-1])
+    }
+
+
+def reference_lags(timestamps, values, step=None, max_lag=None):
+    """
+    estimate_lag of every other column against the reference analyzer (the
+    first Ametek column, or the first column): {column: result or None}.
+    """
+    columns = list(values)
+    if len(columns) < 2:
+        return {}
+    reference = AnalyzerLogic.reference_column(columns)
+    lags = {}
+    for col in columns:
+        if col == reference:
+            continue
+        lags[col] = estimate_lag(timestamps, values[reference], values[col], step, max_lag)
+        if lags[col] is not None:
+            logger.info(f"Lag {col} vs {reference}: {lags[col]['lag']:+.1f} "
+                        f"(r={lags[col]['correlation']:.4f}, r0={lags[col]['zero_lag_correlation']:.4f})")
+    return lags
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Level-of-detail engine for long series.
+A min/max pyramid is built once per curve: level k groups BASE_BUCKET * 2**k
+consecutive points and keeps the positions of the minimum and the maximum of
+every group. A query for the visible x range picks the finest level that fits
+the point budget (about two points per pixel column), so zooming in ends at
+the raw data and spikes are never dropped by decimation.
+"""
+import numpy as np
+
+# Points per group on the finest decimated level
+BASE_BUCKET = 4
+
+
+def _pair_reduce(positions, y, pick_first):
+    """
+    Combine neighbouring groups: keep the winning position of every pair.
+    """
+    if len(positions) % 2:
+        positions = np.append(positions, positions[-1])
+    a, b = positions[0::2], positions[1::2]
+    return np.where(pick_first(y[a], y[b]), a, b)
+
+
+class MinMaxPyramid:
+    """
+    Min/max decimation levels over finite points with ascending x.
+    """
+
+    def __init__(self, x, y, base_bucket=BASE_BUCKET):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.levels = []
+
+        n = len(self.y)
+        if n <= base_bucket:
+            return
+
+        # Finest level straight from the data (padding never wins min/max)
+        n_groups = -(-n // base_bucket)
+        pad = n_groups * base_bucket - n
+        offsets = np.arange(n_groups) * base_bucket
+        grouped_min = np.concatenate([self.y, np.full(pad, np.inf)]).reshape(n_groups, base_bucket)
+        grouped_max = np.concatenate([self.y, np.full(pad, -np.inf)]).reshape(n_groups, base_bucket)
+        min_pos = offsets + grouped_min.argmin(axis=1)
+        max_pos = offsets + grouped_max.argmax(axis=1)
+        bucket = base_bucket
+        self.levels.append((bucket, min_pos, max_pos))
+
+        # Every next level halves the number of groups
+        while len(min_pos) > 1:
+            min_pos = _pair_reduce(min_pos, self.y, np.less_equal)
+            max_pos = _pair_reduce(max_pos, self.y, np.greater_equal)
+            bucket *= 2
+            self.levels.append((bucket, min_pos, max_pos))
+
+    def __len__(self):
+        return len(self.y)
+
+    def plan(self, x_start, x_end, max_points):
+        """
+        (level, start, stop) describing what query() returns for the range:
+        level None means raw points [start, stop), otherwise groups [start, stop)
+        of that level. Equal plans give equal output, so callers can skip redraws.
+        """
+        n = len(self.y)
+        # One point beyond each edge so the line reaches the border of the view
+        lo = max(int(np.searchsorted(self.x, x_start, side='left')) - 1, 0)
+        hi = min(int(np.searchsorted(self.x, x_end, side='right')) + 1, n)
+        if hi - lo <= max_points or not self.levels:
+            return None, lo, hi
+
+        for level, (bucket, _, _) in enumerate(self.levels):
+            if 2 * (hi - lo) / bucket <= max_points:
+                break
+        bucket = self.levels[level][0]
+        return level, lo // bucket, (hi - 1) // bucket + 1
+
+    def points(self, plan):
+        """
+        x, y arrays for a plan returned by plan().
+        """
+        level, start, stop = plan
+        if level is None:
+            return self.x[start:stop], self.y[start:stop]
+
+        bucket, min_pos, max_pos = self.levels[level]
+        a, b = min_pos[start:stop], max_pos[start:stop]
+        # Both extremes of a group in their own time order; the range ends are kept as well
+        positions = np.column_stack([np.minimum(a, b), np.maximum(a, b)]).ravel()
+        first = start * bucket
+        last = min(stop * bucket, len(self.y)) - 1
+        positions = np.concatenate([[first], positions, [last]])
+        return self.x[positions], self.y[positions]
+
+    def query(self, x_start, x_end, max_points):
+        return self.points(self.plan(x_start, x_end, max_points))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass numeric conversion for analyzer columns.
+Cells that are already numbers are taken as they are; only string cells
+go through one vectorized decimal-comma parse. Results are written
+straight into one float64 array.
+"""
+import numpy as np
+import pandas as pd
+
+
+NUMERIC_KINDS = ('floating', 'integer', 'mixed-integer-float', 'decimal', 'empty')
+
+_is_string = np.frompyfunc(lambda value: isinstance(value, str), 1, 1)
+
+
+def _parse_strings(strings):
+    """
+    One vectorized decimal-comma parse of string cells.
+    """
+    return pd.to_numeric(pd.Series(strings, dtype=object).str.replace(',', '.', regex=False), errors='coerce')
+
+
+def to_float_array(values, out=None):
+    """
+    Convert a column (Series/array of numbers and/or strings) to float64.
+    Unparseable cells become NaN. If out is given it is filled in place.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    n = len(values)
+    if out is None:
+        out = np.empty(n, dtype=np.float64)
+
+    # Numeric columns: no string handling at all (a plain cast, no copy for float64 input into out)
+    if values.dtype.kind in 'biuf':
+        out[:] = values
+        return out
+
+    if values.dtype.kind == 'M' or values.dtype.kind == 'm':
+        out[:] = np.nan
+        return out
+
+    values = np.asarray(values, dtype=object)
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+
+    if kind in NUMERIC_KINDS:
+        # Float/int cells (Excel numbers) - one C-level pass, no string work
+        out[:] = pd.to_numeric(values, errors='coerce')
+    elif kind == 'string':
+        out[:] = _parse_strings(values)
+    else:
+        # Mixed column: split once by cell type, each part is parsed exactly once
+        is_string = _is_string(values).astype(bool)
+        out[~is_string] = pd.to_numeric(values[~is_string], errors='coerce')
+        out[is_string] = _parse_strings(values[is_string])
+
+    return out
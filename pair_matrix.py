@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Pairwise comparisons of all row-aligned columns in one masked matrix computation.
+The columns of a window are stacked into a 2-D array (rows x columns) with
+zeros at the gaps and a 0/1 validity mask. For every pair, the count, sums,
+sums of squares and cross products over the rows where both columns are
+finite then come from four matrix products (M'M, X'M, (X*X)'M, X'X), so one
+pass over the data gives the correlations and mean differences of all pairs
+instead of a fresh mask and np.corrcoef per pair.
+"""
+import numpy as np
+from centered_sums import centered, varying
+
+
+def pairwise_stats(values):
+    """
+    Statistics of every column pair of values (rows x columns) over the rows
+    where both are finite: {'count', 'mean_diff' (column j minus column i),
+    'correlation'} as columns x columns matrices. Correlations need two rows
+    and varying values, mean differences one row; NaN otherwise.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError('values must be a 2-D array (rows x columns)')
+    mask = np.isfinite(values)
+    valid = mask.astype(np.float64)
+    x, column_means = centered(values, mask)
+
+    n = valid.T @ valid
+    sx = x.T @ valid              # sx[i, j]: sum of column i over the rows where j is finite too
+    sxx = (x * x).T @ valid
+    sxy = x.T @ x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = sxx - sx * sx / n   # var[i, j]: of column i over the rows shared with j
+        cov = sxy - sx * sx.T / n
+        correlation = cov / np.sqrt(var * var.T)
+        mean_diff = (sx.T - sx) / n + (column_means[np.newaxis, :] - column_means[:, np.newaxis])
+
+    flat = ~varying(var, np.diag(sxx)[:, np.newaxis])
+    correlation[(n < 2) | flat | flat.T] = np.nan
+    mean_diff[n == 0] = np.nan
+    return {
+        'count': n.astype(np.int64),
+        'mean_diff': mean_diff,
+        'correlation': np.clip(correlation, -1.0, 1.0)
+    }
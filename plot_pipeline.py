@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Staged preparation of the plotted series.
+load -> parse dates happen in data_loader (and the disk cache); this module
+runs the remaining stages sort -> convert -> filter -> range stats ->
+pair alignment -> range slice. Every stage result is cached under the key
+of its inputs, so changing a late input (outlier filter, date range) reuses
+everything upstream of it and the GUI only has to redo the render stage.
+"""
+import itertools
+import logging
+import numpy as np
+import pandas as pd
+from numeric_conversion import to_float_array
+from time_index import TimeIndex
+from range_stats import RangeStatsIndex
+from series_store import row_count
+from time_alignment import align_columns
+
+logger = logging.getLogger(__name__)
+
+# Stage keys in execution order
+PIPELINE_STAGES = ['sort', 'convert', 'filter', 'stats', 'align', 'slice']
+
+# Cached results kept per stage and gas (e.g. both filter modes, a few date ranges)
+MAX_ENTRIES_PER_STAGE = 4
+
+_versions = itertools.count(1)
+
+
+def data_version(file_data):
+    """
+    Version stamp of a data_files entry; every newly loaded entry gets a new one.
+    """
+    if 'version' not in file_data:
+        file_data['version'] = next(_versions)
+    return file_data['version']
+
+
+def numeric_column(file_data, col):
+    """
+    Numeric values of a column, converted once and kept in file_data['numeric'].
+    This is the one accessor of that per-file cache: data_loader, the disk
+    cache and campaign_loader fill it at load time (compacted entries hold
+    every data column there), and columns missing from it are converted here
+    on first use, so the GUI and the pipeline never re-convert a column.
+    """
+    numeric = file_data.setdefault('numeric', {})
+    if col not in numeric:
+        numeric[col] = to_float_array(file_data['data'][col])
+    return numeric[col]
+
+
+class PlotPipeline:
+    """
+    Cached sort/convert/filter/stats/align/slice stages for each gas.
+    runs/hits count stage executions and cache hits (used by the debug output and tests).
+    """
+
+    def __init__(self, logic):
+        self.logic = logic
+        self._cache = {}
+        self.runs = {stage: 0 for stage in PIPELINE_STAGES}
+        self.hits = {stage: 0 for stage in PIPELINE_STAGES}
+
+    def clear(self):
+        self._cache.clear()
+
+    def _run(self, stage, gas_type, key, compute):
+        entries = self._cache.setdefault((stage, gas_type), {})
+        if key in entries:
+            self.hits[stage] += 1
+            return entries[key]
+
+        # Results computed for an older version of the data are never reused
+        version = key[0]
+        for old_key in [k for k in entries if k[0] != version]:
+            del entries[old_key]
+        while len(entries) >= MAX_ENTRIES_PER_STAGE:
+            del entries[next(iter(entries))]
+
+        result = compute()
+        entries[key] = result
+        self.runs[stage] += 1
+        return result
+
+    def _sort(self, file_data):
+        """
+        Rows with a valid time in time order: (TimeIndex over int64 ns, float seconds, source row numbers).
+        """
+        parsed_dates = file_data.get('parsed_dates')
+        if parsed_dates is None:
+            rows = np.arange(row_count(file_data))
+            return None, rows.astype(np.float64), rows
+
+        ts = np.asarray(parsed_dates, dtype='datetime64[ns]').view('int64')
+        rows = np.flatnonzero(np.asarray(pd.notna(parsed_dates)))
+        # Exports are normally already in time order; sorted only when they are not
+        index, order = TimeIndex.from_unsorted(ts[rows])
+        if order is not None:
+            rows = rows[order]
+        return index, index.values / 1e9, rows
+
+    def prepare(self, gas_type, file_data, filter_outliers=False, date_range=None):
+        """
+        Series for one gas plot: timestamps (float seconds, or row numbers
+        without a time column) and a TimeIndex over them, time_data, per-column values,
+        RangeStatsIndex per column ('range_stats', positions shifted by 'range_offset'), column
+        pairs aligned by time ('aligned', AlignedPair rows shifted the same way), the matching
+        source row numbers ('source_rows'), the number of rows with a valid time ('valid_rows')
+        and the data version and filter mode the series was prepared for.
+        date_range is (start, end) or None; the slice is inclusive on both ends.
+        """
+        version = data_version(file_data)
+        data_cols = tuple(file_data.get('data_cols') or ())
+
+        index, seconds, rows = self._run('sort', gas_type, (version,), lambda: self._sort(file_data))
+
+        converted = self._run('convert', gas_type, (version, data_cols),
+                              lambda: {col: numeric_column(file_data, col)[rows] for col in data_cols})
+
+        if filter_outliers:
+            filtered = self._run('filter', gas_type, (version, data_cols),
+                                 lambda: {col: np.asarray(self.logic.apply_outlier_filter(values), dtype=np.float64)
+                                          for col, values in converted.items()})
+        else:
+            filtered = converted
+
+        # Prefix sums / min-max tables over the whole series; a date range only shifts the offset
+        range_stats = self._run('stats', gas_type, (version, data_cols, bool(filter_outliers)),
+                                lambda: {col: RangeStatsIndex(values) for col, values in filtered.items()})
+
+        # Samples of every column pair matched by time, over the whole series as well
+        aligned = self._run('align', gas_type, (version, data_cols, bool(filter_outliers)),
+                            lambda: align_columns(seconds, filtered))
+
+        range_key = None if date_range is None else tuple(pd.Timestamp(t) for t in date_range)
+
+        def slice_rows():
+            if index is None or range_key is None:
+                return 0, len(rows)
+            return index.bounds(range_key[0].value, range_key[1].value)
+
+        lo, hi = self._run('slice', gas_type, (version, range_key), slice_rows)
+
+        # Views into the cached arrays - no per-call copies
+        time_data = None if index is None else pd.Series(index.values[lo:hi].view('datetime64[ns]'))
+
+        return {
+            'gas_type': gas_type,
+            'time_col': file_data.get('time_col'),
+            'data_cols': list(data_cols),
+            'timestamps': seconds[lo:hi],
+            'time_index': TimeIndex(seconds[lo:hi]),
+            'time_data': time_data,
+            'values': {col: values[lo:hi] for col, values in filtered.items()},
+            'range_stats': range_stats,
+            'range_offset': lo,
+            'aligned': aligned,
+            'source_rows': rows[lo:hi],
+            'valid_rows': len(rows),
+            'version': version,
+            'filter_outliers': bool(filter_outliers)
+        }
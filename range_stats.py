@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Precomputed range statistics for one plotted column.
+Prefix sums of finite counts, values and squared values give count/mean/std
+of any index range in O(1); min/max come from a sparse table over fixed-size
+blocks (O(1) table lookup plus a scan of at most two partial blocks), which
+keeps memory linear instead of n log n.
+Many ranges at once (batch windows) are answered with the same prefix sums,
+one reduceat pass for min/max and one sort for the medians.
+"""
+import numpy as np
+from centered_sums import centered
+
+# Values per block of the min/max table
+BLOCK_SIZE = 64
+
+# Medians of many ranges are sorted as a padded grid while it is at most this many times larger than the data
+MEDIAN_GRID_FACTOR = 2
+
+
+def _sparse_table(block_values, reduce):
+    """
+    Level k holds reduce() over 2**k consecutive blocks.
+    """
+    table = [block_values]
+    width = 1
+    while 2 * width <= len(block_values):
+        prev = table[-1]
+        table.append(reduce(prev[:-width], prev[width:]))
+        width *= 2
+    return table
+
+
+class RangeStatsIndex:
+    """
+    Range statistics over a fixed array; positions are array indexes (use a TimeIndex to map times).
+    """
+
+    def __init__(self, values, block_size=BLOCK_SIZE):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.block_size = block_size
+        finite = np.isfinite(self.values)
+
+        deviations, shift = centered(self.values, finite)
+        self.shift = float(shift)
+        self._count = np.concatenate([[0], np.cumsum(finite, dtype=np.int64)])
+        self._sum = np.concatenate([[0.0], np.cumsum(deviations)])
+        self._sum_sq = np.concatenate([[0.0], np.cumsum(deviations * deviations)])
+
+        self._for_min = np.where(finite, self.values, np.inf)
+        self._for_max = np.where(finite, self.values, -np.inf)
+        n_blocks = -(-len(self.values) // block_size)
+        pad = n_blocks * block_size - len(self.values)
+        block_min = np.concatenate([self._for_min, np.full(pad, np.inf)]).reshape(n_blocks, block_size).min(axis=1)
+        block_max = np.concatenate([self._for_max, np.full(pad, -np.inf)]).reshape(n_blocks, block_size).max(axis=1)
+        self._min_table = _sparse_table(block_min, np.minimum)
+        self._max_table = _sparse_table(block_max, np.maximum)
+
+    def __len__(self):
+        return len(self.values)
+
+    def count(self, lo, hi):
+        return int(self._count[hi] - self._count[lo])
+
+    def mean(self, lo, hi):
+        count = self.count(lo, hi)
+        if count == 0:
+            return np.nan
+        return self.shift + (self._sum[hi] - self._sum[lo]) / count
+
+    def std(self, lo, hi):
+        """
+        Population standard deviation (as np.std).
+        """
+        count = self.count(lo, hi)
+        if count == 0:
+            return np.nan
+        mean = (self._sum[hi] - self._sum[lo]) / count
+        var = (self._sum_sq[hi] - self._sum_sq[lo]) / count - mean * mean
+        return float(np.sqrt(max(var, 0.0)))
+
+    def _reduce(self, lo, hi, table, edge_values, reduce, empty):
+        lo, hi = int(lo), int(hi)
+        first_block = -(-lo // self.block_size)
+        last_block = hi // self.block_size
+        if first_block >= last_block:
+            # Range inside one or two partial blocks
+            return reduce.reduce(edge_values[lo:hi]) if hi > lo else empty
+
+        level = (last_block - first_block).bit_length() - 1
+        width = 1 << level
+        result = reduce(table[level][first_block], table[level][last_block - width])
+        head = edge_values[lo:first_block * self.block_size]
+        tail = edge_values[last_block * self.block_size:hi]
+        if len(head):
+            result = reduce(result, reduce.reduce(head))
+        if len(tail):
+            result = reduce(result, reduce.reduce(tail))
+        return result
+
+    def _reduce_many(self, lo, hi, edge_values, reduce, empty):
+        # reduceat over interleaved bounds: even results are the ranges, the padding keeps hi == n valid
+        padded = np.append(edge_values, empty)
+        result = reduce.reduceat(padded, np.column_stack([lo, hi]).ravel())[0::2]
+        result[hi <= lo] = empty
+        return result
+
+    def min(self, lo, hi):
+        result = self._reduce(lo, hi, self._min_table, self._for_min, np.minimum, np.inf)
+        return float(result) if np.isfinite(result) else np.nan
+
+    def max(self, lo, hi):
+        result = self._reduce(lo, hi, self._max_table, self._for_max, np.maximum, -np.inf)
+        return float(result) if np.isfinite(result) else np.nan
+
+    def stats(self, lo, hi, median=True):
+        """
+        calculate_averages-style statistics of values[lo:hi], or None without finite values.
+        The median needs the values themselves (O(k) on the range) and is skipped with median=False.
+        """
+        count = self.count(lo, hi)
+        if count == 0:
+            return None
+        result = {
+            'mean': float(self.mean(lo, hi)),
+            'count': count,
+            'std': self.std(lo, hi),
+            'min': self.min(lo, hi),
+            'max': self.max(lo, hi)
+        }
+        if median:
+            window = self.values[lo:hi]
+            result['median'] = float(np.median(window[np.isfinite(window)]))
+        return result
+
+    def stats_many(self, lo, hi, median=True):
+        """
+        stats() for arrays of ranges: {statistic: array}, NaN where a range
+        has no finite values (its count is 0).
+        """
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.maximum(np.asarray(hi, dtype=np.int64), lo)
+        count = self._count[hi] - self._count[lo]
+        has_values = count > 0
+        safe_count = np.maximum(count, 1)
+        mean = (self._sum[hi] - self._sum[lo]) / safe_count
+        var = (self._sum_sq[hi] - self._sum_sq[lo]) / safe_count - mean * mean
+
+        result = {
+            'mean': np.where(has_values, self.shift + mean, np.nan),
+            'count': count,
+            'std': np.where(has_values, np.sqrt(np.maximum(var, 0.0)), np.nan),
+            'min': np.where(has_values, self._reduce_many(lo, hi, self._for_min, np.minimum, np.inf), np.nan),
+            'max': np.where(has_values, self._reduce_many(lo, hi, self._for_max, np.maximum, -np.inf), np.nan)
+        }
+        if median:
+            result['median'] = range_medians(self.values, lo, hi)
+        return result
+
+
+def range_medians(values, lo, hi):
+    """
+    Median of the finite values of every values[lo:hi] (NaN for none), with one sort
+    of the concatenated ranges instead of one np.median call per range.
+    """
+    lengths = hi - lo
+    ends = np.cumsum(lengths)
+    offsets = np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - lengths, lengths)
+    window = np.repeat(np.arange(len(lo)), lengths)
+    selected = values[np.repeat(lo, lengths) + offsets]
+    finite = np.isfinite(selected)
+    counts = np.bincount(window[finite], minlength=len(lo))
+    has_values = counts > 0
+    medians = np.full(len(lo), np.nan)
+    width = int(lengths.max()) if len(lengths) else 0
+
+    if len(lo) * width <= MEDIAN_GRID_FACTOR * len(selected):
+        # Ranges of similar length: one row per range padded with +inf, all rows sorted at once
+        grid = np.full((len(lo), width), np.inf)
+        grid[window, offsets] = np.where(finite, selected, np.inf)
+        grid.sort(axis=1)
+        rows = np.flatnonzero(has_values)
+        lower = grid[rows, (counts[rows] - 1) // 2]
+        upper = grid[rows, counts[rows] // 2]
+    else:
+        window, selected = window[finite], selected[finite]
+        selected = selected[np.lexsort((selected, window))]
+        first = np.cumsum(counts) - counts
+        lower = selected[(first + (counts - 1) // 2)[has_values]]
+        upper = selected[(first + counts // 2)[has_values]]
+
+    medians[has_values] = (lower + upper) / 2
+    return medians
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Rolling comparison tracks of every analyzer against the reference analyzer.
+Statistics are taken over the samples paired by time (time_alignment): every
+pair gets those of the pairs in the trailing window (t - window, t]. Window
+starts come from one binary search over the sorted pair times and all sums
+from prefix sums, so the tracks of a whole campaign cost a few passes over
+the pairs whatever the window length, instead of one np.corrcoef per window.
+"""
+import logging
+import numpy as np
+from analyzer_logic import AnalyzerLogic
+from centered_sums import range_sums, windowed_correlation
+
+logger = logging.getLogger(__name__)
+
+# Window lengths offered in the GUI, seconds
+ROLLING_WINDOWS = {
+    '15 мин': 15 * 60,
+    '1 ч': 3600,
+    '6 ч': 6 * 3600,
+    '1 сут': 24 * 3600,
+    '7 сут': 7 * 24 * 3600
+}
+DEFAULT_WINDOW = 24 * 3600
+
+# Pairs a window needs for its statistics to be shown
+MIN_PAIRS = 10
+
+METRICS = ('correlation', 'mean_diff', 'reduced_error')
+
+
+def window_starts(times, window):
+    """
+    For every time of the sorted array, the first position inside (t - window, t].
+    """
+    return np.searchsorted(times, times - window, side='right')
+
+
+def rolling_pair_stats(times, x, y, window, min_pairs=MIN_PAIRS):
+    """
+    Trailing-window statistics of the paired samples x, y (times sorted):
+    {'count', 'mean_diff' (mean of y - x), 'correlation'}, one value per pair.
+    Windows with fewer than min_pairs pairs are NaN.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(times)
+    if n == 0:
+        return {'count': np.zeros(0, dtype=np.int64), 'mean_diff': np.zeros(0), 'correlation': np.zeros(0)}
+
+    starts = window_starts(times, window)
+    ends = np.arange(1, n + 1)
+    count = ends - starts
+    window_sums = range_sums(starts, ends)
+
+    diff = y - x
+    diff_mean = diff.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_diff = diff_mean + window_sums(diff - diff_mean) / count
+    correlation = windowed_correlation(x, y, window_sums)
+
+    too_few = count < min_pairs
+    correlation[too_few] = np.nan
+    mean_diff[too_few] = np.nan
+    return {'count': count, 'mean_diff': mean_diff, 'correlation': correlation}
+
+
+def rolling_tracks(timestamps, aligned, data_cols, window, gas_type=None, analyzer_scales=None,
+                   offset=0, min_pairs=MIN_PAIRS):
+    """
+    Rolling tracks of every analyzer against the reference analyzer:
+    {column: {'times', 'count', 'correlation', 'mean_diff', 'reduced_error'}}.
+    aligned is the align_columns output for rows offset .. offset + len(timestamps);
+    reduced_error is None when no scale is configured for the pair.
+    """
+    reference = AnalyzerLogic.reference_column(data_cols)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    tracks = {}
+    for (col1, col2), pair in aligned.items():
+        if col1 != reference:
+            continue
+        start, stop = pair.bounds(offset, offset + len(timestamps))
+        times = timestamps[pair.left_rows[start:stop] - offset]
+        stats = rolling_pair_stats(times, pair.x[start:stop], pair.y[start:stop], window, min_pairs)
+
+        max_scale = AnalyzerLogic.pair_scale(analyzer_scales, gas_type, col1, col2)
+        stats['reduced_error'] = stats['mean_diff'] / max_scale * 100.0 if max_scale else None
+        stats['times'] = times
+        tracks[col2] = stats
+        logger.debug(f"{gas_type}: rolling track {col2} vs {col1}, {len(times)} pairs, window {window} s")
+    return tracks
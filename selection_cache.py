@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Memoized selection results.
+Users switch back and forth between the same few windows (before and after
+maintenance, calibration days), so the averages and comparisons of a plot's
+selection are kept in a bounded LRU cache. The key holds everything the
+results depend on: the data version, the selection bounds snapped to sample
+rows, the filter and lag modes and the gas's analyzer scales, so a cached
+result is never served for different data or settings.
+"""
+from collections import OrderedDict
+
+# Cached selections (one per plot and window); entries hold small dicts only
+MAX_SELECTION_ENTRIES = 64
+
+
+def scales_key(analyzer_scales, gas_type):
+    """
+    Hashable snapshot of the scale settings of one gas ({} -> ()).
+    """
+    settings = (analyzer_scales or {}).get(gas_type) or {}
+    return tuple(sorted((col, tuple(sorted(values.items()))) for col, values in settings.items()))
+
+
+class SelectionCache:
+    """
+    LRU cache of selection results; hits/misses/evictions are counted for the debug output.
+    """
+
+    def __init__(self, max_entries=MAX_SELECTION_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """
+        Cached result of key (marked as most recently used), or None.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """
+        {'entries', 'max_entries', 'hits', 'misses', 'evictions', 'hit_rate'} (hit_rate None before any lookup).
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else None
+        }
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Compact array-backed storage for loaded files.
+A file is kept as one int64 epoch array plus one float array per analyzer
+column. The raw DataFrame is checked against the converted arrays and then
+dropped: cells that did not convert keep their original text in a sparse
+side table, and a short raw preview stays for the data debugger.
+"""
+import sys
+import logging
+import numpy as np
+import pandas as pd
+from numeric_conversion import to_float_array
+
+logger = logging.getLogger(__name__)
+
+# Raw rows kept for the data debugger once the DataFrame is dropped
+RAW_PREVIEW_ROWS = 100
+
+NAT = np.iinfo(np.int64).min
+
+
+class InvalidCells:
+    """
+    Original text of cells that did not convert, looked up by row (rows are sorted).
+    """
+    __slots__ = ('rows', 'texts')
+
+    def __init__(self, rows, texts):
+        self.rows = rows
+        self.texts = texts
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, row, default=''):
+        pos = int(np.searchsorted(self.rows, row))
+        if pos < len(self.rows) and self.rows[pos] == row:
+            return self.texts[pos]
+        return default
+
+    @property
+    def nbytes(self):
+        return int(self.rows.nbytes + self.texts.nbytes + sum(sys.getsizeof(text) for text in self.texts))
+
+
+class SeriesStore:
+    """
+    One file: epoch (int64 ns, NaT as int64 min), values {column: float array}
+    and invalid {column: InvalidCells}.
+    """
+    __slots__ = ('time_col', 'data_cols', 'epoch', 'values', 'invalid')
+
+    def __init__(self, time_col, data_cols, epoch, values, invalid=None):
+        self.time_col = time_col
+        self.data_cols = list(data_cols)
+        self.epoch = epoch
+        self.values = values
+        self.invalid = invalid or {}
+
+    def __len__(self):
+        if self.epoch is not None:
+            return len(self.epoch)
+        return len(next(iter(self.values.values()))) if self.values else 0
+
+    @property
+    def parsed_dates(self):
+        """
+        Zero-copy datetime64 Series over the epoch array.
+        """
+        if self.epoch is None:
+            return None
+        return pd.Series(self.epoch.view('datetime64[ns]'), copy=False)
+
+    def raw_text(self, col, row):
+        cells = self.invalid.get(col)
+        return cells.get(row) if cells is not None else ''
+
+    @property
+    def nbytes(self):
+        total = self.epoch.nbytes if self.epoch is not None else 0
+        total += sum(values.nbytes for values in self.values.values())
+        total += sum(cells.nbytes for cells in self.invalid.values())
+        return int(total)
+
+
+def _invalid_cells(raw, missing):
+    """
+    Non-empty raw cells among the rows where conversion gave NaN/NaT.
+    """
+    rows = np.flatnonzero(missing)
+    if len(rows) == 0:
+        return None
+    cells = raw.iloc[rows]
+    present = cells.notna().to_numpy()
+    texts = cells[present].astype(str)
+    non_blank = (texts.str.strip() != '').to_numpy()
+    if not non_blank.any():
+        return None
+    return InvalidCells(rows[present][non_blank], texts.to_numpy(dtype=object)[non_blank])
+
+
+def memory_usage(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def compact_file_data(file_data, value_dtype=np.float64):
+    """
+    Replace the raw DataFrame of a data_files entry with a SeriesStore.
+
+    The entry keeps its keys: 'parsed_dates' and 'numeric' become views of
+    the store, 'data' is replaced by 'raw_preview', and 'memory' holds the
+    raw and compact sizes in bytes. Entries whose arrays do not match the
+    raw row count are left unchanged.
+    """
+    df = file_data.get('data')
+    if df is None or 'store' in file_data:
+        return file_data
+
+    n = len(df)
+    time_col = file_data.get('time_col')
+    data_cols = list(file_data.get('data_cols') or [])
+    parsed_dates = file_data.get('parsed_dates')
+    numeric = file_data.get('numeric') or {}
+
+    epoch = None
+    if parsed_dates is not None:
+        epoch = np.asarray(parsed_dates, dtype='datetime64[ns]').view('int64')
+    values = {}
+    for col in data_cols:
+        converted = numeric.get(col)
+        if converted is None:
+            converted = to_float_array(df[col])
+        values[col] = np.asarray(converted, dtype=value_dtype)
+
+    # Validation: every converted array must describe every raw row
+    lengths = [len(arr) for arr in values.values()] + ([len(epoch)] if epoch is not None else [])
+    if any(length != n for length in lengths):
+        logger.warning(f"{file_data.get('path')}: converted arrays do not match {n} raw rows, raw data kept")
+        return file_data
+
+    invalid = {}
+    if epoch is not None and time_col in df.columns:
+        cells = _invalid_cells(df[time_col], epoch == NAT)
+        if cells is not None:
+            invalid[time_col] = cells
+    for col in data_cols:
+        if col in df.columns:
+            cells = _invalid_cells(df[col], np.isnan(values[col]))
+            if cells is not None:
+                invalid[col] = cells
+
+    store = SeriesStore(time_col, data_cols, epoch, values, invalid)
+    raw_bytes = memory_usage(df)
+    logger.info(f"{file_data.get('path')}: {n} rows, raw {raw_bytes / 1e6:.1f} MB -> "
+                f"compact {store.nbytes / 1e6:.1f} MB, unconverted cells: "
+                f"{sum(len(cells) for cells in invalid.values())}")
+
+    file_data['store'] = store
+    file_data['parsed_dates'] = store.parsed_dates
+    file_data['numeric'] = store.values
+    file_data['rows'] = n
+    file_data['raw_preview'] = df.head(RAW_PREVIEW_ROWS).copy()
+    file_data['memory'] = {'raw': raw_bytes, 'compact': store.nbytes}
+    del file_data['data']
+    return file_data
+
+
+def row_count(file_data):
+    """
+    Number of rows of a data_files entry, compacted or not.
+    """
+    if 'store' in file_data:
+        return len(file_data['store'])
+    return len(file_data['data'])
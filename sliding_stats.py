@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Statistics of a moving range, updated from the samples at its edges.
+When a selection is dragged, only the samples that entered or left the
+range are processed: count/mean/variance (and the co-moment of paired
+samples) are merged in or out with the batched Welford (Chan) formulas,
+and the finite values are kept in a sorted array where entering samples
+are inserted and leaving ones deleted at positions found by binary search,
+so min, max and median are read off its ends and middle. A move that
+changes more samples than the new range holds rebuilds it instead.
+np.insert/np.delete copy the whole sorted array, so a move of d samples
+over a range of k values costs O(d log k + k), not O(d log k): the moments
+are cheap, and the copy is one memmove of k floats, far below the
+re-sort of the range that a full recompute needs.
+"""
+from abc import ABC, abstractmethod
+import numpy as np
+from centered_sums import varying
+
+
+class _SlidingRange(ABC):
+    """
+    Range [lo, hi) of fixed arrays; subclasses merge batches of rows in and out.
+    """
+
+    def __init__(self):
+        self.lo = 0
+        self.hi = 0
+        self.updated = 0  # Rows processed by the last move
+        self._clear()
+
+    @abstractmethod
+    def _clear(self):
+        """
+        Reset to an empty range.
+        """
+
+    @abstractmethod
+    def _add(self, lo, hi):
+        """
+        Merge rows [lo, hi) into the range.
+        """
+
+    @abstractmethod
+    def _remove(self, lo, hi):
+        """
+        Take rows [lo, hi), all inside the range, out of it.
+        """
+
+    @abstractmethod
+    def stats(self):
+        """
+        Statistics of the current range.
+        """
+
+    def move(self, lo, hi):
+        """
+        Move the range to [lo, hi) and return stats().
+        """
+        lo, hi = int(lo), int(hi)
+        hi = max(hi, lo)
+        changed = abs(lo - self.lo) + abs(hi - self.hi)
+        if hi <= self.lo or lo >= self.hi or changed >= hi - lo:
+            # Disjoint or mostly replaced: rebuilding is cheaper
+            self._clear()
+            self._add(lo, hi)
+            self.updated = hi - lo
+        else:
+            if lo < self.lo:
+                self._add(lo, self.lo)
+            elif lo > self.lo:
+                self._remove(self.lo, lo)
+            if hi > self.hi:
+                self._add(self.hi, hi)
+            elif hi < self.hi:
+                self._remove(hi, self.hi)
+            self.updated = changed
+        self.lo, self.hi = lo, hi
+        return self.stats()
+
+
+def _moments(batch):
+    """
+    (count, mean, sum of squared deviations) of a batch.
+    """
+    mean = batch.mean()
+    deviations = batch - mean
+    return len(batch), mean, float(np.dot(deviations, deviations))
+
+
+class SlidingWindowStats(_SlidingRange):
+    """
+    calculate_averages statistics of values[lo:hi] for a moving range.
+    """
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float64)
+        super().__init__()
+
+    def _clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sorted = np.empty(0)
+
+    def _finite(self, lo, hi):
+        batch = self.values[lo:hi]
+        return np.sort(batch[np.isfinite(batch)])
+
+    def _add(self, lo, hi):
+        batch = self._finite(lo, hi)
+        if len(batch) == 0:
+            return
+        nb, mean_b, m2_b = _moments(batch)
+        n = self.count + nb
+        delta = mean_b - self.mean
+        self.mean += delta * nb / n
+        self.m2 += m2_b + delta * delta * self.count * nb / n
+        self.count = n
+        self.sorted = np.insert(self.sorted, np.searchsorted(self.sorted, batch), batch)
+
+    def _remove(self, lo, hi):
+        batch = self._finite(lo, hi)
+        if len(batch) == 0:
+            return
+        nb, mean_b, m2_b = _moments(batch)
+        n = self.count - nb
+        if n == 0:
+            self._clear()
+            return
+        mean_a = (self.count * self.mean - nb * mean_b) / n
+        delta = mean_b - mean_a
+        self.m2 = max(self.m2 - m2_b - delta * delta * n * nb / self.count, 0.0)
+        self.mean = mean_a
+        self.count = n
+
+        # Equal values are deleted at consecutive positions of their run
+        rank_in_run = np.arange(nb) - np.searchsorted(batch, batch, side='left')
+        self.sorted = np.delete(self.sorted, np.searchsorted(self.sorted, batch, side='left') + rank_in_run)
+
+    def stats(self):
+        """
+        {'mean', 'count', 'std', 'min', 'max', 'median'} of the range, or None without finite values.
+        """
+        n = self.count
+        if n == 0:
+            return None
+        return {
+            'mean': float(self.mean),
+            'count': int(n),
+            'std': float(np.sqrt(self.m2 / n)),
+            'min': float(self.sorted[0]),
+            'max': float(self.sorted[-1]),
+            'median': float((self.sorted[(n - 1) // 2] + self.sorted[n // 2]) / 2)
+        }
+
+
+class SlidingPairStats(_SlidingRange):
+    """
+    Correlation and mean difference of the pairs [lo, hi) of an AlignedPair
+    (positions from AlignedPair.bounds) for a moving range.
+    """
+
+    def __init__(self, pair):
+        self.pair = pair
+        self.x = np.asarray(pair.x, dtype=np.float64)
+        self.y = np.asarray(pair.y, dtype=np.float64)
+        super().__init__()
+
+    def _clear(self):
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+        # Squares of every sample merged in or out since the last rebuild: the scale of the rounding noise
+        self.sq_x = 0.0
+        self.sq_y = 0.0
+
+    def _batch(self, lo, hi):
+        x, y = self.x[lo:hi], self.y[lo:hi]
+        self.sq_x += float(np.dot(x, x))
+        self.sq_y += float(np.dot(y, y))
+        mean_x, mean_y = x.mean(), y.mean()
+        dx, dy = x - mean_x, y - mean_y
+        return len(x), mean_x, mean_y, float(np.dot(dx, dx)), float(np.dot(dy, dy)), float(np.dot(dx, dy))
+
+    def _add(self, lo, hi):
+        if hi <= lo:
+            return
+        nb, mean_x, mean_y, m2_x, m2_y, c_xy = self._batch(lo, hi)
+        n = self.count + nb
+        dx, dy = mean_x - self.mean_x, mean_y - self.mean_y
+        weight = self.count * nb / n
+        self.m2_x += m2_x + dx * dx * weight
+        self.m2_y += m2_y + dy * dy * weight
+        self.c_xy += c_xy + dx * dy * weight
+        self.mean_x += dx * nb / n
+        self.mean_y += dy * nb / n
+        self.count = n
+
+    def _remove(self, lo, hi):
+        if hi <= lo:
+            return
+        nb, mean_x, mean_y, m2_x, m2_y, c_xy = self._batch(lo, hi)
+        n = self.count - nb
+        if n == 0:
+            self._clear()
+            return
+        mean_xa = (self.count * self.mean_x - nb * mean_x) / n
+        mean_ya = (self.count * self.mean_y - nb * mean_y) / n
+        dx, dy = mean_x - mean_xa, mean_y - mean_ya
+        weight = n * nb / self.count
+        self.m2_x = max(self.m2_x - m2_x - dx * dx * weight, 0.0)
+        self.m2_y = max(self.m2_y - m2_y - dy * dy * weight, 0.0)
+        self.c_xy -= c_xy + dx * dy * weight
+        self.mean_x, self.mean_y = mean_xa, mean_ya
+        self.count = n
+
+    def stats(self):
+        """
+        {'paired_count', 'paired_diff' (mean of y - x), 'correlation'} as in calculate_comparisons.
+        """
+        n = self.count
+        correlation = np.nan
+        # Removals leave rounding residue in m2 where a flat stretch remains
+        if n > 1 and varying(self.m2_x, self.sq_x) and varying(self.m2_y, self.sq_y):
+            correlation = float(np.clip(self.c_xy / np.sqrt(self.m2_x * self.m2_y), -1.0, 1.0))
+        return {
+            'paired_count': int(n),
+            'paired_diff': float(self.mean_y - self.mean_x) if n else np.nan,
+            'correlation': correlation
+        }
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from batch_stats import batch_statistics, explicit_windows, write_results
+from window_stats import make_windows
+
+def make_file_data():
+    rng = np.random.default_rng(3)
+    n = 3000
+    dates = pd.Series(pd.date_range('2025-10-13 05:00', periods=n, freq='min'))
+    ametek = 2 + np.sin(np.arange(n) / 50) + rng.normal(0, 0.1, n)
+    other = ametek * 1.1 + rng.normal(0, 0.2, n)
+    other[rng.random(n) < 0.05] = np.nan
+    other[600:700] = np.nan
+    numeric = {'ЭкоСпектр': other, 'Ametek': ametek}
+    return {'path': 'test', 'time_col': 'DateTime', 'data_cols': ['ЭкоСпектр', 'Ametek'],
+            'parsed_dates': dates, 'numeric': numeric, 'data': pd.DataFrame({'DateTime': dates, **numeric})}
+
+def test_batch_stats():
+    logic = AnalyzerLogic()
+    file_data = make_file_data()
+    scales = {'H2S': {'Ametek': {'scale': 10.0}}}
+
+    # Test 1: Shift windows cover the data and do not overlap
+    print("Test 1: Windows")
+    starts, ends = make_windows('2025-10-13 05:00', '2025-10-15 07:00', 'shift')
+    print(pd.to_datetime(starts))
+    assert pd.Timestamp(starts[0]) == pd.Timestamp('2025-10-12 20:00')
+    assert pd.Timestamp(starts[-1]) == pd.Timestamp('2025-10-14 20:00')
+    assert (starts[1:] == ends[:-1] + 1).all()
+    assert len(make_windows('2025-10-13 05:30', '2025-10-13 07:00', 'hour')[0]) == 3
+
+    # Test 2: Every window matches the GUI calculation on the same range
+    print("\nTest 2: Statistics and comparisons")
+    windows = explicit_windows([('13.10.2025 06:00', '13.10.2025 09:30'), ('13.10.2025 14:50', '13.10.2025 15:00'),
+                                ('13.10.2025 07:00', '13.10.2025 08:00'), ('12.10.2025 00:00', '12.10.2025 01:00')])
+    stats, comparisons = batch_statistics({'H2S': file_data}, windows=windows, analyzer_scales=scales)
+    print(stats)
+    print(comparisons)
+    timestamps = file_data['parsed_dates'].to_numpy().view('int64')
+    for i, (start, end) in enumerate(zip(*windows)):
+        extracted = {col: logic.extract_range_data(timestamps, file_data['numeric'][col], start, end)
+                     for col in file_data['data_cols']}
+        extracted = {col: values for col, values in extracted.items() if values is not None}
+        averages = logic.calculate_averages(extracted)
+        window_stats = stats[stats['window_start'] == pd.Timestamp(start)]
+        assert len(window_stats) == len(averages)
+        for _, row in window_stats.iterrows():
+            for key, value in averages[row['analyzer']].items():
+                assert np.isclose(row[key], value, rtol=1e-9), (key, row[key], value)
+
+        expected = logic.calculate_comparisons(averages, extracted, scales, 'H2S')
+        window_comparisons = comparisons[comparisons['window_start'] == pd.Timestamp(start)]
+        assert len(window_comparisons) == len(expected)
+        for (_, row), comparison in zip(window_comparisons.iterrows(), expected):
+            assert (row['analyzer1'], row['analyzer2']) == comparison['pair']
+            for key in ('diff_abs', 'diff_pct', 'correlation', 'reduced_error'):
+                assert np.isclose(row[key], comparison[key], rtol=1e-7), (key, row[key], comparison[key])
+    assert comparisons['analyzer1'].iloc[0] == 'Ametek'
+
+    # Test 3: Periodic windows and CSV output
+    print("\nTest 3: Hourly windows to CSV")
+    stats, comparisons = batch_statistics({'H2S': file_data}, every='hour')
+    assert stats[stats['analyzer'] == 'Ametek']['count'].sum() == 3000
+    assert len(stats) == 99 and len(comparisons) == 49  # 15:00-16:00 has no ЭкоСпектр data
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_results(stats, comparisons, os.path.join(tmp, 'report.csv'))
+        table = pd.read_csv(paths[0], sep=';', decimal=',', encoding='utf-8-sig')
+        assert table['window_end'].iloc[0] == '13.10.2025 05:59:59'
+        assert len(table) == len(stats) and np.allclose(table['mean'], stats['mean'])
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_batch_stats()
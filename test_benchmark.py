@@ -0,0 +1,67 @@
+import argparse
+from analyzer_logic import AnalyzerLogic
+from benchmark import (generate_export, run_benchmarks, compare_results, row_count, time_call,
+                       TIME_COL, BENCHMARKS)
+
+def test_benchmark():
+    logic = AnalyzerLogic()
+
+    # Test 1: Generator is reproducible and has the export's quirks
+    print("Test 1: generate_export")
+    df, times = generate_export(20000, analyzers=3, seed=1, return_times=True)
+    assert df.equals(generate_export(20000, analyzers=3, seed=1))
+    assert not df.equals(generate_export(20000, analyzers=3, seed=2))
+    print(df.head())
+    assert list(df.columns) == [TIME_COL, 'Ametek', 'ЭкоСпектр', 'Хромос']
+    assert len(df) == 20000
+
+    # Mixed date formats, all parsed to the generated times, with outage gaps
+    dates = df[TIME_COL]
+    assert dates.str.contains('-').any() and (dates.str.len() == 16).any()
+    parsed = logic.parse_dates(dates)
+    print(f"Date formats: {logic.last_parse_stats['parsed']}")
+    assert (parsed.to_numpy() == times.to_numpy()).all()
+    steps = times.to_series().diff().dt.total_seconds().dropna()
+    assert steps.min() == 60 and steps.max() > 3600
+
+    # Decimal-comma strings mixed with numbers, empty cells and 0/1 dropouts
+    cells = df['Ametek']
+    assert cells.map(lambda v: isinstance(v, str) and ',' in v).mean() > 0.5
+    assert cells.map(lambda v: isinstance(v, float)).any()
+    values = logic.manual_numeric_conversion(cells)
+    assert (cells == '').sum() == values.isna().sum() > 0
+    assert ((values == 0) | (values == 1)).sum() > 50
+
+    # Test 2: Timing and comparison helpers
+    print("\nTest 2: time_call / compare_results / row_count")
+    calls = []
+    timing = time_call(lambda: calls.append(1), repeat=4, setup=lambda: calls.append(0))
+    assert calls == [0, 1] * 4 and len(timing['runs']) == 4 and timing['best'] <= timing['median']
+    baseline = {'results': [{'benchmark': 'parse_dates', 'rows': 10, 'best': 1.0},
+                            {'benchmark': 'plot_data', 'rows': 10, 'best': 2.0}]}
+    current = {'results': [{'benchmark': 'parse_dates', 'rows': 10, 'best': 1.5},
+                           {'benchmark': 'plot_data', 'rows': 10, 'best': 2.0},
+                           {'benchmark': 'plot_data', 'rows': 100, 'best': 9.0}]}
+    comparison = compare_results(baseline, current, threshold=1.25)
+    print(comparison)
+    assert [(r['benchmark'], r['ratio'], r['regression']) for r in comparison] == \
+        [('parse_dates', 1.5, True), ('plot_data', 1.0, False)]
+    assert row_count('10k') == 10_000 and row_count('2.5M') == 2_500_000 and row_count('500') == 500
+    for bad in ('abc', '1'):
+        try:
+            row_count(bad)
+            assert False, bad
+        except argparse.ArgumentTypeError:
+            pass
+
+    # Test 3: Benchmarks run end to end (without the GUI)
+    print("\nTest 3: run_benchmarks")
+    only = [name for name in BENCHMARKS if name != 'plot_data']
+    results = run_benchmarks([5000], repeat=1, only=only)
+    assert [r['benchmark'] for r in results] == only
+    assert all(r['rows'] == 5000 and r['best'] >= 0 for r in results)
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_benchmark()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from campaign_loader import load_campaign, kway_merge, drop_duplicates
+
+def write_csv(path, start, periods, value, extra_col=False):
+    times = pd.date_range(start, periods=periods, freq='10min')
+    df = pd.DataFrame({'DateTime': times.strftime('%d.%m.%Y %H:%M'), 'Ametek': value})
+    if extra_col:
+        df['ЭкоСпектр'] = value + 0.5
+    df.to_csv(path, sep=';', index=False)
+
+def test_campaign_loader():
+    # Test 1: k-way merge of sorted chunks, ties keep the earlier chunk first
+    print("Test 1: k-way merge")
+    chunks = [
+        {'ts': np.array([1, 4, 7]), 'values': {'a': np.array([1.0, 4.0, 7.0])}},
+        {'ts': np.array([2, 4, 8]), 'values': {'a': np.array([2.0, 40.0, 8.0])}},
+        {'ts': np.array([3, 9]), 'values': {'b': np.array([3.0, 9.0])}},
+    ]
+    merged = kway_merge(chunks, ['a', 'b'])
+    print(merged)
+    assert merged['ts'].tolist() == [1, 2, 3, 4, 4, 7, 8, 9]
+    assert merged['values']['a'][3] == 4.0 and merged['values']['a'][4] == 40.0
+    assert np.isnan(merged['values']['a'][2]) and merged['values']['b'][2] == 3.0
+
+    # Test 2: Duplicates merged column by column, first finite value wins
+    print("\nTest 2: drop_duplicates")
+    merged = {'ts': np.array([1, 2, 2, 2, 3]),
+              'values': {'a': np.array([1.0, np.nan, 5.0, 6.0, 3.0]), 'b': np.array([np.nan, np.nan, np.nan, 7.0, 8.0])}}
+    deduped, removed = drop_duplicates(merged)
+    assert removed == 2 and deduped['ts'].tolist() == [1, 2, 3]
+    assert deduped['values']['a'].tolist() == [1.0, 5.0, 3.0]
+    assert np.isnan(deduped['values']['b'][0]) and deduped['values']['b'][1:].tolist() == [7.0, 8.0]
+
+    # Test 3: Folder of weekly exports with an overlap and a gap
+    print("\nTest 2: Campaign folder")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_csv(os.path.join(tmp, 'week2.csv'), '2025-10-13 00:30', 4, 2.0, extra_col=True)
+        write_csv(os.path.join(tmp, 'week1.csv'), '2025-10-13 00:00', 4, 1.0)
+        write_csv(os.path.join(tmp, 'week3.csv'), '2025-10-14 00:00', 3, 3.0)
+
+        result = load_campaign(tmp, use_processes=False)
+        report = result['campaign_report']
+        dates = result['parsed_dates']
+        print(result['data'])
+        assert result['data_cols'] == ['Ametek', 'ЭкоСпектр']
+        assert dates.is_monotonic_increasing and dates.is_unique
+        assert len(dates) == 4 + 3 + 3  # 00:30 is in both week1 and week2
+        assert report['duplicates_removed'] == 1
+        assert len(report['overlaps']) == 1 and len(report['gaps']) == 1
+        assert report['gaps'][0]['start'] == pd.Timestamp('2025-10-13 01:00')
+        # Duplicate timestamp: the file that starts earlier wins, columns only in the later file are kept
+        assert result['numeric']['Ametek'][3] == 1.0
+        assert result['numeric']['ЭкоСпектр'][3] == 2.5
+        assert np.isnan(result['numeric']['ЭкоСпектр'][2])
+
+        # Same result through the process pool
+        parallel = load_campaign([os.path.join(tmp, name) for name in sorted(os.listdir(tmp))])
+        assert np.array_equal(parallel['parsed_dates'].values, dates.values)
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_campaign_loader()
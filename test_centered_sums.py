@@ -0,0 +1,48 @@
+import numpy as np
+from centered_sums import centered, varying, range_sums, windowed_correlation
+
+def test_centered_sums():
+    rng = np.random.default_rng(5)
+
+    # Test 1: Centring skips invalid entries, per column for 2-D input
+    print("Test 1: centered")
+    values = np.array([[1.0, 10.0], [np.nan, 20.0], [3.0, np.nan]])
+    result, mean = centered(values)
+    print(result, mean)
+    assert np.allclose(mean, [2.0, 15.0])
+    assert np.allclose(result, [[-1.0, -5.0], [0.0, 5.0], [1.0, 0.0]])
+    result, mean = centered(np.full(3, np.nan))
+    assert mean == 0 and (result == 0).all()
+
+    # Test 2: Windowed correlations match np.corrcoef on a large offset
+    print("\nTest 2: windowed_correlation")
+    x = 1e6 + rng.normal(0, 1, 3000).cumsum()
+    y = 0.5 * x + rng.normal(0, 1, 3000)
+    x[rng.random(3000) < 0.1] = np.nan
+    y[1000:1200] = y[1000]                  # constant stretch
+    lo = np.array([0, 500, 1000, 1050, 2990, 10])
+    hi = np.array([3000, 1500, 1200, 1051, 3000, 10])
+    correlation = windowed_correlation(x, y, range_sums(lo, hi))
+    print(correlation)
+    for k, (a, b) in enumerate(zip(lo, hi)):
+        valid = np.isfinite(x[a:b]) & np.isfinite(y[a:b])
+        if valid.sum() < 2 or np.ptp(y[a:b][valid]) == 0:
+            assert np.isnan(correlation[k]), k
+        else:
+            assert np.isclose(correlation[k], np.corrcoef(x[a:b][valid], y[a:b][valid])[0, 1], atol=1e-9), k
+
+    # Same pairs grouped by window number
+    bins = np.repeat([0, 1], 1500)
+    grouped = windowed_correlation(x, y, lambda w: np.bincount(bins, weights=w, minlength=3))
+    assert np.allclose(grouped[:2], windowed_correlation(x, y, range_sums(np.array([0, 1500]),
+                                                                          np.array([1500, 3000]))))
+    assert np.isnan(grouped[2])
+
+    # Test 3: Variation below the rounding noise counts as constant
+    print("\nTest 3: varying")
+    assert varying(np.array([1e-3, 1e-12]), 1e4).tolist() == [True, False]
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_centered_sums()
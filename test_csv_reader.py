@@ -0,0 +1,45 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from csv_reader import read_csv_fast, sniff_csv
+from data_loader import load_data_file
+
+def test_csv_reader():
+    logic = AnalyzerLogic()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Test 1: Semicolon-separated, comma decimals, dd.mm.yyyy HH:MM, cp1251
+        print("Test 1: Historian CSV")
+        path = os.path.join(tmp, 'export.csv')
+        with open(path, 'w', encoding='cp1251') as f:
+            f.write('TagName;DateTime;Ametek;ЭкоСпектр\n')
+            f.write('IMES2_151AR2A.PV;13.10.2025 00:00;1,5;1,4\n')
+            f.write('IMES2_151AR2A.PV;13.10.2025 00:10;2,5;\n')
+            f.write('IMES2_151AR2A.PV;13.10.2025 00:20;0;0,1\n')
+        assert sniff_csv(path) == ('cp1251', ';', ',')
+        df = read_csv_fast(path, logic)
+        print(df)
+        assert list(df.columns) == ['DateTime', 'Ametek', 'ЭкоСпектр']
+        assert df['DateTime'].dtype.kind == 'M'
+        assert df['DateTime'][1] == pd.Timestamp('2025-10-13 00:10')
+        assert df['Ametek'].dtype == np.float64
+        assert np.allclose(df['Ametek'].values, [1.5, 2.5, 0.0])
+        assert np.isnan(df['ЭкоСпектр'].values[1])
+
+        # Test 2: TSV with text cells in a numeric column goes through the slow path
+        print("\nTest 2: TSV with bad cells")
+        path = os.path.join(tmp, 'export.tsv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('DateTime\tAmetek\n')
+            f.write('2025-10-13 00:00:00\t1.5\n')
+            f.write('2025-10-13 00:10:00\tBad\n')
+        result = load_data_file(path, logic)
+        assert result['parsed_dates'].notna().all()
+        assert result['numeric']['Ametek'][0] == 1.5
+        assert np.isnan(result['numeric']['Ametek'][1])
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_csv_reader()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from data_cache import DataCache
+
+def test_data_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DataCache(os.path.join(tmp, 'cache'))
+        src = os.path.join(tmp, 'export.xlsx')
+        with open(src, 'wb') as f:
+            f.write(b'fake export contents')
+
+        dates = pd.Series(pd.to_datetime(['2025-10-13 00:00', '2025-10-13 00:10', None]))
+        numeric = {'Ametek': np.array([1.5, np.nan, 2.0]), 'ЭкоСпектр': np.array([1.4, 1.6, 2.1])}
+
+        # Test 1: Miss before save, hit after save
+        print("Test 1: Save/Load")
+        assert cache.load(src) is None
+        cache.save(src, 'DateTime', ['Ametek', 'ЭкоСпектр'], dates, numeric)
+        cached = cache.load(src)
+        assert cached is not None
+        assert cached['time_col'] == 'DateTime'
+        assert cached['data_cols'] == ['Ametek', 'ЭкоСпектр']
+        assert cached['parsed_dates'][1] == pd.Timestamp('2025-10-13 00:10')
+        assert pd.isna(cached['parsed_dates'][2])
+        assert np.isnan(cached['numeric']['Ametek'][1])
+        assert cached['numeric']['ЭкоСпектр'][2] == 2.1
+
+        # Test 2: Changed contents invalidate the entry
+        print("Test 2: Content change")
+        with open(src, 'ab') as f:
+            f.write(b' more')
+        assert cache.load(src) is None
+
+        # Test 3: Explicit invalidation and clear
+        print("Test 3: Invalidate/Clear")
+        cache.save(src, 'DateTime', ['Ametek', 'ЭкоСпектр'], dates, numeric)
+        assert cache.invalidate(src) >= 1
+        assert cache.load(src) is None
+        cache.save(src, 'DateTime', ['Ametek', 'ЭкоСпектр'], dates, numeric)
+        assert cache.clear() >= 1
+        assert cache.load(src) is None
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_data_cache()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from data_loader import load_data_file, LoadCancelled, LOAD_STAGES
+
+def make_export(path):
+    pd.DataFrame({
+        'TagName': ['IMES2_151AR2A.PV'] * 3,
+        'DateTime': ['13.10.2025 0:00:00', '13.10.2025 0:10:00', '13.10.2025 0:20'],
+        'Ametek': ['1,5', '2.5', '0'],
+        'ЭкоСпектр': ['1,4', '2.6', '0,1'],
+    }).to_excel(path, index=False)
+
+def test_data_loader():
+    logic = AnalyzerLogic()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.xlsx')
+        make_export(path)
+
+        # Test 1: Stages reported in order, result has the data_files layout
+        print("Test 1: Load with progress")
+        stages = []
+        result = load_data_file(path, logic, progress=lambda stage, percent: stages.append(stage))
+        seen = [s for i, s in enumerate(stages) if i == 0 or stages[i - 1] != s]
+        print(f"Stages: {seen}")
+        assert seen == LOAD_STAGES
+        assert result['time_col'] == 'DateTime'
+        assert result['data_cols'] == ['Ametek', 'ЭкоСпектр']
+        assert result['parsed_dates'].notna().all()
+        assert np.allclose(result['numeric']['Ametek'], [1.5, 2.5, 0.0])
+
+        # Test 2: Cancellation between stages
+        print("\nTest 2: Cancellation")
+        try:
+            load_data_file(path, logic, is_cancelled=lambda: True)
+            assert False, "LoadCancelled expected"
+        except LoadCancelled:
+            pass
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_data_loader()
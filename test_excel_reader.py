@@ -0,0 +1,60 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from excel_reader import read_excel_streaming
+
+def test_excel_reader():
+    logic = AnalyzerLogic()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'export.xlsx')
+        pd.DataFrame({
+            'TagName': ['IMES2_151AR2A.PV'] * 5,
+            'DateTime': ['13.10.2025 0:00:00', '13.10.2025 0:10:00', '13.10.2025 0:20',
+                         '13.10.2025 0:30:00', '13.10.2025 0:40:00'],
+            'Ametek': ['1,5', 2.5, '0', None, 4],
+            'ЭкоСпектр': [1.4, '2,6', 0.1, 3.3, 'n/a'],
+        }).to_excel(path, index=False)
+
+        # Tiny chunks so the chunked path is exercised
+        print("Test 1: Column pruning and chunked conversion")
+        df = read_excel_streaming(path, logic, chunk_size=2, sniff_rows=2)
+        print(df)
+        assert list(df.columns) == ['DateTime', 'Ametek', 'ЭкоСпектр']
+        assert len(df) == 5
+        assert df['Ametek'].dtype == np.float64
+        assert np.allclose(df['Ametek'].values[[0, 1, 2, 4]], [1.5, 2.5, 0.0, 4.0])
+        assert np.isnan(df['Ametek'].values[3])
+        assert df['ЭкоСпектр'].values[1] == 2.6
+        assert np.isnan(df['ЭкоСпектр'].values[4])
+
+        # Test 2: Columns empty or non-numeric through the sniffed rows are decided on the full column
+        print("\nTest 2: Analyzer switched on after the sniffed rows")
+        n = 1500
+        late = [None] * 1000 + [f'{i % 7},5' for i in range(n - 1000)]
+        text = ['нет связи'] * 1000 + ['3,5'] * (n - 1000)
+        path = os.path.join(tmp, 'late.xlsx')
+        pd.DataFrame({
+            'DateTime': pd.date_range('2025-10-13', periods=n, freq='10min').strftime('%d.%m.%Y %H:%M:%S'),
+            'Ametek': ['1,5'] * n,
+            'Новый': late,
+            'Комментарий': [None] * 1200 + ['ok'] * (n - 1200),
+            'Текст': text,
+        }).to_excel(path, index=False)
+        df = read_excel_streaming(path, logic)
+        print(df.tail(3))
+        assert list(df.columns) == ['DateTime', 'Ametek', 'Новый']
+        assert df['Новый'].dtype == np.float64
+        assert df['Новый'].isna().sum() == 1000 and df['Новый'].values[1001] == 1.5
+        full_time, full_cols = logic.identify_columns(pd.read_excel(path))
+        assert ['DateTime'] + full_cols == list(df.columns)
+
+        # Test 3: Cancellation returns None
+        print("\nTest 2: Cancellation")
+        assert read_excel_streaming(path, logic, chunk_size=1, sniff_rows=1, is_cancelled=lambda: True) is None
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_excel_reader()
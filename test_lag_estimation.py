@@ -0,0 +1,61 @@
+import numpy as np
+from lag_estimation import masked_cross_correlation, estimate_lag, reference_lags
+from time_alignment import align_pair
+
+def test_lag_estimation():
+    rng = np.random.default_rng(11)
+
+    # Test 1: FFT correlations match direct Pearson at every lag, gaps included
+    print("Test 1: masked_cross_correlation vs direct Pearson")
+    x = rng.normal(0, 1, 300).cumsum()
+    y = np.roll(x, 7) + rng.normal(0, 0.5, 300)
+    x[rng.random(300) < 0.1] = np.nan
+    y[rng.random(300) < 0.1] = np.nan
+    lags, correlations, overlaps = masked_cross_correlation(x, y, 20)
+    for k, correlation, overlap in zip(lags, correlations, overlaps):
+        a, b = (x[:300 - k], y[k:]) if k >= 0 else (x[-k:], y[:300 + k])
+        valid = np.isfinite(a) & np.isfinite(b)
+        assert overlap == valid.sum()
+        assert np.isclose(correlation, np.corrcoef(a[valid], b[valid])[0, 1]), k
+    print(lags[np.nanargmax(correlations)])
+    assert lags[np.nanargmax(correlations)] == 7
+
+    # Flatness is judged per series (as in pairwise_stats): rescaling one side changes nothing
+    _, rescaled, _ = masked_cross_correlation(x * 1e-8, y * 1e3, 20)
+    assert np.allclose(rescaled, correlations, equal_nan=True)
+    x_flat = np.where(np.isfinite(x), 0.1, np.nan)
+    assert np.isnan(masked_cross_correlation(x_flat, y, 20)[1]).all()
+
+    # Test 2: Delay of a lagging analyzer with gaps and irregular sampling
+    print("\nTest 2: estimate_lag")
+    timestamps = np.arange(5000) * 60.0 + rng.uniform(-5, 5, 5000)
+    signal = np.convolve(rng.normal(0, 1, 5100), np.ones(30) / 30, mode='same')
+    reference = signal[50:5050] + rng.normal(0, 0.02, 5000)
+    delayed = 2 * signal[38:5038] + 1          # 12 samples (720 s) behind
+    delayed[1000:1400] = np.nan
+    result = estimate_lag(timestamps, reference, delayed)
+    print(result)
+    # Jittered timestamps: the grid step is the median step, close to 60 s
+    assert result['lag_steps'] == 12 and abs(result['lag'] - 720) < 5 and not result['at_limit']
+    assert result['correlation'] > 0.95 > result['zero_lag_correlation']
+    assert estimate_lag(timestamps, -delayed, -reference)['lag_steps'] == -12
+    assert estimate_lag(timestamps[:5], reference[:5], delayed[:5]) is None
+
+    # Test 3: Lags of every analyzer against the reference
+    print("\nTest 3: reference_lags")
+    lags = reference_lags(timestamps, {'ЭкоСпектр': delayed, 'Ametek': reference, 'Пустой': np.full(5000, np.nan)})
+    print({col: lag and lag['lag'] for col, lag in lags.items()})
+    assert list(lags) == ['ЭкоСпектр', 'Пустой']
+    assert lags['ЭкоСпектр']['lag_steps'] == 12 and lags['Пустой'] is None
+
+    # Test 4: Pairing with a lag compensates the delay
+    print("\nTest 4: align_pair with lag")
+    grid = np.arange(5000) * 60.0
+    pair = align_pair(grid, reference, delayed, lag=720.0)
+    assert (pair.right_rows == pair.left_rows + 12).all()
+    assert np.corrcoef(pair.x, pair.y)[0, 1] > 0.95
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_lag_estimation()
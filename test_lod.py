@@ -0,0 +1,38 @@
+import numpy as np
+from lod import MinMaxPyramid
+
+def test_lod():
+    rng = np.random.default_rng(0)
+    n = 100003
+    x = np.arange(n, dtype=np.float64)
+    y = rng.random(n)
+    y[54321] = 50.0
+    y[54322] = -50.0
+    pyramid = MinMaxPyramid(x, y)
+
+    # Test 1: Small ranges are returned at full resolution
+    print("Test 1: Raw points when zoomed in")
+    px, py = pyramid.query(100, 199, 1000)
+    assert px.tolist() == x[99:201].tolist()
+    assert pyramid.plan(100, 199, 1000)[0] is None
+
+    # Test 2: Decimated output fits the budget and keeps every extreme
+    print("\nTest 2: Decimation keeps spikes")
+    for x_start, x_end in [(0, n), (50000, 60000), (1000, 90001)]:
+        px, py = pyramid.query(x_start, x_end, 2000)
+        window = y[int(x_start):int(x_end) + 1]
+        print(x_start, x_end, len(px))
+        assert len(px) <= 2000 + 4
+        assert np.all(np.diff(px) >= 0)
+        assert py.max() >= window.max() and py.min() <= window.min()
+        assert np.all(np.isin(py, y))
+
+    # Test 3: Same view gives the same plan, so redraws can be skipped
+    print("\nTest 3: Stable plans")
+    assert pyramid.plan(0, n, 2000) == pyramid.plan(0.5, n, 2000)
+    assert MinMaxPyramid(np.array([]), np.array([])).query(0, 1, 10)[0].tolist() == []
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_lod()
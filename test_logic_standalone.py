@@ -33,7 +33,46 @@ def test_logic():
     assert parsed[0].year == 2025
     assert parsed[0].month == 11
     assert parsed[0].day == 22
-    
+
+    # Test 4: Mixed formats, native datetimes, repeated values
+    print("\nTest 4: Mixed Date Formats")
+    dates = pd.Series(['01.09.2025 0:00:00', '01.09.2025 0:10:00', '23.11.2025 23:50',
+                       pd.Timestamp('2025-10-13 00:20'), None, '01.09.2025 0:10:00'])
+    parsed = logic.parse_dates(dates)
+    print(f"Output: {parsed.tolist()}")
+    print(f"Stats: {logic.last_parse_stats}")
+    assert parsed[0] == pd.Timestamp('2025-09-01 00:00')
+    assert parsed[2] == pd.Timestamp('2025-11-23 23:50')
+    assert parsed[3] == pd.Timestamp('2025-10-13 00:20')
+    assert pd.isna(parsed[4])
+    assert parsed[5] == parsed[1]
+    assert logic.last_parse_stats['unique'] == 4
+    assert logic.last_parse_stats['format'] == '%d.%m.%Y %H:%M:%S'
+
+    # Test 5: Leftovers in several formats keep day-first order (an ISO leftover first)
+    print("\nTest 5: Mixed-Format Leftovers")
+    times = pd.date_range('2025-09-01', periods=200, freq='min')
+    strings = [t.strftime('%d.%m.%Y %H:%M' if i % 10 == 0 else '%d.%m.%Y %H:%M:%S') for i, t in enumerate(times)]
+    dates = pd.Series(['2025-08-31 23:00:00'] + strings)
+    parsed = logic.parse_dates(dates)
+    print(f"Stats: {logic.last_parse_stats['parsed']}")
+    assert parsed[0] == pd.Timestamp('2025-08-31 23:00')
+    assert (parsed[1:].to_numpy() == times.to_numpy()).all()
+    dates = pd.Series(['2025-09-05 10:00:00', '13.09.2025 10:00', '05.09.2025 10:00'])
+    assert logic.parse_dates(dates).tolist() == [pd.Timestamp('2025-09-05 10:00'), pd.Timestamp('2025-09-13 10:00'),
+                                                 pd.Timestamp('2025-09-05 10:00')]
+
+    # Test 6: Mixed numeric/string cells (Excel numbers next to comma-decimal text)
+    print("\nTest 5: Mixed Numeric Cells")
+    s = pd.Series([1.25, '2,5', 3, None, 'нет данных', '4.75'], dtype=object)
+    res = logic.manual_numeric_conversion(s)
+    print(f"Output: {res.tolist()}")
+    assert res.tolist()[:3] == [1.25, 2.5, 3.0]
+    assert pd.isna(res[3]) and pd.isna(res[4])
+    assert res[5] == 4.75
+    df = pd.DataFrame({'Время': ['01.09.2025 0:00'], 'H2S': ['0,5'], 'Комментарий': ['ok']})
+    assert logic.identify_columns(df) == ('Время', ['H2S'])
+
     print("\nALL TESTS PASSED")
 
 if __name__ == "__main__":
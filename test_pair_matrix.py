@@ -0,0 +1,69 @@
+import numpy as np
+from itertools import combinations
+from analyzer_logic import AnalyzerLogic
+from pair_matrix import pairwise_stats
+
+def test_pair_matrix():
+    logic = AnalyzerLogic()
+    rng = np.random.default_rng(22)
+
+    # Test 1: Matrix statistics match masked per-pair computations
+    print("Test 1: pairwise_stats vs np.corrcoef")
+    base = rng.normal(0, 1, 5000).cumsum()
+    values = np.column_stack([base * (1 + k / 10) + 1000 * k + rng.normal(0, 1 + k, 5000) for k in range(8)])
+    values[rng.random(values.shape) < 0.15] = np.nan
+    values[:, 6] = np.where(np.isfinite(values[:, 6]), 3.0, np.nan)  # constant column
+    values[:, 7] = np.nan                                            # empty column
+    stats = pairwise_stats(values)
+    for i, j in combinations(range(8), 2):
+        valid = np.isfinite(values[:, i]) & np.isfinite(values[:, j])
+        assert stats['count'][i, j] == stats['count'][j, i] == valid.sum()
+        if valid.sum() == 0:
+            assert np.isnan(stats['mean_diff'][i, j]) and np.isnan(stats['correlation'][i, j])
+            continue
+        assert np.isclose(stats['mean_diff'][i, j], np.mean(values[valid, j] - values[valid, i]))
+        assert np.isclose(stats['mean_diff'][j, i], -stats['mean_diff'][i, j])
+        if 6 in (i, j):
+            assert np.isnan(stats['correlation'][i, j]), (i, j)
+        else:
+            expected = np.corrcoef(values[valid, i], values[valid, j])[0, 1]
+            assert np.isclose(stats['correlation'][i, j], expected, rtol=1e-10), (i, j)
+    print(np.round(stats['correlation'][:3, :3], 4))
+
+    # Test 2: calculate_comparisons keeps its per-pair output
+    print("\nTest 2: calculate_comparisons")
+    names = ['A1', 'Ametek', 'A2', 'Const', 'Empty']
+    extracted = {name: values[:, k] for name, k in zip(names, (0, 1, 2, 6, 7))}
+    averages = logic.calculate_averages(extracted)
+    scales = {'H2S': {'Ametek': {'scale': 50}, 'A1': {'scale': 100}}}
+    comparisons = logic.calculate_comparisons(averages, extracted, scales, 'H2S')
+    print([comp['pair'] for comp in comparisons])
+    assert [comp['pair'] for comp in comparisons] == [('Ametek', 'A1'), ('A1', 'A2'), ('A1', 'Const'),
+                                                      ('Ametek', 'A2'), ('Ametek', 'Const'), ('A2', 'Const')]
+    for comp in comparisons:
+        col1, col2 = comp['pair']
+        d1, d2 = extracted[col1], extracted[col2]
+        valid = np.isfinite(d1) & np.isfinite(d2)
+        assert comp['paired_count'] == valid.sum()
+        assert np.isclose(comp['paired_diff'], np.mean(d2[valid] - d1[valid]))
+        assert np.isclose(comp['diff_abs'], averages[col2]['mean'] - averages[col1]['mean'])
+        assert np.isclose(comp['diff_pct'], comp['diff_abs'] / comp['mean1'] * 100)
+        if 'Const' in comp['pair']:
+            assert np.isnan(comp['correlation'])
+        else:
+            assert np.isclose(comp['correlation'], np.corrcoef(d1[valid], d2[valid])[0, 1])
+    assert np.isclose(comparisons[0]['reduced_error'], comparisons[0]['diff_abs'])
+    assert comparisons[3]['reduced_error'] is not None and comparisons[5]['reduced_error'] is None
+
+    # Test 3: Columns of different lengths are still compared pair by pair
+    print("\nTest 3: Unequal lengths")
+    short = {'Ametek': values[:100, 0], 'A1': values[:, 1]}
+    comparison = logic.calculate_comparisons(logic.calculate_averages(short), short)[0]
+    valid = np.isfinite(values[:100, 0]) & np.isfinite(values[:100, 1])
+    assert comparison['paired_count'] == valid.sum()
+    assert np.isclose(comparison['correlation'], np.corrcoef(values[:100, 0][valid], values[:100, 1][valid])[0, 1])
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_pair_matrix()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from plot_pipeline import PlotPipeline
+from series_store import compact_file_data
+
+def make_file_data():
+    # Unsorted export with an invalid timestamp and 0/1 outliers
+    dates = pd.Series(pd.to_datetime(['2025-10-13 00:20', '2025-10-13 00:00', None,
+                                      '2025-10-13 00:10', '2025-10-13 00:30']))
+    df = pd.DataFrame({'DateTime': dates, 'Ametek': ['2,5', '1,5', '9', '0', '3,5']})
+    return {'data': df, 'time_col': 'DateTime', 'data_cols': ['Ametek'], 'parsed_dates': dates}
+
+def test_plot_pipeline():
+    pipeline = PlotPipeline(AnalyzerLogic())
+    file_data = make_file_data()
+
+    # Test 1: Sort and convert, invalid time dropped
+    print("Test 1: Sort + convert")
+    series = pipeline.prepare('H2S', file_data)
+    print(series['values'], series['source_rows'])
+    assert series['values']['Ametek'].tolist() == [1.5, 0.0, 2.5, 3.5]
+    assert series['time_data'].is_monotonic_increasing
+    assert series['source_rows'].tolist() == [1, 3, 0, 4]
+    assert series['valid_rows'] == 4
+    assert series['version'] == file_data['version'] and not series['filter_outliers']
+
+    # Test 2: Filter toggle recomputes only the filter stage
+    print("\nTest 2: Filter toggle")
+    series = pipeline.prepare('H2S', file_data, filter_outliers=True)
+    print(pipeline.runs)
+    assert series['values']['Ametek'].tolist() == [1.5, 1.5, 2.5, 3.5]
+    assert pipeline.runs == {'sort': 1, 'convert': 1, 'filter': 1, 'stats': 2, 'align': 2, 'slice': 1}
+    pipeline.prepare('H2S', file_data, filter_outliers=False)
+    pipeline.prepare('H2S', file_data, filter_outliers=True)
+    assert pipeline.runs == {'sort': 1, 'convert': 1, 'filter': 1, 'stats': 2, 'align': 2, 'slice': 1}
+
+    # Test 3: Date range change recomputes only the slice, values are views
+    print("\nTest 3: Date range")
+    date_range = (pd.Timestamp('2025-10-13 00:10'), pd.Timestamp('2025-10-13 00:20'))
+    series = pipeline.prepare('H2S', file_data, filter_outliers=True, date_range=date_range)
+    print(pipeline.runs)
+    assert series['values']['Ametek'].tolist() == [1.5, 2.5]
+    assert series['time_data'].iloc[0] == date_range[0]
+    assert np.shares_memory(series['timestamps'], pipeline.prepare('H2S', file_data)['timestamps'])
+    assert pipeline.runs == {'sort': 1, 'convert': 1, 'filter': 1, 'stats': 2, 'align': 2, 'slice': 2}
+
+    # Test 4: A newly loaded file invalidates every stage
+    print("\nTest 4: New data version")
+    pipeline.prepare('H2S', make_file_data())
+    assert pipeline.runs == {'sort': 2, 'convert': 2, 'filter': 1, 'stats': 3, 'align': 3, 'slice': 3}
+
+    # Test 5: A compacted entry gives the same series without the raw table
+    print("\nTest 5: Compacted entry")
+    file_data = compact_file_data(make_file_data())
+    assert 'data' not in file_data
+    series = pipeline.prepare('H2S', file_data)
+    assert series['values']['Ametek'].tolist() == [1.5, 0.0, 2.5, 3.5]
+    assert series['source_rows'].tolist() == [1, 3, 0, 4]
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_plot_pipeline()
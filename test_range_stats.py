@@ -0,0 +1,59 @@
+import numpy as np
+from analyzer_logic import AnalyzerLogic
+from range_stats import RangeStatsIndex
+from time_index import TimeIndex
+
+def test_range_stats():
+    logic = AnalyzerLogic()
+    rng = np.random.default_rng(0)
+    values = 1000 + rng.normal(0, 0.5, 5000)
+    values[rng.random(5000) < 0.05] = np.nan
+    values[100:400] = np.nan  # a long gap, several blocks wide
+
+    # Test 1: Random ranges match the direct calculation
+    print("Test 1: Random ranges")
+    index = RangeStatsIndex(values, block_size=16)
+    for lo, hi in [(0, 5000), (0, 1), (99, 401), (150, 350), (17, 18), (5, 70)] + \
+                  [tuple(sorted(rng.integers(0, 5001, 2))) for _ in range(200)]:
+        expected = logic.calculate_averages({'a': values[lo:hi]}).get('a')
+        stats = index.stats(lo, hi)
+        if expected is None:
+            assert stats is None, (lo, hi)
+            continue
+        assert stats['count'] == expected['count']
+        assert stats['min'] == expected['min'] and stats['max'] == expected['max']
+        assert stats['median'] == expected['median']
+        assert np.isclose(stats['mean'], expected['mean'], rtol=0, atol=1e-9)
+        assert np.isclose(stats['std'], expected['std'], rtol=1e-6, atol=1e-9)
+
+    # Test 2: Time-range statistics with an offset into the indexed arrays
+    print("\nTest 2: calculate_range_averages")
+    timestamps = np.arange(5000, dtype=np.float64) * 60
+    offset = 1000
+    time_index = TimeIndex(timestamps[offset:])
+    averages = logic.calculate_range_averages(time_index, {'a': index}, 60600, 66000, offset)
+    expected = logic.calculate_averages({'a': values[offset + 10:offset + 101]})
+    print(averages)
+    assert averages['a']['count'] == expected['a']['count']
+    assert np.isclose(averages['a']['mean'], expected['a']['mean'])
+    assert logic.calculate_range_averages(time_index, {'a': index}, -10, -5, offset) == {}
+    assert 'median' not in logic.calculate_range_averages(time_index, {'a': index}, 60600, 66000, offset, median=False)['a']
+
+    # Test 3: Many ranges at once give the same statistics
+    print("\nTest 3: stats_many")
+    lo = rng.integers(0, 5001, 300)
+    hi = np.maximum(lo, rng.integers(0, 5001, 300))
+    many = index.stats_many(lo, hi)
+    for i in range(len(lo)):
+        stats = index.stats(lo[i], hi[i])
+        if stats is None:
+            assert many['count'][i] == 0 and np.isnan(many['mean'][i]) and np.isnan(many['median'][i])
+            continue
+        for key, value in stats.items():
+            assert np.isclose(many[key][i], value, rtol=1e-12, atol=1e-12), (key, lo[i], hi[i])
+        assert many['median'][i] == stats['median'] and many['min'][i] == stats['min']
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_range_stats()
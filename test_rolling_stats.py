@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from rolling_stats import rolling_pair_stats, rolling_tracks, window_starts
+from time_alignment import align_columns
+
+def test_rolling_stats():
+    rng = np.random.default_rng(3)
+
+    # Test 1: Trailing windows (t - window, t]
+    print("Test 1: window_starts")
+    times = np.array([0.0, 10, 20, 20, 35, 100])
+    print(window_starts(times, 20))
+    assert window_starts(times, 20).tolist() == [0, 0, 1, 1, 2, 5]
+
+    # Test 2: Prefix-sum statistics match pandas time-based rolling windows
+    print("\nTest 2: rolling_pair_stats vs pandas rolling")
+    n = 3000
+    times = np.cumsum(rng.integers(30, 90, n)).astype(np.float64)
+    x = 50 + np.sin(times / 5000) * 10 + rng.normal(0, 1, n)
+    y = x * 1.1 + rng.normal(0, 1, n)
+    y[1500:1700] = 60.0  # constant stretch: correlation undefined there
+    stats = rolling_pair_stats(times, x, y, 3600, min_pairs=10)
+
+    index = pd.to_datetime(times, unit='s')
+    sx, sy = pd.Series(x, index=index), pd.Series(y, index=index)
+    count = sx.rolling('3600s').count().to_numpy()
+    expected_corr = sx.rolling('3600s', min_periods=10).corr(sy).to_numpy()
+    expected_diff = (sy - sx).rolling('3600s', min_periods=10).mean().to_numpy()
+    assert stats['count'].tolist() == count.astype(int).tolist()
+    valid = np.isfinite(expected_corr) & (np.abs(expected_corr) < 1 - 1e-9)
+    print(np.nanmax(np.abs(stats['correlation'][valid] - expected_corr[valid])))
+    assert np.allclose(stats['correlation'][valid], expected_corr[valid], atol=1e-8)
+    assert np.isnan(stats['correlation'][1700 - 1])
+    assert np.allclose(stats['mean_diff'], expected_diff, equal_nan=True)
+
+    # Test 3: Tracks of every analyzer against the reference, within the plotted slice
+    print("\nTest 3: rolling_tracks")
+    values = {'ЭкоСпектр': y, 'Ametek': x, 'Второй': x + 2}
+    aligned = align_columns(times, values)
+    scales = {'H2S': {'Ametek': {'scale': 100}, 'Второй': {'scale': 50}}}
+    tracks = rolling_tracks(times[1000:], aligned, list(values), 3600, 'H2S', scales, offset=1000)
+    print(list(tracks), {col: len(track['times']) for col, track in tracks.items()})
+    assert list(tracks) == ['ЭкоСпектр', 'Второй']
+    assert len(tracks['Второй']['times']) == n - 1000 and tracks['Второй']['times'][0] == times[1000]
+    assert np.allclose(tracks['Второй']['mean_diff'][50:], 2.0)
+    assert np.allclose(tracks['Второй']['reduced_error'][50:], 2.0)
+    assert tracks['ЭкоСпектр']['reduced_error'] is not None
+    assert rolling_tracks(times, aligned, list(values), 3600)['Второй']['reduced_error'] is None
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_rolling_stats()
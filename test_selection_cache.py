@@ -0,0 +1,39 @@
+from selection_cache import SelectionCache, scales_key
+
+def test_selection_cache():
+    # Test 1: Hits, misses and least recently used eviction
+    print("Test 1: LRU eviction")
+    cache = SelectionCache(max_entries=2)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1      # 'a' becomes the most recently used
+    cache.put('c', 3)               # evicts 'b'
+    print(cache.stats())
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert len(cache) == 2
+    assert cache.stats() == {'entries': 2, 'max_entries': 2, 'hits': 1, 'misses': 1,
+                             'evictions': 1, 'hit_rate': 0.5}
+
+    # Test 2: Re-putting a key refreshes it without growing the cache
+    print("\nTest 2: Update existing key")
+    cache.put('a', 10)
+    cache.put('d', 4)               # evicts 'c', not the refreshed 'a'
+    assert cache.get('a') == 10 and 'c' not in cache
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()['hits'] == 2
+
+    # Test 3: Scale snapshot is order independent and follows every setting
+    print("\nTest 3: scales_key")
+    scales = {'H2S': {'Ametek': {'scale': 50, 'accuracy_class': 1.5}, 'ЭкоСпектр': {'scale': 100}}}
+    reordered = {'H2S': {'ЭкоСпектр': {'scale': 100}, 'Ametek': {'accuracy_class': 1.5, 'scale': 50}}}
+    assert scales_key(scales, 'H2S') == scales_key(reordered, 'H2S')
+    hash(scales_key(scales, 'H2S'))
+    changed = {'H2S': {'Ametek': {'scale': 50, 'accuracy_class': 1.0}, 'ЭкоСпектр': {'scale': 100}}}
+    assert scales_key(scales, 'H2S') != scales_key(changed, 'H2S')
+    assert scales_key(scales, 'SO2') == () and scales_key(None, 'H2S') == ()
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_selection_cache()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from numeric_conversion import to_float_array
+from series_store import compact_file_data, row_count, NAT
+
+def make_file_data(n=2000):
+    times = pd.date_range('2025-10-13', periods=n, freq='min').strftime('%d.%m.%Y %H:%M:%S').tolist()
+    values = [f"{i / 10:.1f}".replace('.', ',') for i in range(n)]
+    times[5] = 'ошибка'
+    values[7] = 'н/д'
+    values[8] = ''
+    df = pd.DataFrame({'DateTime': times, 'Ametek': values})
+    parsed_dates = pd.Series(pd.to_datetime(df['DateTime'], format='%d.%m.%Y %H:%M:%S', errors='coerce'))
+    return {'path': 'test.xlsx', 'data': df, 'time_col': 'DateTime', 'data_cols': ['Ametek'],
+            'parsed_dates': parsed_dates, 'numeric': {'Ametek': to_float_array(df['Ametek'])}}
+
+def test_series_store():
+    file_data = make_file_data()
+    numeric = file_data['numeric']['Ametek']
+
+    # Test 1: The raw table is replaced by the store
+    print("Test 1: Compaction")
+    compact_file_data(file_data)
+    store = file_data['store']
+    print(file_data['memory'])
+    assert 'data' not in file_data and row_count(file_data) == 2000 and len(store) == 2000
+    assert len(file_data['raw_preview']) == 100
+    assert file_data['memory']['compact'] < file_data['memory']['raw']
+
+    # Test 2: Entry keys are views of the store arrays
+    print("\nTest 2: Shared arrays")
+    assert file_data['numeric']['Ametek'] is store.values['Ametek']
+    assert np.shares_memory(file_data['numeric']['Ametek'], numeric)
+    assert np.shares_memory(file_data['parsed_dates'].to_numpy(), store.epoch)
+    assert file_data['parsed_dates'].iloc[1] == pd.Timestamp('2025-10-13 00:01')
+    assert store.epoch[5] == NAT and pd.isna(file_data['parsed_dates'].iloc[5])
+
+    # Test 3: Unconverted cells keep their text, empty cells are not stored
+    print("\nTest 3: Invalid cells")
+    assert store.raw_text('DateTime', 5) == 'ошибка'
+    assert store.raw_text('Ametek', 7) == 'н/д'
+    assert store.raw_text('Ametek', 8) == '' and store.raw_text('Ametek', 9) == ''
+    assert len(store.invalid['Ametek']) == 1
+
+    # Test 4: Entries whose arrays do not match the raw rows are left as they are
+    print("\nTest 4: Validation")
+    file_data = make_file_data(10)
+    file_data['numeric']['Ametek'] = file_data['numeric']['Ametek'][:5]
+    compact_file_data(file_data)
+    assert 'data' in file_data and 'store' not in file_data and row_count(file_data) == 10
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_series_store()
@@ -0,0 +1,90 @@
+import numpy as np
+from analyzer_logic import AnalyzerLogic
+from sliding_stats import SlidingWindowStats, SlidingPairStats
+from time_alignment import align_columns
+
+def test_sliding_stats():
+    logic = AnalyzerLogic()
+    rng = np.random.default_rng(21)
+
+    # Test 1: Random moves match statistics recomputed from scratch
+    print("Test 1: SlidingWindowStats vs calculate_averages")
+    values = np.round(rng.normal(100, 5, 20000), 1)  # rounded: many equal values
+    values[rng.random(20000) < 0.1] = np.nan
+    sliding = SlidingWindowStats(values)
+    lo, hi = 5000, 9000
+    for step in range(300):
+        if step % 50 == 49:
+            lo = int(rng.integers(0, 19000))  # jump: rebuilt
+            hi = lo + int(rng.integers(0, 1000))
+        else:
+            lo = int(np.clip(lo + rng.integers(-40, 41), 0, 20000))
+            hi = int(np.clip(hi + rng.integers(-40, 41), lo, 20000))
+        stats = sliding.move(lo, hi)
+        expected = logic.calculate_averages({'col': values[lo:hi]}).get('col')
+        if expected is None:
+            assert stats is None
+            continue
+        assert stats['count'] == expected['count']
+        for key in ('mean', 'std', 'min', 'max', 'median'):
+            assert np.isclose(stats[key], expected[key], rtol=1e-9, atol=1e-9), (step, key)
+        assert len(sliding.sorted) == stats['count']
+    print(stats)
+
+    # Test 2: Work per move follows the samples that entered or left
+    print("\nTest 2: Update cost")
+    sliding.move(1000, 11000)
+    sliding.move(1003, 11005)
+    print(sliding.updated)
+    assert sliding.updated == 8
+    sliding.move(15000, 16000)
+    assert sliding.updated == 1000
+
+    # Test 3: Paired correlation and difference, and comparisons from them
+    print("\nTest 3: SlidingPairStats")
+    timestamps = np.arange(20000) * 10.0
+    x = rng.normal(0, 1, 20000).cumsum()
+    y = x * 0.9 + rng.normal(0, 1, 20000)
+    y[rng.random(20000) < 0.2] = np.nan
+    aligned = align_columns(timestamps, {'Ametek': x, 'ЭкоСпектр': y})
+    pair = aligned[('Ametek', 'ЭкоСпектр')]
+    sliding_pair = SlidingPairStats(pair)
+    for lo, hi in ((2000, 6000), (2050, 6020), (1990, 5000), (12000, 14000), (12100, 14100)):
+        stats = sliding_pair.move(*pair.bounds(lo, hi))
+        px, py = pair.range(lo, hi)
+        assert stats['paired_count'] == len(px)
+        assert np.isclose(stats['paired_diff'], np.mean(py - px))
+        assert np.isclose(stats['correlation'], np.corrcoef(px, py)[0, 1], rtol=1e-9)
+
+        extracted = {'Ametek': x[lo:hi], 'ЭкоСпектр': y[lo:hi]}
+        averages = logic.calculate_averages(extracted)
+        aligned_data = {('Ametek', 'ЭкоСпектр'): (px, py)}
+        direct = logic.calculate_comparisons(averages, extracted, aligned_data=aligned_data)[0]
+        incremental = logic.calculate_comparisons(averages, extracted,
+                                                  paired_stats={('ЭкоСпектр', 'Ametek'): {
+                                                      **stats, 'paired_diff': -stats['paired_diff']}})[0]
+        assert direct['paired_count'] == incremental['paired_count']
+        assert np.isclose(direct['paired_diff'], incremental['paired_diff'])
+        assert np.isclose(direct['correlation'], incremental['correlation'])
+    print(stats)
+
+    # Test 4: Sliding into a flat stretch gives NaN, not the rounding residue of the removals
+    print("\nTest 4: Flat window reached by moves")
+    x[8000:12000] = 1.0
+    y[8000:12000] = 0.1
+    pair = align_columns(timestamps, {'Ametek': x, 'ЭкоСпектр': y})[('Ametek', 'ЭкоСпектр')]
+    sliding_pair = SlidingPairStats(pair)
+    lo, hi = 7000, 9000
+    sliding_pair.move(*pair.bounds(lo, hi))
+    while lo < 8000:
+        lo, hi = lo + 50, hi + 50
+        stats = sliding_pair.move(*pair.bounds(lo, hi))
+        assert sliding_pair.updated < hi - lo
+    print(stats, sliding_pair.m2_x)
+    assert np.isnan(stats['correlation']) and stats['paired_count'] == len(pair.range(lo, hi)[0])
+    assert np.isclose(stats['paired_diff'], -0.9)
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_sliding_stats()
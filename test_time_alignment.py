@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from time_alignment import asof_positions, align_pair, align_columns, get_pair
+from time_index import TimeIndex
+
+def test_time_alignment():
+    logic = AnalyzerLogic()
+    rng = np.random.default_rng(5)
+
+    # Test 1: Partners match pandas merge_asof
+    print("Test 1: asof_positions vs merge_asof")
+    left = np.sort(rng.integers(0, 10000, 2000))
+    right = np.unique(rng.integers(0, 10000, 1500))
+    for direction in ('nearest', 'backward', 'forward'):
+        for tolerance in (None, 3, 0):
+            positions = asof_positions(left, right, tolerance, direction)
+            merged = pd.merge_asof(pd.DataFrame({'t': left}), pd.DataFrame({'t': right, 'pos': np.arange(len(right))}),
+                                   on='t', direction=direction, tolerance=tolerance)
+            expected = merged['pos'].fillna(-1).astype(int).to_numpy()
+            if direction == 'nearest':
+                # Equal distance on both sides: merge_asof and this module may pick different sides
+                ties = (positions != expected) & (positions >= 0) & (expected >= 0)
+                assert (np.abs(right[positions[ties]] - left[ties]) == np.abs(right[expected[ties]] - left[ties])).all()
+                positions[ties] = expected[ties]
+            assert positions.tolist() == expected.tolist(), (direction, tolerance)
+
+    # Test 2: Two files on shifted clocks merged into one series
+    print("\nTest 2: Shifted clocks")
+    minutes = np.arange(600) * 60.0
+    signal = np.sin(np.arange(600) / 20)
+    timestamps = np.sort(np.concatenate([minutes, minutes + 17]))
+    ametek = np.full(1200, np.nan)
+    other = np.full(1200, np.nan)
+    ametek[0::2] = signal
+    other[1::2] = signal * 2 + 1
+    pairs = align_columns(timestamps, {'ЭкоСпектр': other, 'Ametek': ametek})
+    pair = pairs[('Ametek', 'ЭкоСпектр')]
+    print(len(pair), pair.left_rows[:3], pair.right_rows[:3])
+    assert len(pair) == 600 and (pair.right_rows == pair.left_rows + 1).all()
+    assert np.allclose(pair.y, pair.x * 2 + 1)
+
+    index = TimeIndex(timestamps)
+    extracted = {col: logic.extract_range_data(index, values, 600, 6000)
+                 for col, values in (('Ametek', ametek), ('ЭкоСпектр', other))}
+    averages = logic.calculate_averages(extracted)
+    row_aligned = logic.calculate_comparisons(averages, extracted)[0]
+    aligned_data = logic.extract_aligned_pairs(pairs, index, 600, 6000)
+    time_aligned = logic.calculate_comparisons(averages, extracted, aligned_data=aligned_data)[0]
+    print(row_aligned['correlation'], time_aligned['correlation'], time_aligned['paired_diff'])
+    assert np.isnan(row_aligned['correlation']) and row_aligned['paired_count'] == 0
+    assert np.isclose(time_aligned['correlation'], 1.0) and time_aligned['paired_count'] == 91
+
+    # Test 3: Row-aligned columns pair only on equal timestamps
+    print("\nTest 3: Row-aligned columns")
+    x = rng.normal(0, 1, 500)
+    y = x + rng.normal(0, 0.1, 500)
+    x[rng.random(500) < 0.2] = np.nan
+    y[rng.random(500) < 0.2] = np.nan
+    pair = align_pair(np.arange(500) * 60.0, x, y)
+    both = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    assert pair.left_rows.tolist() == both.tolist() and pair.right_rows.tolist() == both.tolist()
+    swapped = get_pair({('a', 'b'): pair}, 'b', 'a')
+    assert swapped.x is pair.y and swapped.range(0, 500)[0].tolist() == pair.y.tolist()
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_time_alignment()
@@ -0,0 +1,52 @@
+import numpy as np
+from analyzer_logic import AnalyzerLogic
+from time_index import TimeIndex
+
+def test_time_index():
+    logic = AnalyzerLogic()
+    timestamps = np.array([10.0, 20.0, 20.0, 30.0, 40.0])
+    values = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    index = TimeIndex(timestamps)
+
+    # Test 1: Closed range, duplicates at the edge included
+    print("Test 1: Range bounds")
+    assert index.bounds(20, 30) == (1, 4)
+    assert index.bounds(None, 15) == (0, 1)
+    assert index.bounds(41, None) == (5, 5)
+    assert index.bounds(35, 25) == (4, 4)
+
+    # Test 2: Extraction matches the boolean mask and returns a view
+    print("\nTest 2: extract_range_data")
+    for x_start, x_end in [(15, 35), (10, 40), (0, 5), (20, 20)]:
+        by_mask = logic.extract_range_data(timestamps, values, x_start, x_end)
+        by_index = logic.extract_range_data(index, values, x_start, x_end)
+        print(x_start, x_end, by_mask, by_index)
+        if by_mask is None:
+            assert by_index is None
+        else:
+            assert by_index.tolist() == by_mask.tolist()
+            assert np.shares_memory(by_index, values)
+
+    # Test 3: Unsorted input is sorted once
+    print("\nTest 3: from_unsorted")
+    index, order = TimeIndex.from_unsorted(np.array([3, 1, 2]))
+    assert index.values.tolist() == [1, 2, 3] and order.tolist() == [1, 2, 0]
+    assert TimeIndex.from_unsorted(np.array([1, 2]))[1] is None
+
+    # Test 4: Nearest sample matches argmin, with and without a hint
+    print("\nTest 4: nearest")
+    rng = np.random.default_rng(1)
+    timestamps = np.cumsum(rng.integers(1, 5, 500)).astype(np.float64)
+    index = TimeIndex(timestamps)
+    hint = None
+    for x in np.concatenate([rng.uniform(-10, timestamps[-1] + 10, 300), timestamps[::50] + 0.5]):
+        expected = int(np.argmin(np.abs(timestamps - x)))
+        assert index.nearest(x) == expected, x
+        hint = index.nearest(x, hint)
+        assert hint == expected, x
+    assert TimeIndex(np.array([])).nearest(1.0) == -1
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_time_index()
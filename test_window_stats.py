@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from time_alignment import align_columns
+from time_index import TimeIndex
+from window_stats import WindowStatsEngine, window_boundaries, make_windows
+
+def test_window_stats():
+    logic = AnalyzerLogic()
+    engine = WindowStatsEngine(logic)
+    rng = np.random.default_rng(7)
+    n = 5000
+    timestamps = pd.Timestamp('2025-09-28 22:13') + pd.to_timedelta(np.cumsum(rng.integers(20, 100, n)), unit='s')
+    ametek = 2 + rng.normal(0, 0.3, n)
+    other = ametek + 0.4 + rng.normal(0, 0.1, n)
+    other[rng.random(n) < 0.1] = np.nan
+    other[1000:1500] = np.nan
+    values = {'ЭкоСпектр': other, 'Ametek': ametek}
+    scales = {'H2S': {'ЭкоСпектр': {'scale': 20.0}}}
+
+    # Test 1: Calendar and fixed windows
+    print("Test 1: Window boundaries")
+    shifts = pd.to_datetime(window_boundaries('2025-09-29 07:59', '2025-09-29 08:00', 'shift'))
+    assert list(shifts) == [pd.Timestamp('2025-09-28 20:00'), pd.Timestamp('2025-09-29 08:00'),
+                            pd.Timestamp('2025-09-29 20:00')]
+    weeks = pd.to_datetime(window_boundaries('2025-09-28', '2025-10-01', 'week'))
+    assert list(weeks) == [pd.Timestamp('2025-09-22'), pd.Timestamp('2025-09-29'), pd.Timestamp('2025-10-06')]
+    months = pd.to_datetime(window_boundaries('2025-09-28', '2025-10-01', 'month'))
+    assert list(months) == [pd.Timestamp('2025-09-01'), pd.Timestamp('2025-10-01'), pd.Timestamp('2025-11-01')]
+    steps = pd.to_datetime(window_boundaries('2025-09-28 00:20', '2025-09-28 00:50', '15min'))
+    assert list(steps) == [pd.Timestamp('2025-09-28 00:15'), pd.Timestamp('2025-09-28 00:30'),
+                           pd.Timestamp('2025-09-28 00:45'), pd.Timestamp('2025-09-28 01:00')]
+
+    # Test 2: Grouped statistics match the GUI calculation for every hour
+    print("\nTest 2: Hourly statistics")
+    stats, comparisons = engine.compute(timestamps, values, 'hour', 'H2S', scales)
+    print(stats.head())
+    print(comparisons.head())
+    epoch = timestamps.asi8
+    aligned = align_columns(epoch, values)
+    windows = list(zip(*make_windows(timestamps[0], timestamps[-1], 'hour')))
+    assert len(stats.groupby('window_start')) == len(windows)
+    for start, end in windows:
+        extracted = {}
+        for col, column_values in values.items():
+            window = logic.extract_range_data(epoch, column_values, start, end)
+            if window is not None:
+                extracted[col] = window
+        averages = logic.calculate_averages(extracted)
+        rows = stats[stats['window_start'] == pd.Timestamp(start)]
+        assert len(rows) == len(averages)
+        for _, row in rows.iterrows():
+            for key, value in averages[row['analyzer']].items():
+                assert np.isclose(row[key], value, rtol=1e-9), (key, row[key], value)
+        aligned_data = logic.extract_aligned_pairs(aligned, TimeIndex(epoch), start, end)
+        expected = logic.calculate_comparisons(averages, extracted, scales, 'H2S', aligned_data)
+        rows = comparisons[comparisons['window_start'] == pd.Timestamp(start)]
+        assert len(rows) == len(expected)
+        for (_, row), comparison in zip(rows.iterrows(), expected):
+            assert (row['analyzer1'], row['analyzer2']) == comparison['pair']
+            for key in ('diff_abs', 'diff_pct', 'correlation', 'reduced_error'):
+                assert np.isclose(row[key], comparison[key], rtol=1e-7), (key, row[key], comparison[key])
+
+    # Test 3: Unsorted input gives the same tables
+    print("\nTest 3: Unsorted input")
+    order = rng.permutation(n)
+    shuffled = engine.compute(timestamps[order], {col: arr[order] for col, arr in values.items()}, 'day')
+    daily = engine.compute(timestamps, values, 'day')
+    pd.testing.assert_frame_equal(shuffled[0], daily[0])
+    assert daily[0][daily[0]['analyzer'] == 'Ametek']['count'].sum() == n
+
+    print("\nALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_window_stats()
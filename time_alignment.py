@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Time alignment of analyzer columns sampled on different clocks.
+Every sample of the first column is paired with the closest (or the last
+earlier / first later) valid sample of the second column within a tolerance,
+merge_asof style, using one vectorized binary search (O(n log n)). Pairs are
+stored as row positions of the shared time-sorted series, so a time range
+is mapped to a slice of pairs with the same TimeIndex bounds as the values,
+and the aligned pairs can be cached once per data version.
+"""
+from itertools import combinations
+import numpy as np
+from analyzer_logic import AnalyzerLogic
+
+DIRECTIONS = ('nearest', 'backward', 'forward')
+
+
+def default_tolerance(timestamps):
+    """
+    Half the median sampling step: row-aligned columns pair only on equal
+    timestamps, columns on shifted clocks pair with the closest sample.
+    """
+    steps = np.diff(timestamps)
+    steps = steps[steps > 0]
+    return float(np.median(steps)) / 2 if len(steps) else 0.0
+
+
+def asof_positions(left, right, tolerance=None, direction='nearest'):
+    """
+    For every value of the sorted array left, the position of its partner in
+    the sorted array right, or -1 when none lies within tolerance.
+    Exact matches always pair; ties of 'nearest' go to the earlier sample.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"unknown direction: {direction}")
+    left = np.asarray(left)
+    right = np.asarray(right)
+    if len(right) == 0:
+        return np.full(len(left), -1, dtype=np.int64)
+
+    after = np.searchsorted(right, left, side='left')
+    before = np.searchsorted(right, left, side='right') - 1
+    has_before = before >= 0
+    has_after = after < len(right)
+    gap_before = np.where(has_before, left - right[np.maximum(before, 0)], np.inf)
+    gap_after = np.where(has_after, right[np.minimum(after, len(right) - 1)] - left, np.inf)
+
+    if direction == 'backward':
+        positions, gaps = before, gap_before
+    elif direction == 'forward':
+        positions, gaps = after, gap_after
+    else:
+        use_before = gap_before <= gap_after
+        positions = np.where(use_before, before, after)
+        gaps = np.where(use_before, gap_before, gap_after)
+
+    matched = np.isfinite(gaps)
+    if tolerance is not None:
+        matched &= gaps <= tolerance
+    return np.where(matched, positions, -1).astype(np.int64)
+
+
+class AlignedPair:
+    """
+    Paired samples of two columns: x = values1[left_rows], y = values2[right_rows],
+    ordered by left_rows (row positions of the time-sorted series).
+    """
+
+    def __init__(self, left_rows, right_rows, x, y):
+        self.left_rows = left_rows
+        self.right_rows = right_rows
+        self.x = x
+        self.y = y
+
+    def __len__(self):
+        return len(self.left_rows)
+
+    def bounds(self, lo, hi):
+        """
+        Pair positions of the series rows [lo, hi); lo and hi may be arrays.
+        """
+        return np.searchsorted(self.left_rows, lo, side='left'), np.searchsorted(self.left_rows, hi, side='left')
+
+    def range(self, lo, hi):
+        """
+        (x, y) views of the pairs whose first sample lies in the rows [lo, hi).
+        """
+        start, stop = self.bounds(lo, hi)
+        return self.x[start:stop], self.y[start:stop]
+
+    def swapped(self):
+        return AlignedPair(self.right_rows, self.left_rows, self.y, self.x)
+
+
+def align_pair(timestamps, values1, values2, tolerance=None, direction='nearest', lag=0.0):
+    """
+    AlignedPair of two columns sharing the sorted timestamps: every finite
+    sample of values1 paired with a finite sample of values2 by time.
+    tolerance is in timestamp units (default: default_tolerance of values2's samples);
+    with a lag, a sample of values1 at t is paired with values2 at t + lag.
+    """
+    timestamps = np.asarray(timestamps)
+    rows1 = np.flatnonzero(np.isfinite(values1))
+    rows2 = np.flatnonzero(np.isfinite(values2))
+    if tolerance is None:
+        tolerance = default_tolerance(timestamps[rows2])
+    partners = asof_positions(timestamps[rows1] + lag, timestamps[rows2], tolerance, direction)
+    matched = partners >= 0
+    left_rows = rows1[matched]
+    right_rows = rows2[partners[matched]]
+    return AlignedPair(left_rows, right_rows, values1[left_rows], values2[right_rows])
+
+
+def align_columns(timestamps, values, tolerance=None, direction='nearest'):
+    """
+    AlignedPair for every pair of columns ({(col1, col2): pair}), the reference
+    analyzer first as in calculate_comparisons.
+    """
+    pairs = {}
+    for col1, col2 in combinations(values, 2):
+        if not AnalyzerLogic.is_reference_column(col1) and AnalyzerLogic.is_reference_column(col2):
+            col1, col2 = col2, col1
+        pairs[(col1, col2)] = align_pair(timestamps, values[col1], values[col2], tolerance, direction)
+    return pairs
+
+
+def get_pair(pairs, col1, col2):
+    """
+    AlignedPair of (col1, col2) from align_columns output in either order, or None.
+    """
+    if (col1, col2) in pairs:
+        return pairs[(col1, col2)]
+    if (col2, col1) in pairs:
+        return pairs[(col2, col1)].swapped()
+    return None
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Sorted time index shared by the plot pipeline, range extraction and the
+crosshair. Ranges are located with two binary searches and returned as
+slices, so extracting a window costs O(log n) and the data arrays are
+never copied; the nearest sample to a cursor position is found the same way.
+"""
+import numpy as np
+import pandas as pd
+
+
+class TimeIndex:
+    """
+    Ascending timestamps (epoch seconds, int64 nanoseconds or row numbers).
+    """
+
+    def __init__(self, timestamps):
+        if isinstance(timestamps, pd.Series):
+            timestamps = timestamps.to_numpy()
+        self.values = np.asarray(timestamps)
+
+    def __len__(self):
+        return len(self.values)
+
+    @classmethod
+    def from_unsorted(cls, timestamps):
+        """
+        Sort timestamps if needed; returns (index, order) where order is None when already sorted.
+        """
+        timestamps = np.asarray(timestamps)
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            return cls(timestamps[order]), order
+        return cls(timestamps), None
+
+    def bounds(self, start=None, end=None):
+        """
+        (lo, hi) positions of the closed range [start, end]; None means open on that side.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.values, start, side='left'))
+        hi = len(self.values) if end is None else int(np.searchsorted(self.values, end, side='right'))
+        return lo, max(lo, hi)
+
+    def bounds_many(self, starts, ends):
+        """
+        Vectorized bounds() for arrays of closed ranges: (lo, hi) position arrays.
+        """
+        lo = np.searchsorted(self.values, starts, side='left')
+        hi = np.searchsorted(self.values, ends, side='right')
+        return lo, np.maximum(lo, hi)
+
+    def range_slice(self, start=None, end=None):
+        lo, hi = self.bounds(start, end)
+        return slice(lo, hi)
+
+    def slice(self, values, start=None, end=None):
+        """
+        Zero-copy view of values (aligned with the index) within [start, end].
+        """
+        return values[self.range_slice(start, end)]
+
+    def nearest(self, x, hint=None):
+        """
+        Position of the timestamp closest to x (ties go to the earlier one), -1 if empty.
+        hint is a previous result: when x is still closest to it or to a neighbour
+        of it, no search is done, so small cursor moves cost O(1).
+        """
+        values = self.values
+        n = len(values)
+        if n == 0:
+            return -1
+
+        if hint is not None:
+            for pos in (hint, hint + 1, hint - 1):
+                if 0 <= pos < n:
+                    distance = abs(x - values[pos])
+                    if (pos == 0 or distance < abs(x - values[pos - 1])) and \
+                            (pos == n - 1 or distance <= abs(x - values[pos + 1])):
+                        return pos
+
+        pos = int(np.searchsorted(values, x, side='left'))
+        if pos == 0:
+            return 0
+        if pos == n:
+            return n - 1
+        return pos - 1 if x - values[pos - 1] <= values[pos] - x else pos
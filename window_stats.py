@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Grouped statistics over consecutive time windows (per hour / day / shift / ...).
+The time-sorted samples are binned against the window boundaries with one
+binary search; count, sums and sums of squares of every window come from
+np.bincount, min/max from reduceat over the contiguous bins and medians from
+one sort, so a whole campaign is summarised in one pass over the data.
+Correlations use the samples of each column pair matched by time (time_alignment).
+Results are tidy tables: one row per window and analyzer, and one row per
+window and analyzer pair with the calculate_comparisons fields.
+"""
+import logging
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from analyzer_logic import AnalyzerLogic
+from centered_sums import centered, windowed_correlation
+from range_stats import range_medians
+from time_alignment import align_columns, get_pair
+from time_index import TimeIndex
+
+logger = logging.getLogger(__name__)
+
+# Calendar periods; anything else is read as a fixed step ('15min', '2h', ...)
+PERIODS = ('hour', 'day', 'shift', 'week', 'month')
+
+# Shift start hours (day shift 08:00-20:00, night shift 20:00-08:00)
+SHIFT_STARTS = (8, 20)
+
+STATS_COLUMNS = ['gas', 'window_start', 'window_end', 'analyzer',
+                 'count', 'mean', 'std', 'min', 'max', 'median']
+COMPARISON_COLUMNS = ['gas', 'window_start', 'window_end', 'analyzer1', 'analyzer2',
+                      'mean1', 'mean2', 'diff_abs', 'diff_pct', 'count1', 'count2',
+                      'correlation', 'reduced_error']
+
+
+def window_boundaries(first, last, every, shift_starts=SHIFT_STARTS):
+    """
+    int64 nanosecond boundaries of consecutive windows covering [first, last]:
+    window i is [boundaries[i], boundaries[i + 1]). Calendar periods start on
+    whole hours / days / shifts / Mondays / first days of a month; fixed steps
+    are counted from midnight of the first day.
+    """
+    first, last = pd.Timestamp(first), pd.Timestamp(last)
+    day, last_day = first.floor('D'), last.floor('D')
+    if every == 'hour':
+        boundaries = pd.date_range(first.floor('h'), last.floor('h') + pd.Timedelta(hours=1), freq='h')
+    elif every == 'day':
+        boundaries = pd.date_range(day, last_day + pd.Timedelta(days=1), freq='D')
+    elif every == 'shift':
+        days = pd.date_range(day - pd.Timedelta(days=1), last_day + pd.Timedelta(days=1), freq='D')
+        boundaries = pd.DatetimeIndex(sorted(d + pd.Timedelta(hours=hour) for d in days for hour in shift_starts))
+    elif every == 'week':
+        monday = day - pd.Timedelta(days=day.dayofweek)
+        boundaries = pd.date_range(monday, last_day + pd.Timedelta(days=7), freq='7D')
+    elif every == 'month':
+        boundaries = pd.date_range(day.replace(day=1), last_day + pd.offsets.MonthBegin(1), freq='MS')
+    else:
+        step = pd.Timedelta(every)
+        if step <= pd.Timedelta(0):
+            raise ValueError(f"window step must be positive: {every}")
+        n_steps = (last - day) // step + 2
+        boundaries = day + step * np.arange(n_steps)
+
+    boundaries = np.asarray(pd.DatetimeIndex(boundaries).asi8)
+    # Only windows that overlap [first, last]
+    lo = max(int(np.searchsorted(boundaries, first.value, side='right')) - 1, 0)
+    hi = int(np.searchsorted(boundaries, last.value, side='right')) + 1
+    return boundaries[lo:hi]
+
+
+def make_windows(first, last, every, shift_starts=SHIFT_STARTS):
+    """
+    The windows of window_boundaries() as (starts, ends) int64 nanoseconds,
+    closed ranges ending 1 ns before the next window starts.
+    """
+    boundaries = window_boundaries(first, last, every, shift_starts)
+    return boundaries[:-1], boundaries[1:] - 1
+
+
+def tidy_tables(gas_type, starts, ends, data_cols, stats, correlation, analyzer_scales=None):
+    """
+    Tidy statistics and comparison tables from per-window arrays.
+    stats is {column: {statistic: array over windows}}, correlation(col1, col2)
+    returns the per-window correlation of a pair. Windows without data for an
+    analyzer are left out, as in the GUI. Rows are grouped by window.
+    """
+    window_start = pd.to_datetime(starts)
+    window_end = pd.to_datetime(ends)
+
+    stats_frames = []
+    for col in data_cols:
+        frame = pd.DataFrame({'gas': gas_type, 'window_start': window_start, 'window_end': window_end,
+                              'analyzer': col, **stats[col]})
+        stats_frames.append(frame[stats[col]['count'] > 0])
+
+    comparison_frames = []
+    for col1, col2 in combinations(data_cols, 2):
+        # Reference analyzer first, as in calculate_comparisons
+        if not AnalyzerLogic.is_reference_column(col1) and AnalyzerLogic.is_reference_column(col2):
+            col1, col2 = col2, col1
+        mean1, mean2 = stats[col1]['mean'], stats[col2]['mean']
+        diff_abs = mean2 - mean1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diff_pct = np.where(mean1 != 0, diff_abs / mean1 * 100,
+                                np.where(diff_abs != 0, np.nan, 0.0))
+        max_scale = AnalyzerLogic.pair_scale(analyzer_scales, gas_type, col1, col2)
+
+        frame = pd.DataFrame({
+            'gas': gas_type, 'window_start': window_start, 'window_end': window_end,
+            'analyzer1': col1, 'analyzer2': col2,
+            'mean1': mean1, 'mean2': mean2, 'diff_abs': diff_abs, 'diff_pct': diff_pct,
+            'count1': stats[col1]['count'], 'count2': stats[col2]['count'],
+            'correlation': correlation(col1, col2),
+            'reduced_error': diff_abs / max_scale * 100.0 if max_scale else None
+        })
+        comparison_frames.append(frame[(frame['count1'] > 0) & (frame['count2'] > 0)])
+
+    return _by_window(stats_frames, STATS_COLUMNS), _by_window(comparison_frames, COMPARISON_COLUMNS)
+
+
+def _by_window(frames, columns):
+    # Frames are indexed by window number: rows of one window end up together, in window order
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames).sort_index(kind='stable').reset_index(drop=True)
+
+
+class WindowStatsEngine:
+    """
+    Per-window statistics and comparisons of time-sorted series, computed
+    with grouped reductions (np.bincount / ufunc.reduceat).
+    """
+
+    def __init__(self, logic=None):
+        self.logic = logic or AnalyzerLogic()
+
+    def _column_stats(self, bins, group_starts, group_ends, values, n_windows, median):
+        finite = np.isfinite(values)
+        finite_bins = bins[finite]
+        finite_values = values[finite]
+        count = np.bincount(finite_bins, minlength=n_windows)
+        has_values = count > 0
+        safe_count = np.maximum(count, 1)
+
+        deviations, shift = centered(finite_values)
+        mean = np.bincount(finite_bins, weights=deviations, minlength=n_windows) / safe_count
+        var = np.bincount(finite_bins, weights=deviations * deviations, minlength=n_windows) / safe_count - mean * mean
+
+        # Bins are contiguous runs of the sorted samples; the padding keeps the last start valid
+        for_min = np.append(np.where(finite, values, np.inf), np.inf)
+        for_max = np.append(np.where(finite, values, -np.inf), -np.inf)
+        result = {
+            'mean': np.where(has_values, shift + mean, np.nan),
+            'count': count,
+            'std': np.where(has_values, np.sqrt(np.maximum(var, 0.0)), np.nan),
+            'min': np.where(has_values, np.minimum.reduceat(for_min, group_starts), np.nan),
+            'max': np.where(has_values, np.maximum.reduceat(for_max, group_starts), np.nan)
+        }
+        if median:
+            result['median'] = range_medians(values, group_starts, group_ends)
+        return result
+
+    def _pair_correlation(self, pair_bins, x, y, n_windows):
+        """
+        Per-window Pearson correlation of paired samples (pair_bins: window of every pair).
+        """
+        def window_sums(weights):
+            return np.bincount(pair_bins, weights=weights, minlength=n_windows)
+
+        return windowed_correlation(x, y, window_sums)
+
+    def statistics(self, epoch, values, boundaries, gas_type=None, analyzer_scales=None, median=True):
+        """
+        Tidy (stats, comparisons) tables of values ({column: array aligned with
+        epoch}) for the windows [boundaries[i], boundaries[i + 1]).
+        epoch is int64 nanoseconds; unsorted input is sorted once.
+        """
+        epoch = np.asarray(epoch, dtype=np.int64)
+        index, order = TimeIndex.from_unsorted(epoch)
+        data_cols = list(values)
+        values = {col: np.asarray(arr, dtype=np.float64) for col, arr in values.items()}
+        if order is not None:
+            values = {col: arr[order] for col, arr in values.items()}
+
+        # Samples inside the windows, each with its window number
+        n_windows = max(len(boundaries) - 1, 0)
+        lo, hi = index.bounds(boundaries[0], boundaries[-1] - 1) if n_windows else (0, 0)
+        bins = np.searchsorted(boundaries, index.values[lo:hi], side='right') - 1
+        group_starts = np.searchsorted(bins, np.arange(n_windows), side='left')
+        group_ends = np.append(group_starts[1:], len(bins)).astype(np.int64)
+
+        stats = {col: self._column_stats(bins, group_starts, group_ends, values[col][lo:hi], n_windows, median)
+                 for col in data_cols}
+        # Correlations over samples paired by time (window of the first sample of a pair)
+        aligned = align_columns(index.values[lo:hi], {col: values[col][lo:hi] for col in data_cols})
+
+        def correlation(col1, col2):
+            pair = get_pair(aligned, col1, col2)
+            return self._pair_correlation(bins[pair.left_rows], pair.x, pair.y, n_windows)
+
+        logger.info(f"{gas_type}: {hi - lo} samples in {n_windows} windows")
+        return tidy_tables(gas_type, boundaries[:-1], boundaries[1:] - 1, data_cols, stats,
+                           correlation, analyzer_scales)
+
+    def compute(self, timestamps, values, every, gas_type=None, analyzer_scales=None, median=True):
+        """
+        Tidy (stats, comparisons) tables for every window of a period
+        ('hour', 'day', 'shift', 'week', 'month' or a fixed step like '15min')
+        over the span of the data. timestamps are datetimes or int64 nanoseconds.
+        """
+        epoch = np.asarray(pd.to_datetime(timestamps), dtype='datetime64[ns]').view('int64')
+        finite = epoch != np.iinfo(np.int64).min
+        if not finite.any():
+            return pd.DataFrame(columns=STATS_COLUMNS), pd.DataFrame(columns=COMPARISON_COLUMNS)
+        epoch = epoch[finite]
+        values = {col: np.asarray(arr, dtype=np.float64)[finite] for col, arr in values.items()}
+        boundaries = window_boundaries(pd.Timestamp(epoch.min()), pd.Timestamp(epoch.max()), every)
+        return self.statistics(epoch, values, boundaries, gas_type, analyzer_scales, median)